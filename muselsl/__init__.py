@@ -1,4 +1,4 @@
-from .stream import stream, list_muses
+from .stream import stream, stream_async, list_muses
 from .record import record, record_direct
 from .view import view
 __version__ = "2.5.0"
@@ -4,21 +4,29 @@ Decode logic ported from BrainFlow PR #779 (commit 7b2e41d3, MIT license).
 https://github.com/brainflow-dev/brainflow/pull/779
 """
 
+import json
 import logging
 import struct
-from time import sleep, time
-from typing import Any
+import threading
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from time import monotonic, time
+from typing import Any, Callable, Optional
 
 import numpy as np
 import pygatt
 
 from . import backends, helper
+from .decode_worker import DecodeWorker
+from .packet_trace import PacketTrace
+from .timestamps import TimestampCorrector
 from .constants import (
     LSL_ATHENA_ACC_CHUNK,
     LSL_ATHENA_EEG_CHUNK,
     LSL_ATHENA_GYRO_CHUNK,
     LSL_ATHENA_OPTICS_CHUNK,
     MUSE_ATHENA_ACCELEROMETER_SCALE,
+    MUSE_ATHENA_COMMAND_TIMEOUT,
     MUSE_ATHENA_BATTERY_SCALE,
     MUSE_ATHENA_DEFAULT_PRESET,
     MUSE_ATHENA_EEG_SCALE,
@@ -62,6 +70,40 @@ def extract_lsb_bits(data, bit_start, bit_width):
     return value
 
 
+@lru_cache(maxsize=None)
+def _lsb_word_layout(bit_width, n_words):
+    """Byte gather indices and bit shifts for ``n_words`` packed words.
+
+    A word of up to 25 bits starting at any bit offset spans at most 4 bytes,
+    so each word is read as a little-endian uint32 window and shifted down.
+    Indices past the last payload byte are clamped; those bits lie above the
+    word and are masked off.
+    """
+    starts = np.arange(n_words) * bit_width
+    n_bytes = (n_words * bit_width + 7) // 8
+    byte_idx = np.minimum((starts >> 3)[:, None] + np.arange(4), n_bytes - 1)
+    shifts = (starts & 7).astype(np.uint32)
+    byte_idx.flags.writeable = False
+    shifts.flags.writeable = False
+    return n_bytes, byte_idx, shifts
+
+
+def unpack_lsb_words(data, bit_width, n_words):
+    """Vectorized ``extract_lsb_bits`` over ``n_words`` consecutive words.
+
+    Returns a uint32 array where element i equals
+    ``extract_lsb_bits(data, i * bit_width, bit_width)``.
+    """
+    if not 0 < bit_width <= 25:
+        raise ValueError(f'unpack_lsb_words: bit_width must be in 1..25, got {bit_width}')
+    if n_words <= 0:
+        return np.zeros(0, dtype=np.uint32)
+    n_bytes, byte_idx, shifts = _lsb_word_layout(bit_width, n_words)
+    src = np.frombuffer(data, dtype=np.uint8, count=n_bytes)
+    words = src[byte_idx].view('<u4')[:, 0]
+    return (words >> shifts) & np.uint32((1 << bit_width) - 1)
+
+
 def get_sensor_config(tag):
     """Return sensor config tuple or None for unknown tags."""
     return MUSE_ATHENA_SENSOR_CONFIG.get(tag)
@@ -89,45 +131,65 @@ EEG_MIDPOINT = 1 << 13
 def decode_eeg(data, n_channels, n_samples):
     """Decode 14-bit LSB-first EEG payload -> (n_channels, n_samples) float32 µV.
 
-    Output is zero-centered (DC offset removed), like legacy Muse EEG.
+    Output is zero-centered (DC offset removed), like legacy Muse EEG. Blocks
+    are byte-aligned, so several same-tag payloads concatenated back-to-back
+    decode in one call by passing the total ``n_samples``.
     """
-    out = np.zeros((n_channels, n_samples), dtype=np.float32)
-    for sample in range(n_samples):
-        for channel in range(n_channels):
-            bit_start = (sample * n_channels + channel) * 14
-            raw = extract_lsb_bits(data, bit_start, 14)
-            out[channel, sample] = (raw - EEG_MIDPOINT) * MUSE_ATHENA_EEG_SCALE
-    return out
+    raw = unpack_lsb_words(data, 14, n_samples * n_channels).astype(np.int32)
+    out = (raw.reshape(n_samples, n_channels).T - EEG_MIDPOINT) * MUSE_ATHENA_EEG_SCALE
+    return out.astype(np.float32)
+
+
+# Per-column scale for the interleaved [ax, ay, az, gx, gy, gz] int16 samples.
+ACC_GYRO_SCALE = np.array(
+    [MUSE_ATHENA_ACCELEROMETER_SCALE] * 3 + [MUSE_ATHENA_GYRO_SCALE] * 3,
+)
 
 
 def decode_acc_gyro(data, n_samples):
-    """Decode int16 LE ACC+GYRO payload -> acc (3, n), gyro (3, n)."""
-    acc = np.zeros((3, n_samples), dtype=np.float32)
-    gyro = np.zeros((3, n_samples), dtype=np.float32)
-    for sample in range(n_samples):
-        for channel in range(6):
-            offset = (sample * 6 + channel) * 2
-            raw = struct.unpack_from('<h', data, offset)[0]
-            if channel < 3:
-                acc[channel, sample] = raw * MUSE_ATHENA_ACCELEROMETER_SCALE
-            else:
-                gyro[channel - 3, sample] = raw * MUSE_ATHENA_GYRO_SCALE
-    return acc, gyro
+    """Decode int16 LE ACC+GYRO payload -> acc (3, n), gyro (3, n).
 
+    Both are views into one scaled (n_samples, 6) array, not copies.
+    """
+    raw = np.frombuffer(data, dtype='<i2', count=n_samples * 6).reshape(n_samples, 6)
+    scaled = (raw * ACC_GYRO_SCALE).astype(np.float32)
+    return scaled[:, :3].T, scaled[:, 3:].T
 
-def decode_optics(data, tag, n_channels, n_samples):
-    """Decode 20-bit LSB-first optics -> (16, n_samples); unused slots stay 0."""
+
+def _optics_scatter(tag, n_channels):
+    """(source rows, canonical rows) for one optics tag's channel layout."""
+    canonical = np.array([optics_canonical_index(tag, ch) for ch in range(n_channels)])
+    source = np.flatnonzero(canonical >= 0)
+    return source, canonical[source]
+
+
+# tag -> precomputed scatter into the 16 canonical optics slots
+OPTICS_SCATTER = {
+    tag: _optics_scatter(tag, config[1])
+    for tag, config in MUSE_ATHENA_SENSOR_CONFIG.items()
+    if config[0] == 'optics'
+}
+
+
+def _decode_optics_scattered(data, scatter, n_channels, n_samples):
+    source, canonical = scatter
+    raw = unpack_lsb_words(data, 20, n_samples * n_channels).reshape(n_samples, n_channels)
     out = np.zeros((MUSE_ATHENA_NB_OPTICS_CHANNELS, n_samples), dtype=np.float32)
-    for sample in range(n_samples):
-        for channel in range(n_channels):
-            bit_start = (sample * n_channels + channel) * 20
-            raw = extract_lsb_bits(data, bit_start, 20)
-            idx = optics_canonical_index(tag, channel)
-            if idx >= 0:
-                out[idx, sample] = raw * MUSE_ATHENA_OPTICS_SCALE
+    out[canonical] = raw.T[source] * MUSE_ATHENA_OPTICS_SCALE
     return out
 
 
+def decode_optics(data, tag, n_channels, n_samples):
+    """Decode 20-bit LSB-first optics -> (16, n_samples); unused slots stay 0.
+
+    Like ``decode_eeg``, concatenated same-tag blocks decode in one call.
+    """
+    scatter = OPTICS_SCATTER.get(tag)
+    if scatter is None or get_sensor_config(tag)[1] != n_channels:
+        scatter = _optics_scatter(tag, n_channels)
+    return _decode_optics_scattered(data, scatter, n_channels, n_samples)
+
+
 def decode_battery(data):
     """Battery percent from first uint16 LE."""
     if len(data) < 2:
@@ -135,38 +197,149 @@ def decode_battery(data):
     return struct.unpack_from('<H', data, 0)[0] * MUSE_ATHENA_BATTERY_SCALE
 
 
-def split_packets(data):
-    """Split a BLE notification into (packet_bytes, ...) using length-prefixed framing."""
-    packets = []
+@dataclass(frozen=True, slots=True)
+class DecodePlan:
+    """Everything needed to decode one sensor tag, resolved at import time.
+
+    ``decode(payload, n_samples)`` returns ``{stream: samples}`` for
+    ``n_samples`` samples of concatenated same-tag blocks; it is None for tags
+    that carry no sample stream (battery, unknown).
+    """
+    tag: int
+    sensor_type: str
+    n_channels: int
+    n_samples: int
+    rate: float
+    data_len: int
+    variable: bool
+    bit_width: Optional[int]
+    scale: Any
+    streams: tuple
+    scatter: Any = None
+    decode: Optional[Callable] = None
+
+
+def _decode_eeg_plan(n_channels, payload, n_samples):
+    # Tag 0x11 packs 4 channels, 0x12 packs 8 (first 4 are TP9/AF7/AF8/TP10,
+    # the rest are aux). Decode all n_channels for correct 14-bit offsets,
+    # then keep only the 4 the outlet expects (mirrors BrainFlow PR #779).
+    samples = decode_eeg(payload, n_channels, n_samples)
+    return {'eeg': samples[:MUSE_ATHENA_NB_EEG_CHANNELS]}
+
+
+def _decode_acc_gyro_plan(payload, n_samples):
+    acc, gyro = decode_acc_gyro(payload, n_samples)
+    return {'acc': acc, 'gyro': gyro}
+
+
+def _decode_optics_plan(scatter, n_channels, payload, n_samples):
+    return {'optics': _decode_optics_scattered(payload, scatter, n_channels, n_samples)}
+
+
+def _plan(tag, config, **fields):
+    sensor_type, n_channels, n_samples, rate, data_len, variable = config
+    return DecodePlan(
+        tag=tag, sensor_type=sensor_type, n_channels=n_channels, n_samples=n_samples,
+        rate=rate, data_len=data_len, variable=variable, **fields,
+    )
+
+
+def _eeg_plan(tag, config):
+    return _plan(
+        tag, config, bit_width=14, scale=MUSE_ATHENA_EEG_SCALE, streams=('eeg',),
+        decode=partial(_decode_eeg_plan, config[1]),
+    )
+
+
+def _acc_gyro_plan(tag, config):
+    return _plan(
+        tag, config, bit_width=16, scale=ACC_GYRO_SCALE, streams=('acc', 'gyro'),
+        decode=_decode_acc_gyro_plan,
+    )
+
+
+def _optics_plan(tag, config):
+    scatter = OPTICS_SCATTER[tag]
+    return _plan(
+        tag, config, bit_width=20, scale=MUSE_ATHENA_OPTICS_SCALE, streams=('optics',),
+        scatter=scatter, decode=partial(_decode_optics_plan, scatter, config[1]),
+    )
+
+
+def _battery_plan(tag, config):
+    return _plan(
+        tag, config, bit_width=16, scale=MUSE_ATHENA_BATTERY_SCALE, streams=(),
+    )
+
+
+def _passive_plan(tag, config):
+    return _plan(tag, config, bit_width=None, scale=None, streams=())
+
+
+# sensor_type -> plan builder. A new firmware tag with a known sensor type only
+# needs a MUSE_ATHENA_SENSOR_CONFIG entry; a new sensor type adds a builder here.
+_PLAN_BUILDERS = {
+    'eeg': _eeg_plan,
+    'acc_gyro': _acc_gyro_plan,
+    'optics': _optics_plan,
+    'battery': _battery_plan,
+}
+
+
+def compile_decode_plans(sensor_config):
+    """Build the 256-entry tag -> DecodePlan table (None for unknown tags)."""
+    plans: list = [None] * 256
+    for tag, config in sensor_config.items():
+        builder = _PLAN_BUILDERS.get(config[0], _passive_plan)
+        plans[tag] = builder(tag, config)
+    return plans
+
+
+DECODE_PLANS = compile_decode_plans(MUSE_ATHENA_SENSOR_CONFIG)
+
+
+def iter_packets(data):
+    """Yield each length-prefixed packet as a zero-copy memoryview into ``data``."""
+    view = memoryview(data)
     offset = 0
-    size = len(data)
+    size = len(view)
     while offset < size:
         if size - offset < MUSE_ATHENA_PACKET_HEADER_SIZE:
             break
-        packet_len = data[offset]
+        packet_len = view[offset]
         if packet_len < MUSE_ATHENA_PACKET_HEADER_SIZE or offset + packet_len > size:
             break
-        packets.append(bytes(data[offset:offset + packet_len]))
+        yield view[offset:offset + packet_len]
         offset += packet_len
-    return packets
+
+
+def split_packets(data):
+    """Split a BLE notification into (packet_bytes, ...) using length-prefixed framing.
+
+    Copies each packet; the decode path uses ``iter_packets`` views instead.
+    """
+    return [bytes(packet) for packet in iter_packets(data)]
 
 
 def parse_packet_header(packet):
-    """Return (packet_index, primary_tag, payload_bytes).
+    """Return (packet_index, primary_tag, payload).
 
     Bytes 3-8 are header padding we don't decode; BrainFlow reads only the
     packet index (1-2), tag (9) and block index (10). Timestamps come from host
-    arrival time, not the device (see RLSTimestampCorrector), so there is no
-    device clock to parse here.
+    arrival time, not the device (see TimestampCorrector), so there is no
+    device clock to parse here. ``payload`` is a memoryview into ``packet``.
     """
     packet_index = struct.unpack_from('<H', packet, 1)[0]
     primary_tag = packet[9]
-    payload = packet[MUSE_ATHENA_PACKET_HEADER_SIZE:]
+    payload = memoryview(packet)[MUSE_ATHENA_PACKET_HEADER_SIZE:]
     return packet_index, primary_tag, payload
 
 
 def iter_sensor_blocks(packet):
-    """Yield (tag, package_num, payload) for primary + subpackets."""
+    """Yield (tag, package_num, payload) for primary + subpackets.
+
+    Payloads are memoryview slices of ``packet``; nothing is copied.
+    """
     packet_index, primary_tag, payload = parse_packet_header(packet)
     offset = 0
     remaining = len(payload)
@@ -175,10 +348,9 @@ def iter_sensor_blocks(packet):
         package_num = (packet_index << 8) | block_index
         yield tag, package_num, block_payload
 
-    config = get_sensor_config(primary_tag)
-    if config is not None:
-        _, _, _, _, data_len, variable = config
-        primary_len = remaining if variable else data_len
+    plan = DECODE_PLANS[primary_tag]
+    if plan is not None:
+        primary_len = remaining if plan.variable else plan.data_len
         if primary_len > remaining:
             primary_len = remaining
         block_index = packet[10]
@@ -190,12 +362,11 @@ def iter_sensor_blocks(packet):
     while offset + MUSE_ATHENA_SUBPACKET_HEADER_SIZE <= len(payload):
         tag = payload[offset]
         sub_index = payload[offset + 1]
-        config = get_sensor_config(tag)
-        if config is None:
+        plan = DECODE_PLANS[tag]
+        if plan is None:
             break
-        _, _, _, _, data_len, variable = config
         sub_remaining = len(payload) - offset - MUSE_ATHENA_SUBPACKET_HEADER_SIZE
-        sensor_len = sub_remaining if variable else data_len
+        sensor_len = sub_remaining if plan.variable else plan.data_len
         if sensor_len <= 0 or sensor_len > sub_remaining:
             break
         start = offset + MUSE_ATHENA_SUBPACKET_HEADER_SIZE
@@ -205,52 +376,298 @@ def iter_sensor_blocks(packet):
         offset += MUSE_ATHENA_SUBPACKET_HEADER_SIZE + sensor_len
 
 
-class RLSTimestampCorrector:
-    """Smooth, host-anchored per-sample timestamps for one fixed-rate stream.
+# Output stream -> sensor_type whose corrector timestamps it (acc and gyro
+# share one 0x47 block, so they share one clock).
+STREAM_SENSOR_TYPES = {
+    'eeg': 'eeg',
+    'acc': 'acc_gyro',
+    'gyro': 'acc_gyro',
+    'optics': 'optics',
+}
+SENSOR_RATES = {config[0]: config[3] for config in MUSE_ATHENA_SENSOR_CONFIG.values()}
+STREAM_CHANNELS = {
+    'eeg': MUSE_ATHENA_NB_EEG_CHANNELS,
+    'acc': MUSE_ATHENA_NB_ACC_CHANNELS,
+    'gyro': MUSE_ATHENA_NB_GYRO_CHANNELS,
+    'optics': MUSE_ATHENA_NB_OPTICS_CHANNELS,
+}
+
+
+def _take_back(counters, key, n):
+    counters[key] -= n
+    if not counters[key]:
+        del counters[key]
+
+
+class SequenceTracker:
+    """Per-sensor loss and duplicate accounting from Athena ``package_num``.
+
+    ``package_num`` is ``(packet_index << 8) | block_index``. The 16-bit packet
+    index counts packets across the device, so jumps in it count lost packets.
+    The 8-bit block index is treated as a per-sensor block counter: a jump of
+    k means k - 1 blocks of that sensor were lost. A block repeating the
+    previous ``package_num`` exactly is a duplicate. A packet or block index
+    that moves backwards is counted as out of order and leaves the reference
+    where it is. If it fills a gap of up to ``max_late`` that was already
+    counted as lost, the loss is taken back and the block is dropped: its
+    samples were skipped (or NaN-filled) when the gap was seen. Other
+    backward blocks are passed through unchanged.
+    """
 
-    Maps a monotonic sample index to host time with a recursive-least-squares
-    regression, the same dejittering legacy Muse uses in `_handle_eeg`. Athena
-    multiplexes several streams at different rates, so it keeps one corrector
-    per stream. Each call to `timestamps` consumes the next `n_samples` indices,
-    refits against the packet's host arrival time, and returns the dejittered
-    timestamps for those samples.
+    # Widest gap whose indices are remembered, to recognise late arrivals
+    max_late = 32
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._last_packet = None
+        self._last = {}
+        self._missing_packets: set = set()
+        self._missing: dict = {}
+        self.packets_lost = 0
+        self.blocks_lost = {}
+        self.samples_lost = {}
+        self.duplicates = {}
+        self.out_of_order = {}
+
+    def check(self, sensor_type, package_num, n_samples):
+        """Record one block; return samples missing before it, or None to drop it."""
+        packet_index = package_num >> 8
+        if self._last_packet is None:
+            self._last_packet = packet_index
+        elif packet_index != self._last_packet:
+            delta = (packet_index - self._last_packet) & 0xFFFF
+            if delta < 0x8000:
+                self.packets_lost += delta - 1
+                self._missing_packets = self._skip(
+                    self._missing_packets, self._last_packet, delta, 0xFFFF)
+                self._last_packet = packet_index
+            elif packet_index in self._missing_packets:
+                self._missing_packets.discard(packet_index)
+                self.packets_lost -= 1
+
+        last = self._last.get(sensor_type)
+        if last is None:
+            self._last[sensor_type] = package_num
+            return 0
+        if package_num == last:
+            self.duplicates[sensor_type] = self.duplicates.get(sensor_type, 0) + 1
+            return None
+        block, last_block = package_num & 0xFF, last & 0xFF
+        delta = (block - last_block) & 0xFF
+        missing_blocks = self._missing.get(sensor_type, set())
+        if delta == 0 or delta >= 0x80:
+            self.out_of_order[sensor_type] = self.out_of_order.get(sensor_type, 0) + 1
+            if block not in missing_blocks:
+                return 0
+            missing_blocks.discard(block)
+            _take_back(self.blocks_lost, sensor_type, 1)
+            _take_back(self.samples_lost, sensor_type, n_samples)
+            return None
+        self._last[sensor_type] = package_num
+        self._missing[sensor_type] = self._skip(missing_blocks, last_block, delta, 0xFF)
+        missing = (delta - 1) * n_samples
+        if missing:
+            self.blocks_lost[sensor_type] = self.blocks_lost.get(sensor_type, 0) + delta - 1
+            self.samples_lost[sensor_type] = self.samples_lost.get(sensor_type, 0) + missing
+        return missing
+
+    def _skip(self, missing, last, delta, mask):
+        """``missing`` once the reference moved ``delta`` past index ``last``."""
+        if 1 < delta <= self.max_late + 1:
+            missing.update((last + k) & mask for k in range(1, delta))
+        if not missing:
+            return missing
+        current = (last + delta) & mask
+        return {index for index in missing if (current - index) & mask <= self.max_late}
+
+    def stats(self):
+        """Snapshot of the loss counters."""
+        return {
+            'packets_lost': self.packets_lost,
+            'blocks_lost': dict(self.blocks_lost),
+            'samples_lost': dict(self.samples_lost),
+            'duplicates': dict(self.duplicates),
+            'out_of_order': dict(self.out_of_order),
+        }
+
+
+def decode_notifications(notifications, sensor_types=None, sequences=None):
+    """Decode one BLE notification, or a list of them, in a single pass.
+
+    Consecutive same-tag blocks are concatenated and decoded together, so a
+    notification carrying several packets costs one decode call per tag run.
+
+    Returns ``(streams, battery)``. ``streams`` maps 'eeg' / 'acc' / 'gyro' /
+    'optics' to ``(samples, counts)``: ``samples`` is (n_channels, n_total)
+    float32 in arrival order, and ``counts[i]`` is how many samples
+    notification i contributed (for per-notification timestamping).
+    ``samples`` is None for sensor types left out of ``sensor_types``; their
+    counts are still reported so timestamp correctors keep advancing.
+    ``battery`` is the last battery percent seen, or None.
+
+    With a ``SequenceTracker`` in ``sequences``, duplicate blocks are dropped
+    and lost blocks appear as NaN-filled samples in their place, so counts
+    (and the timestamp correctors they drive) advance over the gap.
+    """
+    if isinstance(notifications, (bytes, bytearray, memoryview)):
+        notifications = [notifications]
+    n_notifications = len(notifications)
+    counts: dict[str, np.ndarray] = {}
+    runs: dict[str, list] = {}
+    battery = None
+    for i, data in enumerate(notifications):
+        for packet in iter_packets(data):
+            for tag, package_num, payload in iter_sensor_blocks(packet):
+                plan = DECODE_PLANS[tag]
+                if plan.sensor_type == 'battery':
+                    pct = decode_battery(payload)
+                    if pct is not None:
+                        battery = pct
+                    continue
+                if plan.decode is None:
+                    continue
+                if len(payload) < plan.data_len:
+                    logger.debug(
+                        '[athena] short block tag=0x%02x len=%d', tag, len(payload),
+                    )
+                    continue
+                sensor_type = plan.sensor_type
+                missing = 0
+                if sequences is not None:
+                    missing = sequences.check(sensor_type, package_num, plan.n_samples)
+                    if missing is None:
+                        continue
+                if sensor_type not in counts:
+                    counts[sensor_type] = np.zeros(n_notifications, dtype=int)
+                counts[sensor_type][i] += missing + plan.n_samples
+                if sensor_types is not None and sensor_type not in sensor_types:
+                    continue
+                sensor_runs = runs.setdefault(sensor_type, [])
+                if missing:
+                    # payloads=None marks a gap, decoded as NaN samples
+                    sensor_runs.append([plan, missing, None])
+                if sensor_runs and sensor_runs[-1][0] is plan and sensor_runs[-1][2] is not None:
+                    sensor_runs[-1][1] += plan.n_samples
+                    sensor_runs[-1][2].append(payload)
+                else:
+                    sensor_runs.append([plan, plan.n_samples, [payload]])
+
+    decoded: dict[str, list] = {}
+    for sensor_runs in runs.values():
+        for plan, n_samples, payloads in sensor_runs:
+            if payloads is None:
+                for name in plan.streams:
+                    decoded.setdefault(name, []).append(
+                        np.full((STREAM_CHANNELS[name], n_samples), np.nan, dtype=np.float32)
+                    )
+                continue
+            # A lone block decodes straight from its view into the notification;
+            # only multi-block runs are joined (one copy per run).
+            payload = payloads[0] if len(payloads) == 1 else b''.join(payloads)
+            for name, samples in plan.decode(payload, n_samples).items():
+                decoded.setdefault(name, []).append(samples)
+
+    streams = {}
+    for name, sensor_type in STREAM_SENSOR_TYPES.items():
+        if sensor_type not in counts:
+            continue
+        parts = decoded.get(name)
+        if parts is None:
+            samples = None
+        elif len(parts) == 1:
+            samples = parts[0]
+        else:
+            samples = np.concatenate(parts, axis=1)
+        streams[name] = (samples, counts[sensor_type])
+    return streams, battery
+
+
+class PacketReorderBuffer:
+    """Bounded reorder window releasing Athena packets in packet-index order.
+
+    DATA_1 and DATA_2 notify independently, so packets can arrive out of order.
+    ``push`` holds packets until the next expected 16-bit packet index shows
+    up, then releases every consecutive packet it has. A missing index is
+    given up on once the oldest held packet has waited ``latency`` seconds or
+    more than ``max_packets`` are held; the loss then shows up downstream in
+    ``SequenceTracker``. Packets older than the release point pass straight
+    through (counted in ``late``). Expiry is checked on each ``push``, which
+    happens every few milliseconds while streaming; once the packets stop,
+    ``flush`` hands over whatever is still held.
     """
 
-    def __init__(self, sampling_rate, time_func):
-        if sampling_rate <= 0:
-            raise ValueError(
-                f'RLSTimestampCorrector: sampling_rate must be > 0, got {sampling_rate}'
-            )
-        self.sampling_rate = sampling_rate
-        self.time_func = time_func
-        self._sample_index = 0
-        self._P = 1e-4
-        # [intercept, slope]: intercept anchors index 0 at the first host time,
-        # slope (~1/rate) is refit each packet to track real clock drift.
-        self.reg_params = np.array([time_func(), 1.0 / sampling_rate])
-
-    def timestamps(self, n_samples, host_time=None):
-        if host_time is None:
-            host_time = self.time_func()
-        idxs = np.arange(n_samples) + self._sample_index
-        self._sample_index += n_samples
-        self._update(idxs[-1], host_time)
-        return self.reg_params[1] * idxs + self.reg_params[0]
-
-    def _update(self, t_source, t_receiver):
-        """Recursive least squares step (see muse.py _update_timestamp_correction)."""
-        t_receiver = t_receiver - self.reg_params[0]
-        P = self._P
-        R = self.reg_params[1]
-        P = P - ((P ** 2) * (t_source ** 2)) / (1 - (P * (t_source ** 2)))
-        R = R + P * t_source * (t_receiver - t_source * R)
-        self.reg_params[1] = R
-        self._P = P
+    def __init__(self, latency, max_packets=32):
+        self.latency = latency
+        self.max_packets = max_packets
+        self.reset()
+
+    def reset(self):
+        self._next: Optional[int] = None
+        self._pending: dict = {}
+        self.late = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, packet, host_time):
+        """Add one packet; return released ``[(packet, host_time), ...]`` in order."""
+        packet_index = struct.unpack_from('<H', packet, 1)[0]
+        if self._next is None:
+            self._next = packet_index
+        ahead = (packet_index - self._next) & 0xFFFF
+        if ahead >= 0x8000 or packet_index in self._pending:
+            self.late += 1
+            return [(packet, host_time), *self.release(host_time)]
+        if ahead == 0 and not self._pending:
+            # in-order fast path: no copy, nothing held
+            self._next = (packet_index + 1) & 0xFFFF
+            return [(packet, host_time)]
+        # Held packets outlive the notification callback, so copy them out of
+        # the backend's buffer.
+        self._pending[packet_index] = (host_time, bytes(packet))
+        return self.release(host_time)
+
+    def release(self, now):
+        """Release in-order packets, skipping a missing head once it expires."""
+        released: list = []
+        if self._next is None:
+            return released
+        while self._pending:
+            if self._next in self._pending:
+                host_time, packet = self._pending.pop(self._next)
+                released.append((packet, host_time))
+                self._next = (self._next + 1) & 0xFFFF
+                continue
+            oldest = min(host_time for host_time, _ in self._pending.values())
+            if len(self._pending) <= self.max_packets and now - oldest < self.latency:
+                break
+            head = min(self._pending, key=lambda index: (index - self._next) & 0xFFFF)
+            self.skipped += (head - self._next) & 0xFFFF
+            self._next = head
+        return released
+
+    def flush(self):
+        """Release everything held, in index order."""
+        released = []
+        while self._pending:
+            released.extend(self.release(float('inf')))
+        return released
+
+
+# Kept under its original name for existing imports.
+RLSTimestampCorrector = TimestampCorrector
 
 
 class Athena:
     """Muse S Athena headband (multiplexed DATA_1/DATA_2 protocol)."""
 
+    model = 'athena'
+    # Per-command reply timeout used by the init and start sequences.
+    command_timeout = MUSE_ATHENA_COMMAND_TIMEOUT
+
     def __init__(
         self,
         address,
@@ -266,6 +683,11 @@ class Athena:
         preset=None,
         disable_light=False,
         low_latency=True,
+        fill_gaps=False,
+        reorder_latency_ms=None,
+        decode_thread=False,
+        trace_every=1,
+        trace_capacity=1024,
     ):
         self.address = address
         self.name = name
@@ -287,14 +709,35 @@ class Athena:
         self.preset = preset or MUSE_ATHENA_DEFAULT_PRESET
         self.disable_light = disable_light
         self.low_latency = low_latency
+        # Emit NaN samples for lost blocks instead of only skipping their indices.
+        self.fill_gaps = fill_gaps
 
         self.device: Any = None
         self.adapter: Any = None
         self.last_timestamp = self.time_func()
+        # Control reply fragments and counters the command handshake waits on.
+        self._control_msg = ''
+        self._replies = 0
+        self._commands_sent = 0
+        self._notifications = 0
         self._battery = 0.0
         # One dejitter corrector per stream (eeg / acc_gyro / optics); each runs
         # at its own rate, created lazily on its first packet.
         self._correctors = {}
+        self.sequences = SequenceTracker()
+        # Optional DATA_1/DATA_2 reorder window; None decodes in arrival order.
+        self._reorder = None
+        if reorder_latency_ms is not None:
+            self._reorder = PacketReorderBuffer(reorder_latency_ms / 1000.0)
+        # The window is pushed to from the BLE (or decode) thread and flushed
+        # from the caller's by disconnect() and restarts.
+        self._reorder_lock = threading.Lock()
+        # Raw notification trace; costs nothing unless DEBUG or capture is on.
+        self.packet_trace = PacketTrace(logger, trace_every, trace_capacity)
+        # Optional decode thread: the notify callback then only enqueues bytes.
+        self._worker = None
+        if decode_thread:
+            self._worker = DecodeWorker(self._process_notifications)
 
     def stream_descriptors(self):
         """LSL stream shapes for Athena."""
@@ -318,26 +761,30 @@ class Athena:
         ]
         return descs
 
-    def connect(self, interface=None, retries=0):
-        """Connect, subscribe control + DATA_1 + DATA_2, run init command sequence."""
+    def connect(self, interface=None, retries=0, adapter=None, device=None):
+        """Connect, subscribe control + DATA_1 + DATA_2, run init command sequence.
+
+        Pass a started ``adapter`` to connect with it instead of opening one,
+        and also ``device`` to take over an already connected link (see
+        devices._AutoSelectingDevice).
+        """
         try:
-            logger.info(
-                'Connecting to %s: %s...',
-                self.name if self.name else 'Muse Athena',
-                self.address,
-            )
-            if self.backend == 'gatt':
-                self.interface = self.interface or interface or 'hci0'
-                self.adapter = pygatt.GATTToolBackend(self.interface)
-            elif self.backend == 'bleak':
-                self.adapter = backends.BleakBackend()
-            else:
-                self.adapter = pygatt.BGAPIBackend(serial_port=self.interface or interface)
-
-            self.adapter.start()
-            device = self.adapter.connect(self.address, retries, self.name)
             if device is None:
-                return False
+                logger.info(
+                    'Connecting to %s: %s...',
+                    self.name if self.name else 'Muse Athena',
+                    self.address,
+                )
+                if adapter is None:
+                    self.interface = self.interface or interface
+                    if self.backend == 'gatt':
+                        self.interface = self.interface or 'hci0'
+                    adapter = backends.open_adapter(self.backend, self.interface)
+                self.adapter = adapter
+                device = self.adapter.connect(self.address, retries, self.name)
+                if device is None:
+                    return False
+            self.adapter = adapter
             self.device = device
 
             if not self._has_athena_data_char():
@@ -351,7 +798,7 @@ class Athena:
             self._subscribe_data()
 
             if self.disable_light:
-                self._write_cmd_str('L0')
+                self._command('L0')
 
             self._run_init_sequence()
             print('[athena] Headband setup complete.')
@@ -368,6 +815,8 @@ class Athena:
         return True
 
     def _subscribe_control(self):
+        # replies still owed on a previous link will not come
+        self._commands_sent = self._replies
         self.device.subscribe(MUSE_ATHENA_GATT_CONTROL, callback=self._handle_control)
 
     def _subscribe_data(self):
@@ -382,12 +831,40 @@ class Athena:
 
     def _write_cmd_str(self, cmd):
         logger.debug('[athena] -> cmd %r', cmd)
+        # every command is answered, whether or not anything waits for it
+        self._commands_sent += 1
         self._write_cmd([len(cmd) + 1, *(ord(c) for c in cmd), ord('\n')])
 
+    def _command(self, cmd, until_data=False):
+        """Send ``cmd`` and wait for its control reply, at most ``command_timeout``.
+
+        Replies come in command order, so ``cmd`` is acknowledged by the reply
+        following those of the commands sent before it; a late reply to an
+        earlier command that timed out is not taken for its own. With
+        ``until_data`` the first DATA notification after sending also counts
+        as the acknowledgement. Returns False on timeout; the sequence carries
+        on regardless, as it did with fixed sleeps.
+        """
+        replies, notifications = self._replies, self._notifications
+        self._write_cmd_str(cmd)
+        expected = self._commands_sent
+        deadline = monotonic() + self.command_timeout
+        while self._replies < expected:
+            if until_data and self._notifications != notifications:
+                return True
+            if monotonic() >= deadline:
+                logger.debug('[athena] no reply to %r within %.2fs', cmd, self.command_timeout)
+                if self._replies != replies:
+                    # replies do arrive, so an earlier one was lost: stop waiting for it
+                    self._commands_sent = self._replies
+                return False
+            # backends.sleep pumps the Bleak event loop that delivers replies
+            backends.sleep(0.005)
+        return True
+
     def _run_init_sequence(self):
         for cmd in ('v6', 's', 'h', self._normalize_preset(self.preset), 's'):
-            self._write_cmd_str(cmd)
-            sleep(0.2)
+            self._command(cmd)
 
     def _normalize_preset(self, preset):
         preset = str(preset)
@@ -406,15 +883,25 @@ class Athena:
 
     def start(self):
         self._reset_timestamps()
-        self._write_cmd_str('dc001')
-        sleep(0.05)
-        self._write_cmd_str('dc001')
+        self._start_streaming()
+
+    def restart(self):
+        """Start streaming again after a reconnect.
+
+        Unlike start(), the timestamp correctors keep their fitted rate and
+        re-anchor on the next packet, so timestamps carry on across the gap.
+        """
+        self._reset_timestamps(reanchor=True)
+        self._start_streaming()
+
+    def _start_streaming(self):
+        if self._worker is not None:
+            self._worker.start()
+        self._command('dc001', until_data=True)
+        self._command('dc001', until_data=True)
         if self.low_latency:
-            sleep(0.1)
-            self._write_cmd_str('L1')
-        sleep(0.3)
-        self._write_cmd_str('s')
-        sleep(0.2)
+            self._command('L1')
+        self._command('s')
 
     def stop(self):
         self._write_cmd_str('h')
@@ -422,22 +909,126 @@ class Athena:
     def refresh_subscriptions(self):
         """No-op: Athena always notifies on DATA_1/DATA_2 once connected."""
 
-    def disconnect(self):
+    def disconnect(self, stop_adapter=True):
+        """Disconnect; ``stop_adapter=False`` leaves a shared adapter running."""
+        if self._worker is not None:
+            self._worker.stop()
         if self.device:
             self.device.disconnect()
-        if self.adapter:
+        self._flush_reorder()
+        if self.adapter and stop_adapter:
             self.adapter.stop()
 
-    def _reset_timestamps(self):
-        self._correctors = {}
+    def _flush_reorder(self):
+        """Decode and dispatch the packets the reorder window still holds."""
+        if self._reorder is None:
+            return
+        with self._reorder_lock:
+            released = self._reorder.flush()
+            if released:
+                self._decode_and_dispatch(
+                    [packet for packet, _ in released], [host_time for _, host_time in released])
+
+    def _reset_timestamps(self, reanchor=False):
+        # packets held from before the reset still carry the old timing
+        self._flush_reorder()
+        if reanchor:
+            for corrector in self._correctors.values():
+                corrector.reanchor()
+        else:
+            self._correctors = {}
+        self.sequences.reset()
+        if self._reorder is not None:
+            self._reorder.reset()
+
+    def loss_stats(self):
+        """Packet/block loss, duplicate and out-of-order counters since start()."""
+        return self.sequences.stats()
+
+    def timestamp_stats(self):
+        """Timestamp fit residual statistics per sensor type, in seconds."""
+        return {sensor_type: corrector.stats() for sensor_type, corrector in self._correctors.items()}
+
+    def worker_stats(self):
+        """Decode-thread queue depth/drop counters, or None without ``decode_thread``."""
+        if self._worker is None:
+            return None
+        return self._worker.stats()
 
     def _corrector(self, sensor_type, sampling_rate):
         corrector = self._correctors.get(sensor_type)
         if corrector is None:
-            corrector = RLSTimestampCorrector(sampling_rate, self.time_func)
+            corrector = TimestampCorrector(sampling_rate, self.time_func)
             self._correctors[sensor_type] = corrector
         return corrector
 
+    def _decoded_sensor_types(self):
+        sensor_types = set()
+        if self.enable_eeg:
+            sensor_types.add('eeg')
+        if self.enable_acc or self.enable_gyro:
+            sensor_types.add('acc_gyro')
+        if self.enable_optics:
+            sensor_types.add('optics')
+        return sensor_types
+
+    def decode_batch(self, notifications, host_times=None):
+        """Decode and timestamp notifications -> {stream: (samples, timestamps)}.
+
+        ``notifications`` is one BLE notification or a list of them;
+        ``host_times`` gives each one's arrival time (default: now). Every
+        stream gets one stacked sample array and one timestamp array, with
+        samples for streams whose callback is disabled left as None. Samples
+        lost to sequence gaps are kept as NaN only when ``fill_gaps`` is set.
+        """
+        if isinstance(notifications, (bytes, bytearray, memoryview)):
+            notifications = [notifications]
+        if host_times is None:
+            host_times = [self.time_func()] * len(notifications)
+        streams, battery = decode_notifications(
+            notifications, self._decoded_sensor_types(), self.sequences,
+        )
+        if battery is not None:
+            self._battery = battery
+
+        clocks: dict[str, np.ndarray] = {}
+        batch = {}
+        for name, (samples, counts) in streams.items():
+            sensor_type = STREAM_SENSOR_TYPES[name]
+            timestamps = clocks.get(sensor_type)
+            if timestamps is None:
+                corrector = self._corrector(sensor_type, SENSOR_RATES[sensor_type])
+                timestamps = corrector.timestamps_batch(counts, host_times)
+                clocks[sensor_type] = timestamps
+                # Dejittered host timestamps, so this doubles as the liveness
+                # watchdog clock (stream.py) — same as legacy Muse._handle_eeg.
+                self.last_timestamp = float(timestamps[-1])
+            if samples is not None and not self.fill_gaps:
+                # Gap samples decode as NaN (real samples never do); their
+                # indices still advanced the corrector, so only drop them here.
+                keep = ~np.isnan(samples[0])
+                if not keep.all():
+                    batch[name] = (samples[:, keep], timestamps[keep])
+                    continue
+            batch[name] = (samples, timestamps)
+        return batch
+
+    def _dispatch_batch(self, batch):
+        """Invoke each enabled stream callback once for a decoded batch."""
+        if logger.isEnabledFor(logging.DEBUG):
+            for name, (samples, timestamps) in batch.items():
+                logger.debug(
+                    '[athena] %s n=%d ts=%.3f', name, len(timestamps), timestamps[-1],
+                )
+        if 'eeg' in batch and self.enable_eeg:
+            self.callback_eeg(*batch['eeg'])
+        if 'acc' in batch and self.enable_acc:
+            self.callback_acc(*batch['acc'])
+        if 'gyro' in batch and self.enable_gyro:
+            self.callback_gyro(*batch['gyro'])
+        if 'optics' in batch and self.enable_optics:
+            self.callback_optics(*batch['optics'])
+
     def _handle_data(self, handle, data):
         """BLE notify callback: demux length-prefixed packets by sensor tag.
 
@@ -446,73 +1037,65 @@ class Athena:
             [len][idx_lo][idx_hi][---header---][tag][idx2][payload...][sub hdr+payload]*
 
         Primary block uses 14-byte header; optional 5-byte subpacket headers follow.
-        Each packet is host-timestamped once on arrival.
+        The whole notification is host-timestamped once on arrival and decoded
+        as one batch, so each stream callback fires at most once per notification.
+        With ``reorder_latency_ms`` set, packets first pass through a
+        ``PacketReorderBuffer`` and are decoded in packet-index order. With
+        ``decode_thread`` set, the notification is only timestamped and queued
+        here; a ``DecodeWorker`` thread decodes and dispatches in batches.
         """
         # ponytail: exceptions raised in a Bleak notify callback are swallowed by
         # asyncio, so wrap + log or a decode bug looks identical to "no data arriving".
         try:
-            logger.debug(
-                '[athena] notify handle=0x%04x len=%d data=%s',
-                handle, len(data), bytes(data).hex(),
-            )
-            packets = split_packets(data)
-            if not packets:
-                logger.debug('[athena] notify produced no framed packets (len=%d)', len(data))
-            for packet in packets:
-                host_time = self.time_func()
-                for tag, _package_num, payload in iter_sensor_blocks(packet):
-                    logger.debug(
-                        '[athena] block tag=0x%02x payload_len=%d', tag, len(payload),
-                    )
-                    self._parse_payload(tag, host_time, payload)
+            self._notifications += 1
+            host_time = self.time_func()
+            self.packet_trace.record(handle, data, host_time)
+            if self._worker is not None:
+                if not self._worker.put(data, host_time):
+                    logger.debug('[athena] decode queue full, dropped notification')
+                return
+            self._process_notifications([data], [host_time])
         except Exception:
             logger.exception('[athena] exception in _handle_data (handle=0x%04x)', handle)
 
-    def _parse_payload(self, tag, host_time, data):
-        config = get_sensor_config(tag)
-        if config is None:
-            return
-        sensor_type, n_channels, n_samples, rate, _data_len, _variable = config
-
-        if sensor_type == 'unknown':
+    def _process_notifications(self, notifications, host_times):
+        """Reorder (optional), decode and dispatch a list of notifications."""
+        if self._reorder is None:
+            self._decode_and_dispatch(notifications, host_times)
             return
-
-        if sensor_type == 'battery':
-            pct = decode_battery(data)
-            if pct is not None:
-                self._battery = pct
-            return
-
-        timestamps = self._corrector(sensor_type, rate).timestamps(n_samples, host_time)
-        # Dejittered host timestamps, so this doubles as the liveness watchdog
-        # clock (stream.py) — same as legacy Muse._handle_eeg.
-        self.last_timestamp = float(timestamps[-1])
-        logger.debug(
-            '[athena] %s tag=0x%02x n=%d ts=%.3f', sensor_type, tag, n_samples,
-            self.last_timestamp,
-        )
-
-        if sensor_type == 'eeg' and self.enable_eeg:
-            # Tag 0x11 packs 4 channels, 0x12 packs 8 (first 4 are TP9/AF7/AF8/TP10,
-            # the rest are aux). Decode all n_channels for correct 14-bit offsets,
-            # then push only the 4 the outlet expects (mirrors BrainFlow PR #779).
-            samples = decode_eeg(data, n_channels, n_samples)
-            self.callback_eeg(samples[:MUSE_ATHENA_NB_EEG_CHANNELS], timestamps)
-
-        elif sensor_type == 'acc_gyro':
-            acc, gyro = decode_acc_gyro(data, n_samples)
-            if self.enable_acc:
-                self.callback_acc(acc, timestamps)
-            if self.enable_gyro:
-                self.callback_gyro(gyro, timestamps)
-
-        elif sensor_type == 'optics' and self.enable_optics:
-            samples = decode_optics(data, tag, n_channels, n_samples)
-            self.callback_optics(samples, timestamps)
+        with self._reorder_lock:
+            released = []
+            for data, host_time in zip(notifications, host_times):
+                for packet in iter_packets(data):
+                    released.extend(self._reorder.push(packet, host_time))
+            if released:
+                self._decode_and_dispatch(
+                    [packet for packet, _ in released], [host_time for _, host_time in released])
+
+    def _decode_and_dispatch(self, notifications, host_times):
+        batch = self.decode_batch(notifications, host_times)
+        if not batch:
+            logger.debug('[athena] %d notifications produced no sensor samples', len(notifications))
+        self._dispatch_batch(batch)
 
     def _handle_control(self, handle, packet):
+        """Control notifications: fragments of a JSON reply, one per command.
+
+        Each fragment goes to ``callback_control``; a fragment ending in '}'
+        completes the reply, which releases the command waiting in ``_command``.
+        """
         n_incoming = packet[0]
         message = bytes(packet[1:1 + n_incoming]).decode('ascii', errors='replace')
         logger.debug('[athena] control reply: %r', message)
+        self._control_msg += message
+        if message.endswith('}'):
+            reply, self._control_msg = self._control_msg, ''
+            try:
+                rc = json.loads(reply).get('rc', 0)
+            except (ValueError, AttributeError):
+                rc = 0
+            if rc != 0:
+                logger.warning('[athena] command rejected: %s', reply)
+            self._replies += 1
         if self.enable_control and self.callback_control:
             self.callback_control(message)
@@ -1,8 +1,10 @@
 import asyncio
 import atexit
 import sys
+import threading
 import time
 from typing import Any
+import pygatt
 try:
     import bleak
 except ModuleNotFoundError as error:
@@ -11,6 +13,7 @@ except ModuleNotFoundError as error:
 from .constants import RETRY_SLEEP_TIMEOUT
 
 _loop = None
+_loop_thread = None
 
 def _get_event_loop():
     global _loop
@@ -20,14 +23,84 @@ def _get_event_loop():
     return _loop
 
 def _wait(coroutine):
-    return _get_event_loop().run_until_complete(coroutine)
+    loop = _get_event_loop()
+    if loop.is_running():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            if asyncio.iscoroutine(coroutine):
+                coroutine.close()
+            raise RuntimeError(
+                'backends: blocking BLE call from a task on the backend event loop; '
+                'run it in an executor instead'
+            )
+        # the loop is driven by another thread (e.g. a Supervisor): submit to it
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+    return loop.run_until_complete(coroutine)
+
+def start_loop_thread():
+    """Run the backend event loop on a daemon thread of its own.
+
+    BLE notifications are then delivered as they arrive, whatever the calling
+    thread is busy with; blocking calls (writes, subscriptions, connects) are
+    submitted to the loop thread and wait for their result. Call it before
+    connecting. Returns the loop.
+    """
+    global _loop_thread
+    loop = _get_event_loop()
+    if loop_thread_running():
+        return loop
+    if loop.is_running():
+        raise RuntimeError('backends: the event loop is already running in this thread')
+    started = threading.Event()
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+    _loop_thread = threading.Thread(target=run, name='muselsl-ble', daemon=True)
+    _loop_thread.start()
+    started.wait()
+    atexit.register(stop_loop_thread)
+    return loop
+
+def stop_loop_thread():
+    """Stop the loop thread; the loop is driven by callers again afterwards."""
+    global _loop_thread
+    loop, thread = _loop, _loop_thread
+    if loop is None or thread is None or not thread.is_alive():
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    _loop_thread = None
+
+def loop_thread_running():
+    return _loop_thread is not None and _loop_thread.is_alive()
 
 def sleep(seconds):
     time.sleep(seconds)
 
+def open_adapter(backend, interface=None, connect_timeout=30.0, services=None):
+    """Create and start the adapter for a resolved backend name.
+
+    connect_timeout and services (GATT service UUIDs to discover, None for
+    all) only apply to the bleak backend.
+    """
+    if backend == 'gatt':
+        adapter = pygatt.GATTToolBackend(interface or 'hci0')
+    elif backend == 'bleak':
+        adapter = BleakBackend(connect_timeout, services)
+    else:
+        adapter = pygatt.BGAPIBackend(serial_port=interface)
+    adapter.start()
+    return adapter
+
 class BleakBackend:
-    def __init__(self):
+    def __init__(self, connect_timeout=30.0, services=None):
         self.connected = set()
+        self.connect_timeout = connect_timeout
+        self.services = services
         atexit.register(self.stop)
         # run the event loop when sleeping
         global sleep
@@ -35,23 +108,66 @@ class BleakBackend:
     def start(self):
         pass
     def pump(self, seconds=1):
-        _wait(asyncio.sleep(seconds))
+        if loop_thread_running():
+            # the loop thread delivers notifications on its own
+            time.sleep(seconds)
+        else:
+            _wait(asyncio.sleep(seconds))
     def stop(self):
         for device in [*self.connected]:
             device.disconnect()
     def scan(self, timeout=10):
-        if isinstance(bleak, ModuleNotFoundError):
-            raise bleak
         start = time.monotonic()
         print(f'[0.0s] Scanning for BLE devices ({timeout}s)...')
-        devices = _wait(bleak.BleakScanner.discover(timeout))
+        devices = {}
+        for device in self.iter_scan(timeout):
+            devices[device['address']] = device
         print(f'[{time.monotonic() - start:.1f}s] Scan complete, {len(devices)} devices found.')
-        return [{'name':device.name, 'address':device.address} for device in devices]
+        return list(devices.values())
+    def iter_scan(self, timeout=10):
+        """Yield {'name', 'address'} as advertisements arrive, for up to timeout s.
+
+        A device is yielded when first seen and again if its name only shows
+        up in a later advertisement. Stop iterating (or close the generator)
+        to end the scan early.
+        """
+        if isinstance(bleak, ModuleNotFoundError):
+            raise bleak
+        detected = []
+        def on_detect(device, advertisement):
+            detected.append((device.address, advertisement.local_name or device.name))
+        scanner = bleak.BleakScanner(detection_callback=on_detect)
+        names: dict = {}
+        deadline = time.monotonic() + timeout
+        _wait(scanner.start())
+        try:
+            while True:
+                while detected:
+                    address, name = detected.pop(0)
+                    if address in names and (names[address] or not name):
+                        continue
+                    names[address] = name
+                    yield {'name': name, 'address': address}
+                if time.monotonic() >= deadline:
+                    return
+                _wait(asyncio.sleep(min(0.05, max(0.0, deadline - time.monotonic()))))
+        finally:
+            _wait(scanner.stop())
     def connect(self, address, retries, name=None):
         result = BleakDevice(self, address, name=name)
         if not result.connect(retries):
             return None
         return result
+    def connect_many(self, targets, retries):
+        """Connect ``[(address, name), ...]`` concurrently on the shared loop.
+
+        Returns one connected device per target, or None where it failed.
+        """
+        devices = [BleakDevice(self, address, name=name) for address, name in targets]
+        async def connect_all():
+            return await asyncio.gather(*(d.connect_async(retries) for d in devices))
+        connected = _wait(connect_all())
+        return [d if ok else None for d, ok in zip(devices, connected)]
 
 class BleakDevice:
     def __init__(self, adapter, address, name=None):
@@ -59,25 +175,30 @@ class BleakDevice:
         self._address = address
         self._name = name
         self._client: Any = None
+        self._disconnect_callbacks: list = []
 
     def _elapsed(self, start):
         return time.monotonic() - start
 
-    def _refresh_address(self, start):
+    async def _refresh_address(self, start):
         if not self._name:
             return
         print(f'[{self._elapsed(start):.1f}s] Scanning for {self._name}...')
-        devices = _wait(bleak.BleakScanner.discover(5.0))
-        for device in devices:
-            if device.name and self._name in device.name:
-                if device.address != self._address:
-                    print(f'[{self._elapsed(start):.1f}s] Updated address: {device.address}')
-                self._address = device.address
-                return
-        print(f'[{self._elapsed(start):.1f}s] {self._name} not seen during scan')
+        # the blocking iter_scan() cannot run inside connect_async() on the loop
+        device = await bleak.BleakScanner.find_device_by_filter(
+            lambda d, ad: self._name in ((ad.local_name or d.name) or ''), timeout=5.0)
+        if device is None:
+            print(f'[{self._elapsed(start):.1f}s] {self._name} not seen during scan')
+            return
+        if device.address != self._address:
+            print(f'[{self._elapsed(start):.1f}s] Updated address: {device.address}')
+        self._address = device.address
 
     # Use retries=-1 to continue attempting to reconnect forever
     def connect(self, retries):
+        return _wait(self.connect_async(retries))
+
+    async def connect_async(self, retries):
         start = time.monotonic()
         attempts = 1
         connect_errors = (
@@ -90,20 +211,23 @@ class BleakDevice:
             if attempts == 1:
                 print(f'[{self._elapsed(start):.1f}s] Connecting to {self._address}...')
             else:
-                self._refresh_address(start)
+                await self._refresh_address(start)
                 print(f'[{self._elapsed(start):.1f}s] Connection attempt {attempts}...')
-            client = bleak.BleakClient(self._address, timeout=30.0)
+            options = {'services': self._adapter.services} if self._adapter.services else {}
+            client = bleak.BleakClient(
+                self._address, disconnected_callback=self._on_disconnected,
+                timeout=self._adapter.connect_timeout, **options)
             try:
-                _wait(client.connect())
+                await client.connect()
             except connect_errors as err:
                 print(f'[{self._elapsed(start):.1f}s] Failed to connect: {err}', file=sys.stderr)
                 try:
-                    _wait(client.disconnect())
+                    await client.disconnect()
                 except Exception:
                     pass
                 if attempts == 1 + retries:
                     return False
-                sleep(RETRY_SLEEP_TIMEOUT)
+                await asyncio.sleep(RETRY_SLEEP_TIMEOUT)
                 attempts += 1
             else:
                 print(f'[{self._elapsed(start):.1f}s] BLE connected.')
@@ -111,9 +235,21 @@ class BleakDevice:
                 break
         self._adapter.connected.add(self)
         return True
+    def register_disconnect_callback(self, callback):
+        """Call ``callback(event)`` when the link drops, as pygatt devices do."""
+        self._disconnect_callbacks.append(callback)
+    def remove_disconnect_callback(self, callback):
+        if callback in self._disconnect_callbacks:
+            self._disconnect_callbacks.remove(callback)
+    def _on_disconnected(self, client):
+        if client is not self._client:
+            return
+        for callback in [*self._disconnect_callbacks]:
+            callback({'address': self._address})
     def disconnect(self):
         _wait(self._client.disconnect())
-        self._adapter.connected.remove(self)
+        # stopping a shared adapter may already have disconnected this device
+        self._adapter.connected.discard(self)
     # Characteristics have two handles: the declaration handle and the value handle.
     # Pygatt seems to use the value handle, which appears less common.  Bleak uses the
     # declaration handle used by d-bus.
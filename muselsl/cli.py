@@ -1,7 +1,7 @@
 #!/usr/bin/python
 import sys
 import argparse
-from .constants import LOG_LEVELS
+from .constants import LOG_LEVELS, LSL_MAX_CHUNK_LATENCY
 from .helper import configure_logging
 
 
@@ -53,15 +53,18 @@ class CLI:
             "--address",
             dest="address",
             type=str,
+            nargs='+',
             default=None,
-            help="Device MAC address.")
+            help="Device MAC address. Give several to stream multiple headsets at once.")
         parser.add_argument(
             "-n",
             "--name",
             dest="name",
             type=str,
+            nargs='+',
             default=None,
-            help="Name of the device.")
+            help="Name of the device. Give several to stream multiple headsets at once; "
+                 "with -a, one name per address.")
         parser.add_argument(
             "-b",
             "--backend",
@@ -142,14 +145,80 @@ class CLI:
             choices=('auto', 'athena', 'legacy'),
             help='Headset protocol: auto (probe GATT), athena (Gen 3), or legacy',
         )
+        parser.add_argument(
+            '--no-registry',
+            dest='use_registry',
+            action='store_false',
+            help="Don't try previously used devices (and their model/preset) before scanning, "
+                 "nor record this one")
+        parser.add_argument(
+            '--max-latency',
+            dest='max_latency',
+            type=float,
+            default=LSL_MAX_CHUNK_LATENCY,
+            help='Longest time in seconds samples are held back to fill an LSL chunk '
+                 '(0 pushes every BLE packet as it arrives)')
+        parser.add_argument(
+            '--reconnect',
+            dest='reconnect',
+            type=int,
+            default=0,
+            help='How many times to reconnect a headset that drops, keeping its LSL streams '
+                 'open (-1 to keep trying forever)')
+        parser.add_argument(
+            '--ble-thread',
+            dest='ble_thread',
+            action='store_true',
+            help='Run the Bluetooth event loop on its own thread, so notifications are '
+                 'delivered on time while this process is busy')
+        parser.add_argument(
+            '--fill-gaps',
+            dest='fill_gaps',
+            action='store_true',
+            help='Athena only: fill samples lost in BLE gaps with NaN so the streams keep '
+                 'their nominal rate')
+        parser.add_argument(
+            '--reorder-latency',
+            dest='reorder_latency_ms',
+            type=float,
+            default=None,
+            help='Athena only: longest time in milliseconds to hold out-of-order packets '
+                 'back to restore their order (default: no reordering)')
+        parser.add_argument(
+            '--decode-thread',
+            dest='decode_thread',
+            action='store_true',
+            help='Athena only: decode packets on a worker thread instead of in the '
+                 'Bluetooth callback')
+        parser.add_argument(
+            '--trace-every',
+            dest='trace_every',
+            type=int,
+            default=1,
+            help='Athena only: trace the raw bytes of one in this many notifications '
+                 '(logged at debug level, and kept for --trace-dump)')
+        parser.add_argument(
+            '--trace-dump',
+            dest='trace_dump',
+            type=str,
+            default=None,
+            help='Athena only: keep the raw packet trace and append it to this file when '
+                 'the stream ends, or on SIGUSR1 while streaming')
 
         args = parser.parse_args(sys.argv[2:])
         configure_logging(LOG_LEVELS[args.log_level])
         from . import stream
 
-        stream(args.address, args.backend, args.interface, args.name, args.ppg,
+        # a single -a/-n value keeps the single-headset stream
+        address = args.address[0] if args.address and len(args.address) == 1 else args.address
+        name = args.name[0] if args.name and len(args.name) == 1 else args.name
+        stream(address, args.backend, args.interface, name, args.ppg,
                args.acc, args.gyro, args.optics, args.disable_eeg, args.preset,
-               args.disable_light, args.lsl_time, args.retries, args.model)
+               args.disable_light, args.lsl_time, args.retries, args.model,
+               args.use_registry, args.max_latency, reconnect=args.reconnect,
+               ble_thread=args.ble_thread, fill_gaps=args.fill_gaps,
+               reorder_latency_ms=args.reorder_latency_ms, decode_thread=args.decode_thread,
+               trace_every=args.trace_every, trace_dump=args.trace_dump)
 
     def record(self):
         parser = argparse.ArgumentParser(
@@ -234,12 +303,18 @@ class CLI:
             type=str,
             default=None,
             help="Name of the recording file.")
+        parser.add_argument(
+            '--ble-thread',
+            dest='ble_thread',
+            action='store_true',
+            help='Run the Bluetooth event loop on its own thread, so notifications are '
+                 'delivered on time while this process is busy')
         _add_log_arg(parser)
         args = parser.parse_args(sys.argv[2:])
         configure_logging(LOG_LEVELS[args.log_level])
         from . import record_direct
         record_direct(args.duration, args.address, args.filename, args.backend,
-                      args.interface, args.name)
+                      args.interface, args.name, args.ble_thread)
 
     def view(self):
         parser = argparse.ArgumentParser(
@@ -20,6 +20,7 @@ LSL_GYRO_CHUNK = 1
 # 00001801-0000-1000-8000-00805f9b34fb Generic Attribute 0x01-0x04
 MUSE_GATT_ATTR_SERVICECHANGED = '00002a05-0000-1000-8000-00805f9b34fb' # ble std 0x02-0x04
 # 0000fe8d-0000-1000-8000-00805f9b34fb Interaxon Inc. 0x0c-0x42
+MUSE_GATT_SERVICE = '0000fe8d-0000-1000-8000-00805f9b34fb'
 MUSE_GATT_ATTR_STREAM_TOGGLE = '273e0001-4c4d-454d-96be-f03bac821358' # serial 0x0d-0x0f
 MUSE_GATT_ATTR_LEFTAUX = '273e0002-4c4d-454d-96be-f03bac821358' # not implemented yet 0x1c-0x1e
 MUSE_GATT_ATTR_TP9 = '273e0003-4c4d-454d-96be-f03bac821358' # 0x1f-0x21
@@ -39,6 +40,8 @@ MUSE_GATT_ATTR_PPG2 = "273e0010-4c4d-454d-96be-f03bac821358" # infrared 0x3a-0x3
 MUSE_GATT_ATTR_PPG3 = "273e0011-4c4d-454d-96be-f03bac821358" # red 0x3d-0x3f
 MUSE_GATT_ATTR_THERMISTOR = "273e0012-4c4d-454d-96be-f03bac821358" # muse S only, not implemented yet 0x40-0x42
 
+# 12 bits on a 2 mVpp range
+MUSE_EEG_SCALE_FACTOR = 0.48828125
 MUSE_ACCELEROMETER_SCALE_FACTOR = 0.0000610352
 MUSE_GYRO_SCALE_FACTOR = 0.0074768
 
@@ -46,11 +49,24 @@ MUSE_GYRO_SCALE_FACTOR = 0.0074768
 LIST_SCAN_TIMEOUT = 10.5
 # How long to wait after device stops sending data before ending the stream
 AUTO_DISCONNECT_DELAY = 3
+# How often record_direct asks a legacy Muse to keep streaming
+MUSE_KEEP_ALIVE_INTERVAL = 10
 # How long to wait in between connection attempts
 RETRY_SLEEP_TIMEOUT = 1
+# Longest wait between reconnect attempts after a stream dropped
+RECONNECT_MAX_BACKOFF = 30
+# How long to try a device from the registry before falling back to a scan
+KNOWN_DEVICE_CONNECT_TIMEOUT = 5
+# How many registry entries (newest first) to try before falling back to a scan
+KNOWN_DEVICE_ATTEMPTS = 1
+# How long a legacy EEG/PPG block waits for its remaining channel packets
+# before it is emitted with the missing channels NaN-filled
+MUSE_BLOCK_DEADLINE = 0.1
 
 LSL_SCAN_TIMEOUT = 5
 LSL_BUFFER = 360
+# Longest time samples wait in stream() to fill an LSL chunk before being pushed
+LSL_MAX_CHUNK_LATENCY = 0.05
 
 VIEW_SUBSAMPLE = 2
 VIEW_BUFFER = 12
@@ -78,6 +94,8 @@ MUSE_ATHENA_OPTICS_SCALE = 1.0
 MUSE_ATHENA_BATTERY_SCALE = 1.0 / 512.0  # percent; matches BrainFlow (1/256 over-read 2x)
 
 MUSE_ATHENA_DEFAULT_PRESET = 'p1041'
+# Longest wait for a control reply (or, after dc001, for data) per command
+MUSE_ATHENA_COMMAND_TIMEOUT = 0.5
 MUSE_ATHENA_VALID_PRESETS = frozenset({
     'p20', 'p21', 'p50', 'p51', 'p60', 'p61',
     'p1034', 'p1035', 'p1041', 'p1042', 'p1043', 'p1044', 'p1045', 'p1046',
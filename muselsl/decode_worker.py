@@ -0,0 +1,160 @@
+"""Decode BLE notifications off the notify callback on a worker thread.
+
+The notify callback only copies the raw bytes and their host arrival time
+into a preallocated ring of fixed-size slots; a worker thread drains the ring
+in batches and hands them to a handler that decodes and pushes. The BLE
+event loop then never waits on NumPy or LSL work.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationRing:
+    """Single-producer / single-consumer ring of fixed-size notification slots.
+
+    The producer only advances ``_write`` and the consumer only advances
+    ``_read``; each is a plain int assignment, so no lock is needed. When the
+    ring is full, new notifications are dropped (and counted) rather than
+    overwriting slots the consumer may still be reading.
+    """
+
+    def __init__(self, n_slots=256, slot_size=512):
+        if n_slots <= 0 or slot_size <= 0:
+            raise ValueError(
+                f'NotificationRing: n_slots and slot_size must be > 0, got {n_slots}, {slot_size}'
+            )
+        self.n_slots = n_slots
+        self.slot_size = slot_size
+        self._buffer = bytearray(n_slots * slot_size)
+        self._view = memoryview(self._buffer)
+        self._lengths = [0] * n_slots
+        self._host_times = [0.0] * n_slots
+        self._write = 0
+        self._read = 0
+        self.dropped = 0
+        self.oversized = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._write - self._read
+
+    def put(self, data, host_time):
+        """Copy one notification into the next free slot; False if dropped."""
+        size = len(data)
+        if size > self.slot_size:
+            self.oversized += 1
+            return False
+        depth = self._write - self._read
+        if depth >= self.n_slots:
+            self.dropped += 1
+            return False
+        slot = self._write % self.n_slots
+        start = slot * self.slot_size
+        self._view[start:start + size] = data
+        self._lengths[slot] = size
+        self._host_times[slot] = host_time
+        self._write += 1
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+        return True
+
+    def peek(self, max_items):
+        """Return ``(views, host_times)`` for up to ``max_items`` queued slots.
+
+        Views alias the ring; they stay valid until ``consume`` releases them.
+        """
+        start = self._read
+        stop = min(self._write, start + max_items)
+        views = []
+        host_times = []
+        for i in range(start, stop):
+            slot = i % self.n_slots
+            offset = slot * self.slot_size
+            views.append(self._view[offset:offset + self._lengths[slot]])
+            host_times.append(self._host_times[slot])
+        return views, host_times
+
+    def consume(self, n_items):
+        self._read += n_items
+
+
+class DecodeWorker:
+    """Thread draining a ``NotificationRing`` into ``handler(views, host_times)``."""
+
+    def __init__(self, handler, n_slots=256, slot_size=512, max_batch=32, name='muselsl-decode'):
+        self.ring = NotificationRing(n_slots, slot_size)
+        self.max_batch = max_batch
+        self.name = name
+        self.batches = 0
+        self._handler = handler
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self, timeout=1.0):
+        """Start the thread; first wait up to ``timeout`` for one still stopping."""
+        if self._thread is not None and self._thread.is_alive():
+            if not self._stopping.is_set():
+                return
+            # two threads must never consume the ring at once
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise RuntimeError(f'DecodeWorker: {self.name} is still stopping')
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the thread after draining what is already queued.
+
+        A thread still busy after ``timeout`` is kept track of, and finishes
+        before ``start`` runs another one.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning('[decode] %s still busy after %.1fs', self.name, timeout)
+            return
+        self._thread = None
+
+    def put(self, data, host_time):
+        """Enqueue one notification (called from the BLE notify callback)."""
+        queued = self.ring.put(data, host_time)
+        self._wakeup.set()
+        return queued
+
+    def drain(self):
+        """Hand every queued notification to the handler, ``max_batch`` at a time."""
+        while True:
+            views, host_times = self.ring.peek(self.max_batch)
+            if not views:
+                return
+            try:
+                self._handler(views, host_times)
+            except Exception:
+                logger.exception('[decode] handler failed on %d notifications', len(views))
+            finally:
+                self.ring.consume(len(views))
+            self.batches += 1
+
+    def stats(self):
+        return {
+            'depth': len(self.ring),
+            'max_depth': self.ring.max_depth,
+            'dropped': self.ring.dropped,
+            'oversized': self.ring.oversized,
+            'batches': self.batches,
+        }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(0.1)
+            self._wakeup.clear()
+            self.drain()
+        self.drain()
@@ -1,9 +1,27 @@
 """Device factory: legacy Muse vs Muse S Athena."""
 
+import logging
+
+import pygatt
+
+from . import backends
 from .athena import Athena
 from .constants import MUSE_ATHENA_GATT_DATA_1, MUSE_GATT_ATTR_TP9
 from .muse import Muse
 
+logger = logging.getLogger(__name__)
+
+# Athena decoder options; the legacy protocol has nothing they apply to.
+ATHENA_OPTIONS = (
+    'low_latency', 'fill_gaps', 'reorder_latency_ms', 'decode_thread',
+    'trace_every', 'trace_capacity',
+)
+
+
+def _legacy_kwargs(kwargs):
+    """``kwargs`` without the Athena-only options ``Muse`` does not take."""
+    return {key: value for key, value in kwargs.items() if key not in ATHENA_OPTIONS}
+
 
 def probe_athena(device):
     """Return True if the connected GATT device exposes Athena DATA_1 (273e0013)."""
@@ -44,11 +62,15 @@ def create_device(address, model='auto', **kwargs):
     ``model`` override:
       - ``legacy`` -> Muse (no probe)
       - ``athena`` -> Athena (fails connect if 273e0013 missing)
-      - ``auto``   -> probe after first connect (see ``_AutoSelectingDevice``)
+      - ``auto``   -> probe the first connection and hand it over to the
+                      selected model (see ``_AutoSelectingDevice``)
+
+    Athena decoder options (``ATHENA_OPTIONS``) are ignored when the device
+    turns out to be a legacy Muse.
     """
     model = (model or 'auto').lower()
     if model == 'legacy':
-        return Muse(address, **kwargs)
+        return Muse(address, **_legacy_kwargs(kwargs))
     if model == 'athena':
         return Athena(address, **kwargs)
     if model == 'auto':
@@ -57,7 +79,7 @@ def create_device(address, model='auto', **kwargs):
 
 
 class _AutoSelectingDevice:
-    """Connect once as Muse, probe GATT, then delegate to Muse or Athena."""
+    """Connect once, probe GATT, then hand the link to Muse or Athena."""
 
     _DELEGATED_ATTRS = (
         'callback_eeg', 'callback_ppg', 'callback_acc', 'callback_gyro',
@@ -90,31 +112,60 @@ class _AutoSelectingDevice:
             if hasattr(self, name):
                 setattr(self._impl, name, getattr(self, name))
 
-    def connect(self, interface=None, retries=0):
-        probe = Muse(self.address, **self._kwargs)
-        if not probe.connect(interface=interface, retries=retries):
-            return False
+    def connect(self, interface=None, retries=0, adapter=None, device=None):
+        """Connect, probe the model and hand the link to the matching class.
 
-        if probe_athena(probe.device):
-            probe.disconnect()
-            self._impl = Athena(self.address, **self._kwargs)
-            if not self._impl.connect(interface=interface, retries=retries):
-                return False
+        A ``device`` already connected on ``adapter`` (e.g. by
+        ``BleakBackend.connect_many``) is probed without reconnecting. Once
+        probed, reconnecting reuses the selected model.
+        """
+        if self._impl is not None:
+            return self._impl.connect(
+                interface=interface, retries=retries, adapter=adapter, device=device,
+            )
+        legacy = Muse(self.address, **_legacy_kwargs(self._kwargs))
+        if legacy.backend == 'bluemuse':
+            # BlueMuse owns the connection; there is no GATT table to probe.
+            self._impl = legacy
             self._sync_impl()
-            return True
+            return legacy.connect(interface=interface, retries=retries)
+
+        # a shared adapter also carries other headsets' links; leave it running
+        own_adapter = adapter is None
+        if device is None:
+            logger.info('Connecting to %s: %s...', legacy.name or 'Muse', self.address)
+            if own_adapter:
+                adapter = backends.open_adapter(legacy.backend, legacy.interface or interface)
+            try:
+                device = adapter.connect(self.address, retries, legacy.name)
+            except pygatt.exceptions.BLEError:
+                logger.error('Connection to %s failed', self.address)
+                device = None
+            if device is None:
+                if own_adapter:
+                    adapter.stop()
+                return False
 
-        if not probe_legacy_eeg(probe.device):
-            probe.disconnect()
+        if probe_athena(device):
+            self._impl = Athena(self.address, **self._kwargs)
+        elif probe_legacy_eeg(device):
+            self._impl = legacy
+        else:
+            device.disconnect()
+            if own_adapter:
+                adapter.stop()
             raise RuntimeError(
                 'Connected device has neither Athena data characteristic '
                 f'({MUSE_ATHENA_GATT_DATA_1}) nor legacy EEG characteristics.'
             )
 
-        self._impl = probe
+        # Sync callbacks first: the impl subscribes according to enable_*.
         self._sync_impl()
-        return True
+        return self._impl.connect(
+            interface=interface, retries=retries, adapter=adapter, device=device,
+        )
 
     def stream_descriptors(self):
         if self._impl is not None:
             return self._impl.stream_descriptors()
-        return Muse(self.address, **self._kwargs).stream_descriptors()
+        return Muse(self.address, **_legacy_kwargs(self._kwargs)).stream_descriptors()
@@ -1,5 +1,9 @@
-"""Build pylsl outlets from StreamDescriptor metadata."""
+"""Build pylsl outlets from StreamDescriptor metadata and push to them."""
 
+import threading
+from time import monotonic
+
+import numpy as np
 from pylsl import StreamInfo, StreamOutlet
 
 _CHANNEL_TYPE = {
@@ -11,8 +15,12 @@ _CHANNEL_TYPE = {
 }
 
 
-def build_outlet(descriptor, address):
-    """Create a StreamOutlet for one stream descriptor."""
+def build_outlet(descriptor, address, name=None):
+    """Create a StreamOutlet for one stream descriptor.
+
+    The source ID is derived from ``address``, so outlets of different
+    headsets streaming at once stay distinguishable.
+    """
     info = StreamInfo(
         'Muse',
         descriptor.stype,
@@ -22,6 +30,8 @@ def build_outlet(descriptor, address):
         'Muse%s' % address,
     )
     info.desc().append_child_value('manufacturer', 'Muse')
+    if name:
+        info.desc().append_child_value('device', name)
     channels = info.desc().append_child('channels')
     channel_type = _CHANNEL_TYPE.get(descriptor.name, descriptor.stype.lower())
     for label in descriptor.channel_names:
@@ -30,3 +40,104 @@ def build_outlet(descriptor, address):
         ch.append_child_value('unit', descriptor.unit)
         ch.append_child_value('type', channel_type)
     return StreamOutlet(info, descriptor.chunk)
+
+
+class ChunkPusher:
+    """Device callback ``(data, timestamps)`` coalescing blocks into LSL chunks.
+
+    ``data`` is (n_channels, n_samples), as the Muse and Athena callbacks
+    deliver it. Blocks are transposed into a preallocated C-contiguous
+    float32 (n_samples, n_channels) buffer, which pylsl hands to liblsl
+    without another copy. The buffer is pushed with one ``push_chunk`` call
+    once it holds ``descriptor.chunk`` samples, or once its oldest block has
+    waited ``max_latency`` seconds (0 pushes every block as it arrives).
+    Buffers that stop filling up are pushed by ``flush_due``, which the
+    owner calls periodically.
+
+    Per-sample timestamps need pylsl >= 1.16; older pylsl (pinned on Linux)
+    only takes the newest timestamp and back-fills the rest at the nominal
+    rate, which matches the dejittered timestamps unless samples were
+    dropped from the chunk. Such chunks fall back to ``push_sample``. Older
+    pylsl doesn't take numpy arrays either, so chunks go to it as lists.
+    """
+
+    # Largest gap between a timestamp and its nominal-rate back-fill (s)
+    # for which the single-timestamp push is used.
+    NOMINAL_TOLERANCE = 1e-4
+
+    def __init__(self, outlet, descriptor, max_latency=0.0, clock=monotonic, capacity=None):
+        self.outlet = outlet
+        self.rate = descriptor.rate
+        self.chunk = max(descriptor.chunk, 1)
+        self.max_latency = max_latency
+        self._clock = clock
+        capacity = capacity or self.chunk * 4
+        self._buffer = np.empty((capacity, descriptor.n_channels), dtype=np.float32)
+        self._timestamps = np.empty(capacity)
+        self._count = 0
+        self._deadline = 0.0
+        # device callbacks and flush_due may run on different threads
+        self._lock = threading.Lock()
+        self._per_sample_timestamps = True
+        self.chunks_pushed = 0
+
+    def __call__(self, data, timestamps):
+        n_samples = data.shape[1]
+        with self._lock:
+            start = self._count
+            self._reserve(start + n_samples)
+            np.copyto(self._buffer[start:start + n_samples], data.T, casting='unsafe')
+            self._timestamps[start:start + n_samples] = timestamps
+            self._count += n_samples
+            now = self._clock()
+            if not start:
+                self._deadline = now + self.max_latency
+            if self._count >= self.chunk or now >= self._deadline:
+                self._push()
+
+    def flush_due(self):
+        """Push the buffer if its deadline has passed; True if it pushed."""
+        with self._lock:
+            if self._count and self._clock() >= self._deadline:
+                self._push()
+                return True
+        return False
+
+    def flush(self):
+        """Push whatever is buffered."""
+        with self._lock:
+            if self._count:
+                self._push()
+
+    def _reserve(self, n_samples):
+        if n_samples <= len(self._buffer):
+            return
+        capacity = max(n_samples, 2 * len(self._buffer))
+        buffer = np.empty((capacity, self._buffer.shape[1]), dtype=np.float32)
+        timestamps = np.empty(capacity)
+        buffer[:self._count] = self._buffer[:self._count]
+        timestamps[:self._count] = self._timestamps[:self._count]
+        self._buffer, self._timestamps = buffer, timestamps
+
+    def _push(self):
+        n_samples = self._count
+        chunk = self._buffer[:n_samples]
+        timestamps = self._timestamps[:n_samples]
+        self._count = 0
+        self.chunks_pushed += 1
+
+        if self._per_sample_timestamps:
+            try:
+                self.outlet.push_chunk(chunk, timestamps)
+                return
+            # pylsl < 1.16 rejects the array (TypeError or ValueError,
+            # depending on its shape) or the timestamp list
+            except (TypeError, ValueError):
+                self._per_sample_timestamps = False
+
+        nominal = timestamps[-1] - (n_samples - 1 - np.arange(n_samples)) / self.rate
+        if np.abs(nominal - timestamps).max() <= self.NOMINAL_TOLERANCE:
+            self.outlet.push_chunk(chunk.tolist(), float(timestamps[-1]))
+        else:
+            for sample, timestamp in zip(chunk.tolist(), timestamps.tolist()):
+                self.outlet.push_sample(sample, timestamp)
@@ -1,4 +1,5 @@
 import logging
+from collections import deque
 from typing import List, cast
 
 import bitstring
@@ -10,13 +11,155 @@ import subprocess
 from . import backends
 from . import helper
 from .constants import *
+from .timestamps import TimestampCorrector
 from .stream_descriptor import StreamDescriptor
 
 logger = logging.getLogger(__name__)
 
+
+def _as_packet_rows(packets, packet_size):
+    """View one packet, a list of equal-size packets, or a 2D uint8 array as rows."""
+    if isinstance(packets, np.ndarray):
+        return packets.reshape(-1, packet_size)
+    if isinstance(packets, (list, tuple)):
+        packets = b''.join(packets)
+    return np.frombuffer(packets, dtype=np.uint8).reshape(-1, packet_size)
+
+
+def unpack_eeg_packets(packets):
+    """Decode legacy EEG notifications -> (packet indices (n,), samples (n, 12)).
+
+    Each 20-byte packet is a big-endian uint16 counter followed by twelve
+    12-bit big-endian samples. Pass all five channel packets of a block to
+    get the (5, 12) array ``_handle_eeg`` emits, in µV.
+    """
+    raw = _as_packet_rows(packets, 20)
+    indices = (raw[:, 0].astype(np.int64) << 8) | raw[:, 1]
+    body = raw[:, 2:].reshape(-1, 6, 3).astype(np.int64)
+    samples = np.empty((len(raw), 6, 2), dtype=np.int64)
+    samples[:, :, 0] = (body[:, :, 0] << 4) | (body[:, :, 1] >> 4)
+    samples[:, :, 1] = ((body[:, :, 1] & 0x0F) << 8) | body[:, :, 2]
+    data = MUSE_EEG_SCALE_FACTOR * (samples.reshape(-1, 12) - 2048)
+    return indices, data
+
+
+def unpack_imu_packets(packets, scale=1):
+    """Decode accelerometer/gyro notifications -> (indices (n,), samples (n, 3, 3)).
+
+    Each 20-byte packet is a big-endian uint16 counter followed by 9 big-endian
+    int16 values, three [x, y, z] samples; ``samples[k]`` matches the legacy
+    Fortran-order (3, 3) layout, channels by samples.
+    """
+    raw = _as_packet_rows(packets, 20)
+    indices = (raw[:, 0].astype(np.int64) << 8) | raw[:, 1]
+    values = np.ascontiguousarray(raw[:, 2:]).view('>i2')
+    samples = values.reshape(-1, 3, 3).transpose(0, 2, 1) * scale
+    return indices, samples
+
+
+def unpack_ppg_packets(packets):
+    """Decode PPG notifications -> (indices (n,), samples (n, 6)).
+
+    Each 20-byte packet is a big-endian uint16 counter followed by six 24-bit
+    big-endian samples.
+    """
+    raw = _as_packet_rows(packets, 20)
+    indices = (raw[:, 0].astype(np.int64) << 8) | raw[:, 1]
+    body = raw[:, 2:].reshape(-1, 6, 3).astype(np.int64)
+    samples = (body[:, :, 0] << 16) | (body[:, :, 1] << 8) | body[:, :, 2]
+    return indices, samples
+
+
+def _counter_key(index, reference):
+    """Sort key for 16-bit packet counters within +/-32768 of ``reference``."""
+    return (index - reference + 0x8000) & 0xFFFF
+
+
+class BlockAssembler:
+    """Group per-channel legacy notifications into blocks by packet counter.
+
+    EEG and PPG send one notification per channel, all carrying the same
+    16-bit counter. ``add`` files each packet under its counter and returns
+    the blocks that are ready, oldest first, as ``(counter, packets,
+    arrival_times, lost)``; channels that never arrived have NaN arrival
+    times, and ``lost`` flags those among them that are active.
+
+    A channel is active if it arrived in any of the last ``history`` emitted
+    blocks: some presets never send Right AUX, and waiting for it would hold
+    every block back. Until the first block is out all channels are awaited,
+    but none is reported lost. A block
+    is ready once every active channel is in, once it has waited
+    ``deadline`` seconds, or once more than ``max_pending`` blocks are open.
+    Emitting a block also emits every older one, so blocks always come out in
+    counter order; packets for an already emitted counter are dropped.
+    """
+
+    def __init__(self, n_channels, packet_size=20, deadline=MUSE_BLOCK_DEADLINE, max_pending=4,
+                 history=8):
+        self.n_channels = n_channels
+        self.packet_size = packet_size
+        self.deadline = deadline
+        self.max_pending = max_pending
+        self._pending = {}
+        self._last_emitted = None
+        self._recent: deque = deque(maxlen=history)
+        self.complete_blocks = 0
+        self.partial_blocks = 0
+        self.late_packets = 0
+
+    @property
+    def active(self):
+        """Mask of the channels expected in every block."""
+        if not self._recent:
+            return np.ones(self.n_channels, dtype=bool)
+        return np.logical_or.reduce(self._recent)
+
+    def add(self, counter, channel, packet, host_time):
+        if self._last_emitted is not None and \
+                _counter_key(counter, self._last_emitted) <= 0x8000:
+            self.late_packets += 1
+            return []
+
+        block = self._pending.get(counter)
+        if block is None:
+            block = (np.zeros((self.n_channels, self.packet_size), dtype=np.uint8),
+                     np.full(self.n_channels, np.nan))
+            self._pending[counter] = block
+        packets, arrivals = block
+        packets[channel] = np.frombuffer(packet, dtype=np.uint8, count=self.packet_size)
+        arrivals[channel] = host_time
+
+        active = self.active
+        order = sorted(self._pending, key=lambda c: _counter_key(c, counter))
+        ready = -1
+        for position, pending in enumerate(order):
+            pending_arrivals = self._pending[pending][1]
+            if not np.isnan(pending_arrivals[active]).any() or \
+                    host_time - np.nanmin(pending_arrivals) > self.deadline:
+                ready = position
+        ready = max(ready, len(order) - self.max_pending - 1)
+
+        emitted = []
+        for pending in order[:ready + 1]:
+            packets, arrivals = self._pending.pop(pending)
+            present = ~np.isnan(arrivals)
+            # with no history yet, a missing channel may just not be sent
+            lost = active & ~present if self._recent else np.zeros_like(present)
+            if lost.any():
+                self.partial_blocks += 1
+            else:
+                self.complete_blocks += 1
+            self._recent.append(present)
+            emitted.append((pending, packets, arrivals, lost))
+            self._last_emitted = pending
+        return emitted
+
+
 class Muse():
     """Muse headband"""
 
+    model = 'legacy'
+
     def __init__(self,
                  address,
                  callback_eeg=None,
@@ -94,30 +237,32 @@ class Muse():
             ),
         ]
 
-    def connect(self, interface=None, retries=0):
-        """Connect to the device"""
+    def connect(self, interface=None, retries=0, adapter=None, device=None):
+        """Connect to the device
+
+        adapter -- a started adapter to connect with instead of opening one
+        device -- an already connected link on adapter to take over (e.g.
+                  after probing the model)
+        """
         try:
             if self.backend == 'bluemuse':
                 logger.info('Starting BlueMuse.')
                 subprocess.call('start bluemuse:', shell=True)
                 self.last_timestamp = self.time_func()
             else:
-                logger.info('Connecting to %s: %s...' % (self.name
-                                                   if self.name else 'Muse',
-                                                   self.address))
-                if self.backend == 'gatt':
-                    self.interface = self.interface or 'hci0'
-                    self.adapter = pygatt.GATTToolBackend(self.interface)
-                elif self.backend == 'bleak':
-                    self.adapter = backends.BleakBackend()
-                else:
-                    self.adapter = pygatt.BGAPIBackend(
-                        serial_port=self.interface)
-
-                self.adapter.start()
-                device = self.adapter.connect(self.address, retries, self.name)
                 if device is None:
-                    return False
+                    logger.info('Connecting to %s: %s...' % (self.name
+                                                       if self.name else 'Muse',
+                                                       self.address))
+                    if adapter is None:
+                        if self.backend == 'gatt':
+                            self.interface = self.interface or 'hci0'
+                        adapter = backends.open_adapter(self.backend, self.interface)
+                    self.adapter = adapter
+                    device = self.adapter.connect(self.address, retries, self.name)
+                    if device is None:
+                        return False
+                self.adapter = adapter
                 self.device = device
 
                 if(self.preset != None):
@@ -261,7 +406,21 @@ class Muse():
                     shell=True)
             return
 
-        self.first_sample = True
+        self._init_timestamp_correction()
+        self._start_streaming()
+
+    def restart(self):
+        """Start streaming again after a reconnect.
+
+        Unlike start(), the timestamp correctors keep their fitted rate and
+        re-anchor on the next packet, so timestamps carry on across the gap.
+        """
+        if self.backend == 'bluemuse':
+            return self.start()
+        self._init_timestamp_correction(reanchor=True)
+        self._start_streaming()
+
+    def _start_streaming(self):
         self._init_sample()
         self._init_ppg_sample()
         self.last_tm = 0
@@ -325,14 +484,19 @@ class Muse():
         if self.enable_ppg:
             self._subscribe_ppg()
 
-    def disconnect(self):
-        """disconnect."""
+    def disconnect(self, stop_adapter=True):
+        """disconnect.
+
+        stop_adapter -- also stop the adapter; pass False when it is shared
+                        with other headsets, since stopping it drops their
+                        links too
+        """
         if self.backend == 'bluemuse':
             subprocess.call('start bluemuse://shutdown', shell=True)
             return
 
         self.device.disconnect()
-        if self.adapter:
+        if self.adapter and stop_adapter:
             self.adapter.stop()
 
     def _subscribe_eeg(self):
@@ -350,113 +514,101 @@ class Muse():
         Each packet is encoded with a 16bit timestamp followed by 12 time
         samples with a 12 bit resolution.
         """
-        aa = bitstring.Bits(bytes=packet)
-        pattern = "uint:16,uint:12,uint:12,uint:12,uint:12,uint:12,uint:12, \
-                   uint:12,uint:12,uint:12,uint:12,uint:12,uint:12"
-
-        res = aa.unpack(pattern)
-        packetIndex = res[0]
-        samples = res[1:]
-        # 12 bits on a 2 mVpp range
-        data = 0.48828125 * (np.array(samples) - 2048)
-        return packetIndex, data
+        indices, data = unpack_eeg_packets(packet)
+        return int(indices[0]), data[0]
 
     def _init_sample(self):
-        """initialize array to store the samples"""
-        self.timestamps = np.full(5, np.nan)
-        self.data = np.zeros((5, 12))
+        """initialize the assembler collecting the 5 EEG channel packets"""
+        self._eeg_blocks = BlockAssembler(5)
 
     def _init_ppg_sample(self):
-        """ Initialise array to store PPG samples
+        """ Initialise the assembler collecting the 3 PPG channel packets
 
             Must be separate from the EEG packets since they occur with a different sampling rate. Ideally the counters
             would always match, but this is not guaranteed
         """
-        self.timestamps_ppg = np.full(3, np.nan)
-        self.data_ppg = np.zeros((3, 6))
-
-    def _init_timestamp_correction(self):
-        """Init IRLS params"""
-        # initial params for the timestamp correction
-        # the time it started + the inverse of sampling rate
-        self.sample_index = 0
-        self.sample_index_ppg = 0
-        self._P = 1e-4
-        t0 = self.time_func()
-        self.reg_params = np.array([t0, 1. / MUSE_SAMPLING_EEG_RATE])
-        self.reg_ppg_sample_rate = np.array([t0, 1. / MUSE_SAMPLING_PPG_RATE])
-
-    def _update_timestamp_correction(self, t_source, t_receiver):
-        """Update regression for dejittering
-
-        This is based on Recursive least square.
-        See https://arxiv.org/pdf/1308.3846.pdf.
-        """
+        self._ppg_blocks = BlockAssembler(3)
 
-        # remove the offset
-        t_receiver = t_receiver - self.reg_params[0]
+    def _missing_blocks(self, tm, last_tm):
+        """Blocks skipped between two 16-bit counters (0 if consecutive)."""
+        missing = ((tm - last_tm) & 0xFFFF) - 1
+        if missing:
+            logger.debug("missing sample %d : %d" % (tm, last_tm))
+        return missing
 
-        # least square estimation
-        P = self._P
-        R = self.reg_params[1]
-        P = P - ((P**2) * (t_source**2)) / (1 - (P * (t_source**2)))
-        R = R + P * t_source * (t_receiver - t_source * R)
+    def _init_timestamp_correction(self, reanchor=False):
+        """Reset the per-stream timestamp correction (see TimestampCorrector)
 
-        # update parameters
-        self.reg_params[1] = R
-        self._P = P
+        With ``reanchor`` the existing fits are kept and re-anchored instead.
+        """
+        if reanchor:
+            for clock in self._clocks.values():
+                clock.reanchor()
+        else:
+            self._clocks: dict = {}
+        self._imu_last_index = {}
+
+    def _clock(self, stream, sampling_rate):
+        """Timestamp corrector of one stream, anchored at its first packet"""
+        clock = self._clocks.get(stream)
+        if clock is None:
+            clock = TimestampCorrector(sampling_rate, self.time_func)
+            self._clocks[stream] = clock
+        return clock
+
+    def timestamp_stats(self):
+        """Timestamp fit residual statistics per stream, in seconds."""
+        return {stream: clock.stats() for stream, clock in self._clocks.items()}
 
     def _handle_eeg(self, handle, data):
         """Callback for receiving a sample.
 
-        samples are received in this order : 44, 41, 38, 32, 35
-        wait until we get 35 and call the data callback
+        samples are received in this order : 44, 41, 38, 32, 35; a block is
+        emitted once all channels being sent arrived or its deadline passed
+        (see BlockAssembler)
         """
-        if self.first_sample:
-            self._init_timestamp_correction()
-            self.first_sample = False
-
         timestamp = self.time_func()
         index = int((handle - 32) / 3)
-        tm, d = self._unpack_eeg_channel(data)
-
+        tm = (data[0] << 8) | data[1]
+        for block in self._eeg_blocks.add(tm, index, data, timestamp):
+            self._emit_eeg_block(*block)
+
+    def _emit_eeg_block(self, tm, packets, arrivals, lost):
+        _, data = unpack_eeg_packets(packets)
+        # channels that are not sent (e.g. Right AUX on some presets) stay zero
+        data[np.isnan(arrivals)] = 0
+        # channels whose packet was lost
+        data[lost] = np.nan
+
+        clock = self._clock('eeg', MUSE_SAMPLING_EEG_RATE)
         if self.last_tm == 0:
             self.last_tm = tm - 1
+        # correct sample index for timestamp estimation
+        clock.skip(LSL_EEG_CHUNK * self._missing_blocks(tm, self.last_tm))
+        self.last_tm = tm
 
-        self.data[index] = d
-        self.timestamps[index] = timestamp
-        # last data received
-        if handle == 35:
-            if tm != self.last_tm + 1:
-                if (tm - self.last_tm) != -65535:  # counter reset
-                    logger.debug("missing sample %d : %d" % (tm, self.last_tm))
-                    # correct sample index for timestamp estimation
-                    self.sample_index += 12 * (tm - self.last_tm + 1)
-
-            self.last_tm = tm
+        # We received the first packet as soon as the last timestamp got
+        # sampled; timestamps are extrapolated backwards from the fit
+        timestamps = clock.timestamps(LSL_EEG_CHUNK, np.nanmin(arrivals))
 
-            # calculate index of time samples
-            idxs = np.arange(0, 12) + self.sample_index
-            self.sample_index += 12
+        # push data
+        self.callback_eeg(data, timestamps)
 
-            # update timestamp correction
-            # We received the first packet as soon as the last timestamp got
-            # sampled
-            self._update_timestamp_correction(idxs[-1], np.nanmin(
-                self.timestamps))
-
-            # timestamps are extrapolated backwards based on sampling rate
-            # and current time
-            timestamps = self.reg_params[1] * idxs + self.reg_params[0]
-
-            # push data
-            self.callback_eeg(self.data, timestamps)
-
-            # save last timestamp for disconnection timer
-            self.last_timestamp = timestamps[-1]
+        # save last timestamp for disconnection timer
+        self.last_timestamp = timestamps[-1]
 
-            # reset sample
-            self._init_sample()
+    def block_stats(self):
+        """Complete/partial block and late packet counts for EEG and PPG."""
+        stats = {}
+        for name, blocks in (('eeg', '_eeg_blocks'), ('ppg', '_ppg_blocks')):
+            assembler = getattr(self, blocks, None)
+            if assembler is not None:
+                stats[name] = {
+                    'complete_blocks': assembler.complete_blocks,
+                    'partial_blocks': assembler.partial_blocks,
+                    'late_packets': assembler.late_packets,
+                }
+        return stats
 
     def _init_control(self):
         """Variable to store the current incoming message."""
@@ -541,17 +693,8 @@ class Muse():
         Each packet is encoded with a 16bit timestamp followed by 9 samples
         with a 16 bit resolution.
         """
-        bit_decoder = bitstring.Bits(bytes=packet)
-        pattern = "uint:16,int:16,int:16,int:16,int:16, \
-                   int:16,int:16,int:16,int:16,int:16"
-
-        data = bit_decoder.unpack(pattern)
-
-        packet_index = data[0]
-
-        samples = np.array(data[1:]).reshape((3, 3), order='F') * scale
-
-        return packet_index, samples
+        indices, samples = unpack_imu_packets(packet, scale)
+        return int(indices[0]), samples[0]
 
     def _subscribe_acc(self):
         self.device.subscribe(
@@ -563,16 +706,33 @@ class Muse():
         sampling rate: ~17 x second (3 samples in each message, roughly 50Hz)"""
         if handle != 23:  # handle 0x17
             return
-        timestamps = [self.time_func()] * 3
+        packet_index, samples = self._unpack_imu_channel(
+            packet, scale=MUSE_ACCELEROMETER_SCALE_FACTOR)
+        timestamps = self._imu_timestamps(
+            'acc', packet_index, MUSE_SAMPLING_ACC_RATE)
 
         # save last timestamp for disconnection timer
         self.last_timestamp = timestamps[-1]
 
-        packet_index, samples = self._unpack_imu_channel(
-            packet, scale=MUSE_ACCELEROMETER_SCALE_FACTOR)
-
         self.callback_acc(samples, timestamps)
 
+    def _imu_timestamps(self, stream, packet_index, sampling_rate):
+        """Dejittered timestamps for the 3 samples of one IMU packet.
+
+        Packets lost according to the 16-bit counter still consume their
+        sample indices, so the timestamps skip over the gap.
+        """
+        arrival = self.time_func()
+        clock = self._clock(stream, sampling_rate)
+        last_index = self._imu_last_index.get(stream)
+        if last_index is not None:
+            missing = self._missing_blocks(packet_index, last_index)
+            # repeated or reordered packet: don't move the clock backwards
+            if 0 <= missing < 0x8000:
+                clock.skip(3 * missing)
+        self._imu_last_index[stream] = packet_index
+        return clock.timestamps(3, arrival)
+
     def _subscribe_gyro(self):
         self.device.subscribe(MUSE_GATT_ATTR_GYRO, callback=self._handle_gyro)
 
@@ -583,14 +743,14 @@ class Muse():
         if handle != 20:  # handle 0x14
             return
 
-        timestamps = [self.time_func()] * 3
+        packet_index, samples = self._unpack_imu_channel(
+            packet, scale=MUSE_GYRO_SCALE_FACTOR)
+        timestamps = self._imu_timestamps(
+            'gyro', packet_index, MUSE_SAMPLING_GYRO_RATE)
 
         # save last timestamp for disconnection timer
         self.last_timestamp = timestamps[-1]
 
-        packet_index, samples = self._unpack_imu_channel(
-            packet, scale=MUSE_GYRO_SCALE_FACTOR)
-
         self.callback_gyro(samples, timestamps)
 
     def _subscribe_ppg(self):
@@ -611,55 +771,42 @@ class Muse():
     def _handle_ppg(self, handle, data):
         """Callback for receiving a sample.
 
-        samples are received in this order : 56, 59, 62
-        wait until we get x and call the data callback
+        samples are received in this order : 56, 59, 62; blocks are
+        assembled like EEG (see BlockAssembler)
         """
         timestamp = self.time_func()
         index = int((handle - 56) / 3)
-        tm, d = self._unpack_ppg_channel(data)
+        tm = (data[0] << 8) | data[1]
+        for block in self._ppg_blocks.add(tm, index, data, timestamp):
+            self._emit_ppg_block(*block)
+
+    def _emit_ppg_block(self, tm, packets, arrivals, lost):
+        _, samples = unpack_ppg_packets(packets)
+        data = samples.astype(np.float64)
+        data[lost] = np.nan
 
+        clock = self._clock('ppg', MUSE_SAMPLING_PPG_RATE)
         if self.last_tm_ppg == 0:
             self.last_tm_ppg = tm - 1
+        clock.skip(LSL_PPG_CHUNK * self._missing_blocks(tm, self.last_tm_ppg))
+        self.last_tm_ppg = tm
 
-        self.data_ppg[index] = d
-        self.timestamps_ppg[index] = timestamp
-        # last data received
-        if handle == 62:
-            if tm != self.last_tm_ppg + 1:
-                logger.debug("missing sample %d : %d" % (tm, self.last_tm_ppg))
-            self.last_tm_ppg = tm
-
-            # calculate index of time samples
-            idxs = np.arange(0, LSL_PPG_CHUNK) + self.sample_index_ppg
-            self.sample_index_ppg += LSL_PPG_CHUNK
+        timestamps = clock.timestamps(LSL_PPG_CHUNK, np.nanmin(arrivals))
 
-            # timestamps are extrapolated backwards based on sampling rate and current time
-            timestamps = self.reg_ppg_sample_rate[1] * \
-                idxs + self.reg_ppg_sample_rate[0]
-
-            # save last timestamp for disconnection timer
-            self.last_timestamp = timestamps[-1]
-
-            # push data
-            if self.callback_ppg:
-                self.callback_ppg(self.data_ppg, timestamps)
+        # save last timestamp for disconnection timer
+        self.last_timestamp = timestamps[-1]
 
-            # reset sample
-            self._init_ppg_sample()
+        # push data
+        if self.callback_ppg:
+            self.callback_ppg(data, timestamps)
 
     def _unpack_ppg_channel(self, packet):
         """Decode data packet of one PPG channel.
         Each packet is encoded with a 16bit timestamp followed by 3
         samples with an x bit resolution.
         """
-
-        aa = bitstring.Bits(bytes=packet)
-        pattern = "uint:16,uint:24,uint:24,uint:24,uint:24,uint:24,uint:24"
-        res = aa.unpack(pattern)
-        packetIndex = res[0]
-        data = res[1:]
-
-        return packetIndex, data
+        indices, samples = unpack_ppg_packets(packet)
+        return int(indices[0]), samples[0]
 
     def _disable_light(self):
         self._write_cmd_str('L0')
@@ -0,0 +1,69 @@
+"""Sampled, bounded in-memory trace of raw BLE notifications.
+
+Tracing is off unless ``capture`` is set or the owning logger is enabled for
+DEBUG, and even then only one notification in ``sample_every`` is kept. Raw
+bytes are stored as-is; hex formatting only happens when a record is logged
+or the buffer is dumped.
+"""
+
+import logging
+import sys
+from collections import deque
+
+
+class PacketTrace:
+    def __init__(self, logger, sample_every=1, capacity=1024, capture=False):
+        if sample_every <= 0:
+            raise ValueError(f'PacketTrace: sample_every must be > 0, got {sample_every}')
+        self._logger = logger
+        self.sample_every = sample_every
+        self.capture = capture
+        self.seen = 0
+        self._records: deque = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def active(self):
+        return self.capture or self._logger.isEnabledFor(logging.DEBUG)
+
+    def record(self, handle, data, host_time):
+        """Keep one notification if tracing is active and it falls on the sample."""
+        if not self.active:
+            return
+        self.seen += 1
+        if self.seen % self.sample_every:
+            return
+        raw = bytes(data)
+        self._records.append((host_time, handle, raw))
+        self._logger.debug(
+            'notify handle=0x%04x len=%d data=%s', handle, len(raw), _Hex(raw),
+        )
+
+    def records(self):
+        """``[(host_time, handle, bytes), ...]``, oldest first."""
+        return list(self._records)
+
+    def dump(self, file=None):
+        """Write one ``time handle len hex`` line per record; return the count."""
+        file = file or sys.stderr
+        records = self.records()
+        for host_time, handle, raw in records:
+            file.write(f'{host_time:.6f} 0x{handle:04x} {len(raw)} {raw.hex()}\n')
+        return len(records)
+
+    def clear(self):
+        self._records.clear()
+
+
+class _Hex:
+    """Defers ``bytes.hex()`` until a log handler actually formats the record."""
+
+    __slots__ = ('_raw',)
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __str__(self):
+        return self._raw.hex()
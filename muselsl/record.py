@@ -12,7 +12,9 @@ from time import time, strftime, gmtime
 from .stream import find_muse
 from . import backends
 from .muse import Muse
-from .constants import LSL_SCAN_TIMEOUT, LSL_EEG_CHUNK, LSL_PPG_CHUNK, LSL_ACC_CHUNK, LSL_GYRO_CHUNK
+from .supervisor import STOPPED, Headset, Supervisor, supervise
+from .constants import (LSL_SCAN_TIMEOUT, LSL_EEG_CHUNK, LSL_PPG_CHUNK, LSL_ACC_CHUNK, LSL_GYRO_CHUNK,
+                        MUSE_KEEP_ALIVE_INTERVAL)
 
 logger = logging.getLogger(__name__)
 
@@ -198,7 +200,8 @@ def record_direct(duration,
                   filename=None,
                   backend='auto',
                   interface=None,
-                  name=None):
+                  name=None,
+                  ble_thread=False):
     if backend == 'bluemuse':
         raise (NotImplementedError(
             'Direct record not supported with BlueMuse backend. Use record after starting stream instead.'
@@ -226,6 +229,9 @@ def record_direct(duration,
         eeg_samples.append(new_samples)
         timestamps.append(new_timestamps)
 
+    if ble_thread:
+        # keep notifications flowing on time whatever this thread is doing
+        backends.start_loop_thread()
     muse = Muse(address, save_eeg, backend=backend)
     logger.debug('Connecting to Muse %s (backend=%s)', address, backend)
     if not muse.connect():
@@ -237,38 +243,33 @@ def record_direct(duration,
     logger.info('Recording directly from %s to %s for %ss', address, filename, duration)
     print('Start recording at time t=%.3f' % t_init)
 
-    last_update = t_init
+    # no data watchdog: only a dropped link triggers a reconnect
+    supervisor = Supervisor(timeout=None, flush_interval=0,
+                            keep_alive_interval=MUSE_KEEP_ALIVE_INTERVAL)
+    headset = Headset(muse, address, name)
     while (time() - t_init) < duration:
-        try:
-            try:
-                backends.sleep(1)
-
-                # Send a keep alive every 10 secs
-                if time() - last_update > 10:
-                    last_update = time()
-                    logger.debug('Sending keep-alive')
-                    muse.keep_alive()
-            except bleak.exc.BleakError:
-                logger.warning('BLE error; attempting to reconnect', exc_info=True)
-                print('Disconnected. Attempting to reconnect...')
-                # Do not giveup since we make a best effort to continue
-                # data collection. Assume device is out of range or another
-                # temp error.
-                while True:
-                    muse.connect(retries=-1)
-                    try:
-                        muse.resume()
-                    except bleak.exc.BleakDBusError:
-                        # Something is wrong with this connection
-                        print('DBus error occurred. Reconnecting.')
-                        muse.disconnect()
-                        continue
-                    else:
-                        break
-                print('Connected. Continuing with data collection...')
-        except KeyboardInterrupt:
-            print('Interrupt received. Exiting data collection.')
+        [reason] = supervise(supervisor, [headset], duration - (time() - t_init))
+        if reason == STOPPED:
+            if (time() - t_init) < duration:
+                print('Interrupt received. Exiting data collection.')
             break
+        logger.warning('BLE link to %s dropped; attempting to reconnect', address)
+        print('Disconnected. Attempting to reconnect...')
+        # Do not giveup since we make a best effort to continue
+        # data collection. Assume device is out of range or another
+        # temp error.
+        while True:
+            muse.connect(retries=-1)
+            try:
+                muse.resume()
+            except bleak.exc.BleakDBusError:
+                # Something is wrong with this connection
+                print('DBus error occurred. Reconnecting.')
+                muse.disconnect()
+                continue
+            else:
+                break
+        print('Connected. Continuing with data collection...')
 
     muse.stop()
     muse.disconnect()
@@ -0,0 +1,107 @@
+"""On-disk registry of headsets this machine has streamed from.
+
+Remembering each device's name, address, detected model and preset lets
+``stream`` connect to a known headset straight away instead of scanning
+for ``LIST_SCAN_TIMEOUT`` seconds and probing its model on every start.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, replace
+from time import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MODELS = ('legacy', 'athena')
+
+
+def default_registry_path():
+    """``$MUSELSL_REGISTRY``, else ``muselsl/devices.json`` in the user config dir."""
+    path = os.environ.get('MUSELSL_REGISTRY')
+    if path:
+        return path
+    config = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(config, 'muselsl', 'devices.json')
+
+
+@dataclass(frozen=True)
+class KnownDevice:
+    address: str
+    name: Optional[str] = None
+    model: Optional[str] = None
+    preset: Optional[str] = None
+    last_seen: float = 0.0
+
+
+class DeviceRegistry:
+    """JSON file of ``KnownDevice`` records keyed by address.
+
+    The file is read once on construction and rewritten atomically by every
+    ``remember``/``forget``; an unreadable file is treated as empty.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_registry_path()
+        self._devices = {}
+        self._load()
+
+    def __len__(self):
+        return len(self._devices)
+
+    def devices(self):
+        """Known devices, most recently seen first."""
+        return sorted(self._devices.values(), key=lambda d: d.last_seen, reverse=True)
+
+    def get(self, address):
+        return self._devices.get(address.upper())
+
+    def candidates(self, name=None):
+        """Known devices to try for ``name`` (any Muse if None), newest first."""
+        return [d for d in self.devices() if name is None or d.name == name]
+
+    def remember(self, address, name=None, model=None, preset=None, last_seen=None):
+        """Record a successful connection; unset fields keep their old value."""
+        if model is not None and model not in MODELS:
+            raise ValueError(f'DeviceRegistry: unknown model {model!r}; use one of {MODELS}')
+        address = address.upper()
+        fields = {'name': name, 'model': model, 'preset': None if preset is None else str(preset)}
+        known = self._devices.get(address, KnownDevice(address))
+        known = replace(
+            known,
+            last_seen=time() if last_seen is None else last_seen,
+            **{key: value for key, value in fields.items() if value is not None},
+        )
+        self._devices[address] = known
+        self._save()
+        return known
+
+    def forget(self, address):
+        if self._devices.pop(address.upper(), None) is not None:
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self.path) as file:
+                records = json.load(file)
+            self._devices = {
+                record['address'].upper(): KnownDevice(**record) for record in records
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as error:
+            logger.warning('Ignoring unreadable device registry %s: %s', self.path, error)
+            self._devices = {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as file:
+                json.dump([asdict(d) for d in self.devices()], file, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as error:
+            logger.warning('Could not write device registry %s: %s', self.path, error)
@@ -1,7 +1,10 @@
+import asyncio
+import functools
 import logging
 import re
+import signal
 import subprocess
-from functools import partial
+import threading
 from shutil import which
 from sys import platform
 from time import time
@@ -11,13 +14,18 @@ from pylsl import local_clock
 
 from . import backends, helper
 from .constants import (
-    AUTO_DISCONNECT_DELAY,
+    KNOWN_DEVICE_ATTEMPTS,
+    KNOWN_DEVICE_CONNECT_TIMEOUT,
     LIST_SCAN_TIMEOUT,
+    LSL_MAX_CHUNK_LATENCY,
+    MUSE_GATT_SERVICE,
     RETRY_SLEEP_TIMEOUT,
 )
 from .devices import create_device
-from .lsl_outlet import build_outlet
+from .lsl_outlet import ChunkPusher, build_outlet
 from .muse import Muse
+from .registry import DeviceRegistry
+from .supervisor import STOPPED, Headset, Supervisor, supervise
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +39,26 @@ def _print_muse_list(muses):
 
 # Returns a list of available Muse devices.
 def list_muses(backend='auto', interface=None):
+    if backend == 'bluemuse':
+        print('Starting BlueMuse, see BlueMuse window for interactive list of devices.')
+        subprocess.call('start bluemuse:', shell=True)
+        return
+    muses = list(iter_muses(backend, interface))
+    _print_muse_list(muses)
+    return muses
+
+
+def iter_muses(backend='auto', interface=None, timeout=LIST_SCAN_TIMEOUT):
+    """Yield Muse devices ({'name', 'address'}) as they are discovered.
+
+    The scan runs for up to ``timeout`` seconds; stop iterating to end it as
+    soon as the wanted device shows up. Only the bleak and bluetoothctl scans
+    report devices incrementally; pygatt backends yield once their scan ends.
+    """
     if backend == 'auto' and which('bluetoothctl') is not None:
         print("Backend was 'auto' and bluetoothctl was found, using to list muses...")
-        return _list_muses_bluetoothctl(LIST_SCAN_TIMEOUT)
+        yield from _iter_muses_bluetoothctl(timeout)
+        return
 
     backend = helper.resolve_backend(backend)
 
@@ -41,34 +66,62 @@ def list_muses(backend='auto', interface=None):
         interface = interface or 'hci0'
         adapter = pygatt.GATTToolBackend(interface)
     elif backend == 'bluemuse':
-        print('Starting BlueMuse, see BlueMuse window for interactive list of devices.')
-        subprocess.call('start bluemuse:', shell=True)
+        helper.warn_bluemuse_not_supported(' Use the BlueMuse window to pick a device.')
         return
     elif backend == 'bleak':
         adapter = backends.BleakBackend()
     elif backend == 'bgapi':
         adapter = pygatt.BGAPIBackend(serial_port=interface)
 
+    devices = None
     try:
         adapter.start()
         print('Searching for Muses, this may take up to 10 seconds...')
-        devices = adapter.scan(timeout=LIST_SCAN_TIMEOUT)
-        adapter.stop()
+        if backend == 'bleak':
+            devices = adapter.iter_scan(timeout)
+        else:
+            devices = iter(adapter.scan(timeout=timeout))
+        for device in devices:
+            if device['name'] and 'Muse' in device['name']:
+                yield device
     except pygatt.exceptions.BLEError as e:
         if backend == 'gatt':
             print('pygatt failed to scan for BLE devices. Trying with '
                   'bluetoothctl.')
-            return _list_muses_bluetoothctl(LIST_SCAN_TIMEOUT)
+            yield from _iter_muses_bluetoothctl(timeout)
         else:
             raise e
+    finally:
+        close = getattr(devices, 'close', None)
+        if close is not None:
+            close()
+        adapter.stop()
 
-    muses = [d for d in devices if d['name'] and 'Muse' in d['name']]
-    _print_muse_list(muses)
 
+def _list_muses_bluetoothctl(timeout, verbose=False):
+    muses = list(_iter_muses_bluetoothctl(timeout, verbose))
+    _print_muse_list(muses)
     return muses
 
 
-def _list_muses_bluetoothctl(timeout, verbose=False):
+_BLUETOOTHCTL_DEVICE = re.compile(r'Device (..:..:..:..:..:..) ?(.*)')
+_BLUETOOTHCTL_EVENT = re.compile(r'\[(NEW|CHG|DEL)\]')
+_ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]|[\x01\x02]')
+
+
+def _bluetoothctl_devices():
+    """``{address: name}`` of the devices bluetoothctl already knows."""
+    output = subprocess.run(
+        ['bluetoothctl', 'devices'], stdout=subprocess.PIPE).stdout.decode('utf-8')
+    devices = {}
+    for line in output.split('\n'):
+        match = _BLUETOOTHCTL_DEVICE.search(line)
+        if match:
+            devices[match.group(1)] = match.group(2).strip()
+    return devices
+
+
+def _iter_muses_bluetoothctl(timeout, verbose=False):
     """Identify Muse BLE devices using bluetoothctl.
 
     When using backend='gatt' on Linux, pygatt relies on the command line tool
@@ -77,6 +130,10 @@ def _list_muses_bluetoothctl(timeout, verbose=False):
     functionality of `pygatt.backends.gatttool.gatttool.GATTToolBackend.scan()`
     using the more modern `bluetoothctl` tool.
 
+    The `bluetoothctl scan on` output is parsed line by line, so a Muse is
+    yielded as soon as it advertises. Muses bluetoothctl already knew but that
+    did not advertise are yielded once the scan times out.
+
     Deprecation of hcitool: https://git.kernel.org/pub/scm/bluetooth/bluez.git/commit/?id=b1eb2c4cd057624312e0412f6c4be000f7fc3617
     """
     try:
@@ -86,44 +143,65 @@ def _list_muses_bluetoothctl(timeout, verbose=False):
                'a jupter notebook environment.')
         raise ModuleNotFoundError(msg)
 
+    known = _bluetoothctl_devices()
+    yielded = set()
+
     # Run scan using pexpect as subprocess.run returns immediately in jupyter
     # notebooks
     print('Searching for Muses, this may take up to 10 seconds...')
-    scan = pexpect.spawn('bluetoothctl scan on')
+    scan = pexpect.spawn('bluetoothctl scan on', encoding='utf-8', codec_errors='replace')
+    deadline = time() + timeout
     try:
-        scan.expect('foooooo', timeout=timeout)
-    except (pexpect.EOF, pexpect.TIMEOUT):
-        # Both EOF and TIMEOUT mean the scan completed normally: bluetoothctl
-        # may exit cleanly (EOF) after the scan starts at the Bluetooth stack
-        # level, rather than timing out.
-        if verbose:
-            print(scan.before.decode('utf-8', 'replace').split('\r\n'))
+        while True:
+            # Both EOF and TIMEOUT mean the scan completed normally: bluetoothctl
+            # may exit cleanly (EOF) after the scan starts at the Bluetooth stack
+            # level, rather than timing out.
+            remaining = deadline - time()
+            if remaining <= 0 or scan.expect(
+                    ['\r?\n', pexpect.EOF, pexpect.TIMEOUT], timeout=remaining) != 0:
+                break
+            line = _ANSI_ESCAPE.sub('', scan.before)
+            if verbose:
+                print(line)
+            match = _BLUETOOTHCTL_DEVICE.search(line)
+            event = _BLUETOOTHCTL_EVENT.search(line)
+            if not match or (event and event.group(1) == 'DEL'):
+                continue
+            address = match.group(1)
+            if event and event.group(1) == 'NEW':
+                known[address] = match.group(2).strip()
+            name = known.get(address, '')
+            if 'Muse' in name and address not in yielded:
+                yielded.add(address)
+                yield {'name': re.findall('Muse.*', string=name)[0], 'address': address}
     finally:
         scan.terminate(force=True)
 
-    # List devices using bluetoothctl
-    list_devices_cmd = ['bluetoothctl', 'devices']
-    devices = subprocess.run(
-        list_devices_cmd, stdout=subprocess.PIPE).stdout.decode(
-            'utf-8').split('\n')
-    muses = [{
-            'name': re.findall('Muse.*', string=d)[0],
-            'address': re.findall(r'..:..:..:..:..:..', string=d)[0]
-        } for d in devices if 'Muse' in d]
-    _print_muse_list(muses)
+    # Known Muses that stayed silent, as the full listing used to report them
+    for address, name in _bluetoothctl_devices().items():
+        if 'Muse' in name and address not in yielded:
+            yield {'name': re.findall('Muse.*', string=name)[0], 'address': address}
 
-    return muses
 
-
-# Returns the address of the Muse with the name provided, otherwise returns address of first available Muse.
-def find_muse(name=None, backend='auto'):
-    muses = list_muses(backend)
-    if name:
+# Returns the Muse with the name provided as soon as it is discovered, otherwise the first Muse discovered.
+def find_muse(name=None, backend='auto', interface=None):
+    muses = iter_muses(backend, interface)
+    try:
         for muse in muses:
-            if muse['name'] == name:
+            if not name or muse['name'] == name:
+                _print_muse_list([muse])
                 return muse
-    elif muses:
-        return muses[0]
+    finally:
+        muses.close()
+    print('No Muses found.')
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
 
 
 # Begins LSL stream(s) from a Muse with a given address with data sources determined by arguments
@@ -141,6 +219,264 @@ def _descriptor_enabled(name, eeg_disabled, ppg_enabled, acc_enabled, gyro_enabl
     return False
 
 
+def _connect_device(address, name, model, preset, retries, options, adapter=None, device=None):
+    """Create the device for ``model`` and connect it; None on failure.
+
+    ``options`` are the remaining ``create_device`` arguments.
+    """
+    muse = create_device(address=address, model=model, name=name, preset=preset, **options)
+    connected = muse.connect(retries=retries, adapter=adapter, device=device)
+    return muse if connected else None
+
+
+def _attach_outlets(muse, address, name, sources, max_latency):
+    """Build an outlet per enabled stream of ``muse`` and route its callbacks.
+
+    ``sources`` are the ``_descriptor_enabled`` flags. Returns the
+    ``ChunkPusher`` of each enabled stream, keyed by descriptor name.
+    """
+    pushers = {}
+    for desc in muse.stream_descriptors():
+        if _descriptor_enabled(desc.name, **sources):
+            pushers[desc.name] = ChunkPusher(
+                build_outlet(desc, address, name), desc, max_latency=max_latency)
+
+    push_eeg = pushers.get('EEG')
+    push_ppg = pushers.get('PPG')
+    push_acc = pushers.get('ACC')
+    push_gyro = pushers.get('GYRO')
+    push_optics = pushers.get('OPTICS')
+
+    muse.callback_eeg = push_eeg
+    muse.callback_ppg = push_ppg
+    muse.callback_acc = push_acc
+    muse.callback_gyro = push_gyro
+    muse.callback_optics = push_optics
+    muse.enable_eeg = push_eeg is not None
+    muse.enable_ppg = push_ppg is not None
+    muse.enable_acc = push_acc is not None
+    muse.enable_gyro = push_gyro is not None
+    muse.enable_optics = push_optics is not None
+    muse.refresh_subscriptions()
+    return pushers
+
+
+def _reconnect(headset):
+    """Connect ``headset`` again on its adapter and resume streaming.
+
+    Its callbacks still feed the same outlets, so LSL consumers only see a
+    gap in the data.
+    """
+    muse = headset.muse
+    print(f'Reconnecting to {headset.label}...')
+    try:
+        # only this link: the adapter may be shared with other headsets
+        muse.device.disconnect()
+    except Exception as error:
+        logger.debug('Closing the old link to %s failed: %s', headset.label, error)
+    if not muse.connect(retries=0, adapter=muse.adapter):
+        return False
+    muse.restart()
+    print(f'Reconnected to {headset.label}.')
+    return True
+
+
+def _dump_traces(headsets, path):
+    """Append the raw packet trace of each headset keeping one to ``path``."""
+    with open(path, 'a') as file:
+        for headset in headsets:
+            trace = getattr(headset.muse, 'packet_trace', None)
+            if trace is not None:
+                file.write(f'# {headset.label}\n')
+                trace.dump(file)
+    print(f'Packet trace written to {path}.')
+
+
+def _supervise(headsets, time_func, max_latency, supervisor=None, reconnect=0,
+               trace_dump=None):
+    """Stream until every headset went quiet or dropped, or Ctrl-C.
+
+    Each headset is dropped on its own, as soon as its link reports a
+    disconnect or once it sent no data for ``AUTO_DISCONNECT_DELAY``
+    seconds; the others keep streaming. A nonzero ``reconnect`` first tries
+    to reconnect it that many times (-1: forever), with backoff. Ctrl-C (or
+    ``supervisor.stop()``) stops and disconnects all of them.
+
+    With ``trace_dump``, headsets keeping a packet trace (Athena) capture it
+    whatever the log level, and it is appended to that file at the end and
+    on SIGUSR1 (where the platform has it, and on the main thread).
+    """
+    def on_end(headset, reason):
+        if len(headsets) > 1:
+            print(f'Disconnected {headset.label}.')
+
+    if supervisor is None:
+        supervisor = Supervisor(time_func, flush_interval=max_latency)
+    supervisor.on_end = on_end
+    if reconnect:
+        supervisor.reconnect = _reconnect
+        supervisor.reconnect_attempts = reconnect
+    dump_on_signal, previous_handler = False, None
+    if trace_dump:
+        for headset in headsets:
+            trace = getattr(headset.muse, 'packet_trace', None)
+            if trace is not None:
+                trace.capture = True
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(
+                signal.SIGUSR1, lambda signum, frame: _dump_traces(headsets, trace_dump))
+            dump_on_signal = True
+    try:
+        reasons = supervise(supervisor, headsets)
+    finally:
+        if dump_on_signal:
+            signal.signal(signal.SIGUSR1, previous_handler or signal.SIG_DFL)
+    adapters: list = []
+    for headset, reason in zip(headsets, reasons):
+        if reason != STOPPED:
+            continue
+        try:
+            headset.muse.stop()
+            # stopping a shared adapter would drop the headsets not yet stopped
+            headset.muse.disconnect(stop_adapter=False)
+        except Exception as error:
+            logger.warning('Disconnecting %s failed: %s', headset.label, error)
+        adapter = getattr(headset.muse, 'adapter', None)
+        if adapter is not None and all(adapter is not other for other in adapters):
+            adapters.append(adapter)
+    for adapter in adapters:
+        try:
+            adapter.stop()
+        except Exception as error:
+            logger.warning('Stopping the BLE adapter failed: %s', error)
+    if trace_dump:
+        _dump_traces(headsets, trace_dump)
+
+
+def _streaming_message(sources):
+    eeg_string = " EEG" if not sources['eeg_disabled'] else ""
+    ppg_string = " PPG" if sources['ppg_enabled'] else ""
+    acc_string = " ACC" if sources['acc_enabled'] else ""
+    gyro_string = " GYRO" if sources['gyro_enabled'] else ""
+    optics_string = " OPTICS" if sources['optics_enabled'] else ""
+    return "Streaming%s%s%s%s%s..." % (
+        eeg_string, ppg_string, acc_string, gyro_string, optics_string)
+
+
+def _resolve_targets(addresses, names, registry, backend, interface):
+    """``[(address, name), ...]`` for a multi-headset stream, one per address.
+
+    Given both, addresses and names are paired in order. Otherwise names are
+    looked up in the registry first; the rest are found with a single scan
+    that ends once all of them were seen. Names that are never seen are
+    reported and left out.
+    """
+    if addresses and names:
+        if len(addresses) != len(names):
+            print('Give one name per address, or only addresses or only names.')
+            return []
+        return _unique_targets(zip(addresses, names))
+    targets = [(address, None) for address in addresses]
+    missing = []
+    for name in names:
+        known = registry.candidates(name) if registry is not None else []
+        if known:
+            targets.append((known[0].address, name))
+        else:
+            missing.append(name)
+    if missing:
+        muses = iter_muses(backend, interface)
+        try:
+            for muse in muses:
+                if muse['name'] in missing:
+                    _print_muse_list([muse])
+                    missing.remove(muse['name'])
+                    targets.append((muse['address'], muse['name']))
+                    if not missing:
+                        break
+        finally:
+            muses.close()
+    for name in missing:
+        print(f'Muse {name} not found.')
+    return _unique_targets(targets)
+
+
+def _unique_targets(targets):
+    """``targets`` without repeated addresses, keeping the first of each."""
+    unique, seen = [], set()
+    for address, name in targets:
+        if address.upper() not in seen:
+            seen.add(address.upper())
+            unique.append((address, name))
+    return unique
+
+
+def _stream_many(addresses, names, registry, model, preset, retries, options,
+                 sources, max_latency, supervisor, reconnect, trace_dump=None):
+    """Connect several headsets concurrently and stream them all at once.
+
+    All links share one adapter: starting another one would reset the
+    others (gatttool restarts Bluetooth). gatttool only handles one device
+    at a time, so the gatt backend is refused.
+    """
+    backend = helper.resolve_backend(options['backend'])
+    if backend == 'gatt':
+        print('Streaming several headsets needs the bleak or bgapi backend.')
+        return
+    targets = _resolve_targets(addresses, names, registry,
+                               options['backend'], options['interface'])
+    if not targets:
+        return
+
+    def settings(address):
+        # per-headset model/preset, as stream() does for a single device
+        known = registry.get(address) if registry is not None else None
+        target_model = known.model if model == 'auto' and known and known.model else model
+        target_preset = preset if preset is not None or known is None else known.preset
+        return target_model, target_preset
+
+    def connect(address, name, link=None):
+        target_model, target_preset = settings(address)
+        try:
+            return _connect_device(address, name, target_model, target_preset, retries,
+                                   options, adapter=adapter, device=link)
+        except RuntimeError as error:
+            # e.g. not a Muse: the other headsets stream regardless
+            logger.warning('%s: %s', name or address, error)
+            if link is not None:
+                link.disconnect()
+            return None
+
+    adapter = backends.open_adapter(backend, options['interface'])
+    if backend == 'bleak':
+        # one event loop for every link, connected concurrently
+        links = adapter.connect_many(targets, retries)
+        muses = [None if link is None else connect(address, name, link)
+                 for (address, name), link in zip(targets, links)]
+    else:
+        muses = [connect(address, name) for address, name in targets]
+
+    headsets = []
+    for (address, name), muse in zip(targets, muses):
+        if muse is None:
+            print(f'Failed to connect to {name or address}.')
+            continue
+        if registry is not None:
+            registry.remember(address, name, muse.model, settings(address)[1])
+        pushers = _attach_outlets(muse, address, name, sources, max_latency)
+        headsets.append(Headset(muse, address, name, pushers))
+    if not headsets:
+        adapter.stop()
+        return
+
+    print(f'Connected {len(headsets)} of {len(targets)} headsets.')
+    for headset in headsets:
+        headset.muse.start()
+    print(_streaming_message(sources))
+    _supervise(headsets, options['time_func'], max_latency, supervisor, reconnect, trace_dump)
+    print('Disconnected.')
+
+
 def stream(
     address,
     backend='auto',
@@ -156,7 +492,42 @@ def stream(
     lsl_time=False,
     retries=1,
     model='auto',
+    use_registry=True,
+    max_latency=LSL_MAX_CHUNK_LATENCY,
+    supervisor=None,
+    reconnect=0,
+    ble_thread=False,
+    fill_gaps=False,
+    reorder_latency_ms=None,
+    decode_thread=False,
+    trace_every=1,
+    trace_dump=None,
 ):
+    """Stream a Muse to LSL until it stops sending data or Ctrl-C.
+
+    ``address`` and ``name`` may also be lists (or tuples) to stream several
+    headsets at once: each gets its own outlets, with source IDs derived from
+    its address, and is dropped independently when it goes quiet. Given
+    both, addresses and names are paired in order. With the bleak backend
+    the headsets are connected concurrently on one event loop.
+
+    ``supervisor`` is the ``Supervisor`` to watch the headsets with, e.g. to
+    ``stop()`` the stream from another thread; its ``time_func`` should
+    match ``lsl_time``.
+
+    With a nonzero ``reconnect``, a headset that drops is reconnected up to
+    that many times (-1: forever) with increasing backoff, and keeps
+    streaming into its existing outlets, so LSL consumers don't have to
+    resolve the streams again.
+
+    ``ble_thread`` runs the BLE event loop on a thread of its own (see
+    ``backends.start_loop_thread``).
+
+    ``fill_gaps``, ``reorder_latency_ms``, ``decode_thread`` and
+    ``trace_every`` are passed to ``Athena`` headsets and ignored for legacy
+    ones. ``trace_dump`` is a file the raw packet trace of Athena headsets is
+    appended to when the stream ends, and on SIGUSR1 (see ``_supervise``).
+    """
     # If no data types are enabled, we warn the user and return immediately.
     if eeg_disabled and not ppg_enabled and not acc_enabled and not gyro_enabled and not optics_enabled:
         print('Stream initiation failed: At least one data source must be enabled.')
@@ -164,103 +535,95 @@ def stream(
 
     # For any backend except bluemuse, we will start LSL streams hooked up to the muse callbacks.
     if backend != 'bluemuse':
-        if not address:
-            attempts = 0
-            found_muse = None
-            while found_muse is None and (retries < 0 or attempts <= retries):
-                found_muse = find_muse(name, backend)
-                if found_muse is None and (retries < 0 or attempts < retries):
-                    print('Muse not found. Retrying scan...')
-                    backends.sleep(RETRY_SLEEP_TIMEOUT)
-                attempts += 1
-            if not found_muse:
-                return
-            else:
-                address = found_muse['address']
-                name = found_muse['name']
-
-        def push(data, timestamps, outlet):
-            for ii in range(data.shape[1]):
-                outlet.push_sample(data[:, ii], timestamps[ii])
-
+        if ble_thread:
+            backends.start_loop_thread()
         time_func = local_clock if lsl_time else time
+        registry = DeviceRegistry() if use_registry else None
+        options = {
+            'backend': backend,
+            'interface': interface,
+            'disable_light': disable_light,
+            'time_func': time_func,
+            'fill_gaps': fill_gaps,
+            'reorder_latency_ms': reorder_latency_ms,
+            'decode_thread': decode_thread,
+            'trace_every': trace_every,
+        }
+        sources = {
+            'eeg_disabled': eeg_disabled,
+            'ppg_enabled': ppg_enabled,
+            'acc_enabled': acc_enabled,
+            'gyro_enabled': gyro_enabled,
+            'optics_enabled': optics_enabled,
+        }
 
-        muse = create_device(
-            address=address,
-            model=model,
-            backend=backend,
-            interface=interface,
-            name=name,
-            preset=preset,
-            disable_light=disable_light,
-            time_func=time_func,
-        )
-
-        didConnect = muse.connect(retries=retries)
+        if isinstance(address, (list, tuple)) or isinstance(name, (list, tuple)):
+            _stream_many(
+                _as_list(address), _as_list(name), registry, model, preset, retries,
+                options, sources, max_latency, supervisor, reconnect, trace_dump,
+            )
+            return
 
-        if not didConnect:
+        muse = None
+        if registry is not None and not address:
+            # The most recent known headsets first, with a short timeout; scan
+            # only if none answers.
+            for known in registry.candidates(name)[:KNOWN_DEVICE_ATTEMPTS]:
+                print(f'Trying known device {known.name or ""} {known.address}...')
+                adapter = backends.open_adapter(
+                    helper.resolve_backend(backend), interface,
+                    connect_timeout=KNOWN_DEVICE_CONNECT_TIMEOUT,
+                    services=[MUSE_GATT_SERVICE],
+                )
+                muse = _connect_device(
+                    known.address, known.name,
+                    known.model if model == 'auto' and known.model else model,
+                    preset if preset is not None else known.preset,
+                    0, options, adapter,
+                )
+                if muse is not None:
+                    address, name = known.address, known.name
+                    preset = preset if preset is not None else known.preset
+                    break
+                adapter.stop()
+
+        if muse is None:
+            if not address:
+                attempts = 0
+                found_muse = None
+                while found_muse is None and (retries < 0 or attempts <= retries):
+                    found_muse = find_muse(name, backend, interface)
+                    if found_muse is None and (retries < 0 or attempts < retries):
+                        print('Muse not found. Retrying scan...')
+                        backends.sleep(RETRY_SLEEP_TIMEOUT)
+                    attempts += 1
+                if not found_muse:
+                    return
+                else:
+                    address = found_muse['address']
+                    name = found_muse['name']
+
+            known = registry.get(address) if registry is not None else None
+            if model == 'auto' and known is not None and known.model:
+                model = known.model
+            muse = _connect_device(address, name, model, preset, retries, options)
+
+        if muse is None:
             print('Failed to connect to Muse.')
             return
+        if registry is not None:
+            registry.remember(address, name, muse.model, preset)
 
-        enabled = {
-            d.name: _descriptor_enabled(
-                d.name, eeg_disabled, ppg_enabled, acc_enabled, gyro_enabled, optics_enabled,
-            )
-            for d in muse.stream_descriptors()
-        }
-        outlets = {}
-        for desc in muse.stream_descriptors():
-            if enabled.get(desc.name):
-                outlets[desc.name] = build_outlet(desc, address)
-
-        push_eeg = partial(push, outlet=outlets['EEG']) if 'EEG' in outlets else None
-        push_ppg = partial(push, outlet=outlets['PPG']) if 'PPG' in outlets else None
-        push_acc = partial(push, outlet=outlets['ACC']) if 'ACC' in outlets else None
-        push_gyro = partial(push, outlet=outlets['GYRO']) if 'GYRO' in outlets else None
-        push_optics = partial(push, outlet=outlets['OPTICS']) if 'OPTICS' in outlets else None
-
-        muse.callback_eeg = push_eeg
-        muse.callback_ppg = push_ppg
-        muse.callback_acc = push_acc
-        muse.callback_gyro = push_gyro
-        muse.callback_optics = push_optics
-        muse.enable_eeg = push_eeg is not None
-        muse.enable_ppg = push_ppg is not None
-        muse.enable_acc = push_acc is not None
-        muse.enable_gyro = push_gyro is not None
-        muse.enable_optics = push_optics is not None
-        muse.refresh_subscriptions()
-
-        if didConnect:
-            print('Connected.')
-            muse.start()
-
-            eeg_string = " EEG" if not eeg_disabled else ""
-            ppg_string = " PPG" if ppg_enabled else ""
-            acc_string = " ACC" if acc_enabled else ""
-            gyro_string = " GYRO" if gyro_enabled else ""
-            optics_string = " OPTICS" if optics_enabled else ""
-
-            print("Streaming%s%s%s%s%s..." %
-                (eeg_string, ppg_string, acc_string, gyro_string, optics_string))
-
-            while time_func() - muse.last_timestamp < AUTO_DISCONNECT_DELAY:
-                try:
-                    backends.sleep(1)
-                    logger.debug(
-                        'stream alive: %.2fs since last data (disconnect at %ds)',
-                        time_func() - muse.last_timestamp, AUTO_DISCONNECT_DELAY,
-                    )
-                except KeyboardInterrupt:
-                    muse.stop()
-                    muse.disconnect()
-                    break
+        pushers = _attach_outlets(muse, address, name, sources, max_latency)
 
-            logger.debug(
-                'auto-disconnect: %.2fs since last data exceeded %ds',
-                time_func() - muse.last_timestamp, AUTO_DISCONNECT_DELAY,
-            )
-            print('Disconnected.')
+        print('Connected.')
+        muse.start()
+        print(_streaming_message(sources))
+        _supervise(
+            [Headset(muse, address, name, pushers)], time_func, max_latency, supervisor, reconnect,
+            trace_dump,
+        )
+        print('Disconnected.')
 
     # For bluemuse backend, we don't need to create LSL streams directly, since these are handled in BlueMuse itself.
     else:
@@ -281,3 +644,22 @@ def stream(
                   + ':'.join(filter(None, [name, address])) + '...')
         print('\n*BlueMuse will auto connect and stream when the device is found. \n*You can also use the BlueMuse interface to manage your stream(s).')
         muse.start()
+
+
+async def stream_async(address, lsl_time=False, max_latency=LSL_MAX_CHUNK_LATENCY, **kwargs):
+    """Run ``stream`` from an asyncio application without blocking its loop.
+
+    Connecting and streaming run in an executor thread on the backend's own
+    event loop, watched by a ``Supervisor``. Cancelling the awaiting task
+    stops the stream and returns once the headsets are disconnected.
+    """
+    supervisor = Supervisor(local_clock if lsl_time else time, flush_interval=max_latency)
+    run = asyncio.get_running_loop().run_in_executor(None, functools.partial(
+        stream, address, lsl_time=lsl_time, max_latency=max_latency,
+        supervisor=supervisor, **kwargs))
+    try:
+        await asyncio.shield(run)
+    except asyncio.CancelledError:
+        supervisor.stop()
+        await run
+        raise
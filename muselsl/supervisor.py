@@ -0,0 +1,246 @@
+"""Event-driven supervision of streaming headsets on the backend event loop.
+
+Each headset is watched by an asyncio task that sleeps until its data
+watchdog would expire and wakes up at once when the BLE link reports a
+disconnect, so failures are noticed without polling. Outlet flushing and
+keep-alives run as timer tasks of their own. Blocking device calls (a
+keep-alive write, a reconnect) are made from an executor thread, which
+``backends._wait`` turns into a submission to the running loop.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from time import time
+from typing import Any, Optional
+
+from . import backends
+from .constants import (
+    AUTO_DISCONNECT_DELAY,
+    LSL_MAX_CHUNK_LATENCY,
+    RECONNECT_MAX_BACKOFF,
+    RETRY_SLEEP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = 'timeout'
+DISCONNECTED = 'disconnected'
+STOPPED = 'stopped'
+
+
+@dataclass
+class Headset:
+    """A connected device and the chunk pushers feeding its LSL outlets."""
+
+    muse: Any
+    address: str
+    name: Optional[str] = None
+    pushers: dict = field(default_factory=dict)
+
+    @property
+    def label(self):
+        return self.name or self.address
+
+
+class Supervisor:
+    """Watchdog, keep-alive and outlet flushing for a set of headsets.
+
+    A headset ends with ``TIMEOUT`` once it sent no data for ``timeout``
+    seconds (None disables the watchdog), with ``DISCONNECTED`` as soon as
+    its link drops, or with ``STOPPED`` when ``stop()`` is called or
+    ``duration`` runs out. ``on_end(headset, reason)`` is called as each one
+    ends. ``stop()`` may be called from any thread.
+
+    With a ``reconnect(headset)`` callable, a headset that timed out or
+    dropped is first given up to ``reconnect_attempts`` (-1: forever) calls
+    of it, ``backoff`` seconds apart and doubling up to ``max_backoff``; it
+    only ends if none returns True. ``reconnect`` blocks, so it runs in an
+    executor thread.
+    """
+
+    def __init__(self, time_func=time, timeout=AUTO_DISCONNECT_DELAY,
+                 flush_interval=LSL_MAX_CHUNK_LATENCY, keep_alive_interval=None, on_end=None,
+                 reconnect=None, reconnect_attempts=-1, backoff=RETRY_SLEEP_TIMEOUT,
+                 max_backoff=RECONNECT_MAX_BACKOFF):
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f'Supervisor: timeout must be > 0, got {timeout}')
+        if backoff < 0 or max_backoff < backoff:
+            raise ValueError(
+                f'Supervisor: need 0 <= backoff <= max_backoff, got {backoff}, {max_backoff}'
+            )
+        self.time_func = time_func
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+        self.keep_alive_interval = keep_alive_interval
+        self.on_end = on_end
+        self.reconnect = reconnect
+        self.reconnect_attempts = reconnect_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reconnects = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._reconnecting: set = set()
+
+    def stop(self):
+        """End every headset with ``STOPPED``; thread-safe."""
+        self._stopping = True
+        loop, event = self._loop, self._stop
+        if loop is not None and event is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(event.set)
+
+    async def run(self, headsets, duration=None):
+        """Supervise ``headsets`` until all of them ended.
+
+        Pushers are flushed as their headset ends. Returns the end reason of
+        each headset, in order.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self._stopping:
+            self._stop.set()
+        reasons: list = [STOPPED] * len(headsets)
+        watchers = {
+            asyncio.ensure_future(self._follow(headset)): i for i, headset in enumerate(headsets)
+        }
+        timers = [asyncio.ensure_future(self._flush(headsets, watchers))]
+        if self.keep_alive_interval:
+            timers += [asyncio.ensure_future(self._keep_alive(h)) for h in headsets]
+        stopper = asyncio.ensure_future(
+            asyncio.wait_for(self._stop.wait(), duration) if duration is not None
+            else self._stop.wait())
+        pending = set(watchers)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending | {stopper}, return_when=asyncio.FIRST_COMPLETED)
+                for watcher in done & pending:
+                    self._end(headsets[watchers[watcher]], watcher.result())
+                    reasons[watchers[watcher]] = watcher.result()
+                pending -= done
+                if stopper in done:
+                    break
+        finally:
+            for task in [*pending, *timers, stopper]:
+                task.cancel()
+            await asyncio.gather(*pending, *timers, stopper, return_exceptions=True)
+            # let a reconnect already under way finish before handing back
+            await asyncio.gather(*self._reconnecting, return_exceptions=True)
+            self._reconnecting.clear()
+            for watcher in pending:
+                self._end(headsets[watchers[watcher]], STOPPED)
+            self._stop = None
+        return reasons
+
+    def _end(self, headset, reason):
+        logger.debug('%s ended: %s (%.2fs since last data)', headset.label, reason,
+                     self.time_func() - headset.muse.last_timestamp)
+        for pusher in headset.pushers.values():
+            pusher.flush()
+        if self.on_end is not None:
+            self.on_end(headset, reason)
+
+    async def _follow(self, headset):
+        while True:
+            reason = await self._watch(headset)
+            if self.reconnect is None or not await self._reconnect(headset, reason):
+                return reason
+
+    async def _reconnect(self, headset, reason):
+        logger.info('%s %s; reconnecting', headset.label, reason)
+        # push what was received before the outage
+        for pusher in headset.pushers.values():
+            pusher.flush()
+        loop = asyncio.get_running_loop()
+        attempt, delay = 0, self.backoff
+        while self.reconnect_attempts < 0 or attempt < self.reconnect_attempts:
+            if attempt:
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, self.max_backoff)
+            attempt += 1
+            attempt_done = loop.run_in_executor(None, self.reconnect, headset)
+            self._reconnecting.add(attempt_done)
+            try:
+                connected = await asyncio.shield(attempt_done)
+            except Exception as error:
+                logger.warning('Reconnecting %s failed: %s', headset.label, error)
+                connected = False
+            self._reconnecting.discard(attempt_done)
+            if connected:
+                self.reconnects += 1
+                return True
+            logger.debug('Reconnect attempt %d to %s failed', attempt, headset.label)
+        return False
+
+    async def _watch(self, headset):
+        loop = asyncio.get_running_loop()
+        dropped = asyncio.Event()
+        device: Any = getattr(headset.muse, 'device', None)
+        register = getattr(device, 'register_disconnect_callback', None)
+        on_disconnect = lambda event: loop.call_soon_threadsafe(dropped.set)  # noqa: E731
+        if register is not None:
+            register(on_disconnect)
+        try:
+            while True:
+                wait = None
+                if self.timeout is not None:
+                    wait = headset.muse.last_timestamp + self.timeout - self.time_func()
+                    if wait <= 0:
+                        return TIMEOUT
+                try:
+                    await asyncio.wait_for(dropped.wait(), wait)
+                    return DISCONNECTED
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if register is not None:
+                device.remove_disconnect_callback(on_disconnect)
+
+    async def _flush(self, headsets, watchers):
+        # with no latency budget pushers flush themselves on every block
+        if not self.flush_interval or self.flush_interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            for watcher, i in watchers.items():
+                if not watcher.done():
+                    for pusher in headsets[i].pushers.values():
+                        pusher.flush_due()
+
+    async def _keep_alive(self, headset):
+        keep_alive = getattr(headset.muse, 'keep_alive', None)
+        if keep_alive is None:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.keep_alive_interval)
+            logger.debug('Sending keep-alive to %s', headset.label)
+            try:
+                await loop.run_in_executor(None, keep_alive)
+            except Exception as error:
+                logger.warning('Keep-alive to %s failed: %s', headset.label, error)
+
+
+def supervise(supervisor, headsets, duration=None):
+    """Block on ``supervisor.run`` on the backend event loop.
+
+    Ctrl-C stops the supervisor as ``stop()`` does. Returns the end reasons.
+    """
+    loop = backends._get_event_loop()
+    if backends.loop_thread_running():
+        future = asyncio.run_coroutine_threadsafe(supervisor.run(headsets, duration), loop)
+
+        def wait():
+            return future.result()
+    else:
+        run = asyncio.ensure_future(supervisor.run(headsets, duration), loop=loop)
+
+        def wait():
+            return backends._wait(run)
+    try:
+        return wait()
+    except KeyboardInterrupt:
+        supervisor.stop()
+        return wait()
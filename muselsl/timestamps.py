@@ -0,0 +1,213 @@
+"""Sample-index to host-time regression shared by Muse and Athena streams.
+
+BLE notifications reach the host in bursts, so stamping samples with their
+arrival time gives jittery, duplicated timestamps. Each fixed-rate stream
+instead keeps a running sample index and fits ``host_time = offset + slope *
+index`` with recursive least squares (see https://arxiv.org/pdf/1308.3846.pdf),
+then stamps every sample from the fit.
+
+The fit is kept in information form (``A theta = g``), which makes a batch of
+packets a single vectorized update and lets old observations fade with a
+forgetting factor so the slope keeps tracking host clock drift over long
+sessions. Packets arriving far later than the fit predicts (a delayed BLE
+burst) are left out of the fit; they still get their sample indices.
+"""
+
+from time import time
+
+import numpy as np
+
+# Prior weight on the nominal sampling rate, in units of one observation
+# spanning one second. Keeps the slope sane until the data pins it down.
+_SLOPE_PRIOR = 10.0
+_OFFSET_PRIOR = 1e-6
+
+
+class TimestampCorrector:
+    """Dejittered, gap-aware timestamps for one fixed-rate stream.
+
+    ``forgetting`` is applied once per observation (one observation per
+    packet): 1.0 never forgets, 0.9999 keeps roughly the last 10000 packets.
+    An observation whose arrival is more than ``outlier_threshold`` times the
+    running jitter (at least ``min_jitter`` seconds) later than predicted is
+    rejected; after ``max_rejects`` rejections in a row the host clock is
+    assumed to have stepped and the fit is re-anchored on the new arrivals.
+    """
+
+    def __init__(self, sampling_rate, time_func=time, forgetting=0.9999,
+                 outlier_threshold=6.0, min_jitter=0.005, max_rejects=32, warmup=16):
+        if sampling_rate <= 0:
+            raise ValueError(
+                f'TimestampCorrector: sampling_rate must be > 0, got {sampling_rate}'
+            )
+        if not 0 < forgetting <= 1:
+            raise ValueError(
+                f'TimestampCorrector: forgetting must be in (0, 1], got {forgetting}'
+            )
+        self.sampling_rate = sampling_rate
+        self.time_func = time_func
+        self.forgetting = forgetting
+        self.outlier_threshold = outlier_threshold
+        self.min_jitter = min_jitter
+        self.max_rejects = max_rejects
+        self.warmup = warmup
+        self._period = 1.0 / sampling_rate
+        self._sample_index = 0
+        # Host times are stored relative to _t0 and sample indices (in
+        # nominal seconds) relative to _origin, re-centred on every update
+        # so the 2x2 system stays well conditioned over long sessions.
+        self._t0 = time_func()
+        self._origin = 0.0
+        self._A = np.diag([_OFFSET_PRIOR, _SLOPE_PRIOR])
+        self._g = self._A @ np.array([0.0, 1.0])
+        self._theta = np.array([0.0, 1.0])
+        self._rejects_in_row = 0
+        self._anchor_pending = False
+        self.observations = 0
+        self.rejected = 0
+        self.reanchored = 0
+        self.jitter = min_jitter
+        self.residual_mean = 0.0
+        self.residual_ms = 0.0
+        self.residual_max = 0.0
+
+    @property
+    def sample_index(self):
+        """Index of the next sample to be stamped."""
+        return self._sample_index
+
+    @property
+    def reg_params(self):
+        """``[intercept, slope]`` mapping an absolute sample index to host time."""
+        offset, slope = self._theta
+        slope = slope * self._period
+        return np.array([self._t0 + offset - slope * self._origin / self._period, slope])
+
+    def skip(self, n_samples):
+        """Advance over ``n_samples`` lost samples without an observation."""
+        self._sample_index += n_samples
+
+    def reanchor(self):
+        """Re-anchor the fit on the next observation, keeping the fitted rate.
+
+        For resuming after a reconnect: how many samples were lost in the
+        meantime is unknown, so sample indices carry on and the timestamps
+        jump ahead by the outage instead of restarting the stream.
+        """
+        self._anchor_pending = True
+
+    def predict(self, indices):
+        """Host timestamps for absolute sample ``indices`` from the current fit."""
+        x = np.asarray(indices, dtype=np.float64) * self._period - self._origin
+        return self._t0 + self._theta[0] + self._theta[1] * x
+
+    def timestamps(self, n_samples, host_time=None):
+        """Consume the next ``n_samples`` indices, refit on their last one
+        arriving at ``host_time`` (default: now), and stamp them."""
+        if host_time is None:
+            host_time = self.time_func()
+        return self.timestamps_batch([n_samples], [host_time])
+
+    def timestamps_batch(self, counts, host_times):
+        """Vectorized ``timestamps`` over a batch of packets.
+
+        Packet ``i`` holds the next ``counts[i]`` samples and arrived at
+        ``host_times[i]``; packets with a zero count add no observation.
+        Returns the concatenated timestamps of all samples.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        total = int(counts.sum())
+        idxs = np.arange(total) + self._sample_index
+        ends = np.cumsum(counts)[counts > 0] - 1
+        if len(ends):
+            self.update(idxs[ends], np.asarray(host_times, dtype=np.float64)[counts > 0])
+        self._sample_index += total
+        return self.predict(idxs)
+
+    def update(self, indices, host_times):
+        """Refit on observations ``(indices[i], host_times[i])``, in arrival order.
+
+        Returns a boolean mask of the observations used by the fit.
+        """
+        x = np.asarray(indices, dtype=np.float64) * self._period
+        y = np.asarray(host_times, dtype=np.float64) - self._t0
+        self._recentre(x[-1])
+        x = x - self._origin
+        if self._anchor_pending:
+            self._anchor_pending = False
+            self._reanchor(x[0], y[0])
+
+        residuals = y - (self._theta[0] + self._theta[1] * x)
+        threshold = self.outlier_threshold * max(self.jitter, self.min_jitter)
+        accepted = residuals <= threshold
+        # not enough data yet to call anything late
+        warm = max(0, self.warmup - self.observations)
+        accepted[:warm] = True
+        self.observations += len(x)
+
+        n_rejected = int((~accepted).sum())
+        self.rejected += n_rejected
+        if accepted.any():
+            last = np.flatnonzero(accepted)[-1]
+            self._rejects_in_row = len(x) - 1 - last
+        else:
+            self._rejects_in_row += len(x)
+        if self._rejects_in_row >= self.max_rejects:
+            self._reanchor(x[-1], y[-1])
+            return accepted
+
+        x, y, residuals = x[accepted], y[accepted], residuals[accepted]
+        if not len(x):
+            return accepted
+        m = len(x)
+        decay = self.forgetting ** m
+        weights = self.forgetting ** np.arange(m - 1, -1, -1)
+        H = np.stack([np.ones(m), x], axis=1)
+        self._A = decay * self._A + H.T @ (weights[:, None] * H)
+        self._g = decay * self._g + H.T @ (weights * y)
+        self._theta = np.linalg.solve(self._A, self._g)
+        self._track_residuals(residuals)
+        return accepted
+
+    def stats(self):
+        """Residual (arrival minus prediction) statistics, in seconds."""
+        intercept, slope = self.reg_params
+        return {
+            'observations': self.observations,
+            'rejected': self.rejected,
+            'reanchored': self.reanchored,
+            'jitter': float(self.jitter),
+            'residual_mean': float(self.residual_mean),
+            'residual_rms': float(np.sqrt(self.residual_ms)),
+            'residual_max': self.residual_max,
+            'sampling_rate': float(1.0 / slope),
+        }
+
+    def _recentre(self, origin):
+        shift = origin - self._origin
+        if not shift:
+            return
+        # h' = T h with T = [[1, 0], [-shift, 1]]
+        T = np.array([[1.0, 0.0], [-shift, 1.0]])
+        self._A = T @ self._A @ T.T
+        self._g = T @ self._g
+        self._theta = np.array([self._theta[0] + self._theta[1] * shift, self._theta[1]])
+        self._origin = origin
+
+    def _reanchor(self, x, y):
+        slope = self._theta[1]
+        self._theta = np.array([y - slope * x, slope])
+        self._A = np.diag([_OFFSET_PRIOR, _SLOPE_PRIOR])
+        self._g = self._A @ self._theta
+        self._rejects_in_row = 0
+        self.reanchored += 1
+
+    def _track_residuals(self, residuals):
+        # exponentially weighted over the last ~20 observations
+        alpha = 0.05
+        weights = alpha * (1 - alpha) ** np.arange(len(residuals) - 1, -1, -1)
+        keep = (1 - alpha) ** len(residuals)
+        self.jitter = keep * self.jitter + weights @ np.abs(residuals)
+        self.residual_mean = keep * self.residual_mean + weights @ residuals
+        self.residual_ms = keep * self.residual_ms + weights @ residuals ** 2
+        self.residual_max = max(self.residual_max, float(np.abs(residuals).max()))
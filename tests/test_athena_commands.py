@@ -12,3 +12,125 @@ def test_command_framing_dc001():
 
 def test_command_framing_preset():
     assert _cmd_bytes('p1041') == [6, ord('p'), ord('1'), ord('0'), ord('4'), ord('1'), ord('\n')]
+
+
+class _ReplyingDevice:
+    """Answers every command with a control reply split over two fragments."""
+
+    def __init__(self, athena, reply=True, data_on=()):
+        self.athena = athena
+        self.reply = reply
+        self.data_on = data_on
+        self.sent = []
+
+    def char_write_uuid(self, uuid, value, wait_for_response=True):
+        cmd = bytes(value[1:-1]).decode()
+        self.sent.append(cmd)
+        if cmd in self.data_on:
+            self.athena._notifications += 1
+        elif self.reply:
+            for fragment in ('{"rc"', ':0}'):
+                self.athena._handle_control(0x000e, bytes([len(fragment)]) + fragment.encode())
+
+
+def _athena(**kwargs):
+    from muselsl.athena import Athena
+    messages = []
+    athena = Athena('addr', callback_control=messages.append, **kwargs)
+    athena.enable_control = True
+    return athena, messages
+
+
+def test_init_and_start_wait_only_for_replies():
+    import time
+    athena, messages = _athena()
+    athena.device = _ReplyingDevice(athena)
+    start = time.monotonic()
+    athena._run_init_sequence()
+    athena.start()
+    assert time.monotonic() - start < 0.2
+    assert athena.device.sent == ['v6', 's', 'h', 'p1041', 's', 'dc001', 'dc001', 'L1', 's']
+    assert athena._replies == 9
+    assert messages[:2] == ['{"rc"', ':0}']
+
+
+def test_dc001_is_acknowledged_by_data():
+    athena, _ = _athena()
+    athena.command_timeout = 5.0
+    athena.device = _ReplyingDevice(athena, reply=False, data_on=('dc001',))
+    assert athena._command('dc001', until_data=True) is True
+
+
+def test_command_times_out_without_reply():
+    import time
+    athena, _ = _athena()
+    athena.command_timeout = 0.05
+    athena.device = _ReplyingDevice(athena, reply=False)
+    start = time.monotonic()
+    assert athena._command('v6') is False
+    assert 0.05 <= time.monotonic() - start < 0.5
+
+
+class _LateDevice:
+    """Holds every reply back until the next command is written."""
+
+    def __init__(self, athena, lost=()):
+        self.athena = athena
+        self.lost = lost
+        self.held = []
+
+    def char_write_uuid(self, uuid, value, wait_for_response=True):
+        for fragment in self.held:
+            self.athena._handle_control(0x000e, bytes([len(fragment)]) + fragment.encode())
+        cmd = bytes(value[1:-1]).decode()
+        self.held = [] if cmd in self.lost else ['{"rc":0}']
+
+
+def test_late_reply_does_not_acknowledge_the_next_command():
+    athena, _ = _athena()
+    athena.command_timeout = 0.02
+    athena.device = _LateDevice(athena)
+    assert athena._command('v6') is False
+    # the reply to v6 arrives while s is waiting
+    assert athena._command('s') is False
+    assert athena._replies == 1
+
+
+def test_lost_reply_does_not_shift_later_acknowledgements():
+    athena, _ = _athena()
+    athena.command_timeout = 0.02
+    athena.device = _ReplyingDevice(athena)
+    athena.device.reply = False
+    assert athena._command('v6') is False
+    athena.device.reply = True
+    # the reply to 's' is taken for the one v6 never got, once
+    assert athena._command('s') is False
+    assert athena._command('h') is True
+    assert athena._command('s') is True
+
+
+class _ConnectingDevice(_ReplyingDevice):
+    def subscribe(self, uuid, callback=None):
+        pass
+
+
+def test_disable_light_reply_is_not_taken_for_v6():
+    athena, _ = _athena(disable_light=True)
+    athena.command_timeout = 1.0
+    assert athena.connect(adapter=object(), device=_ConnectingDevice(athena)) is True
+    assert athena.device.sent == ['L0', 'v6', 's', 'h', 'p1041', 's']
+    assert athena._commands_sent == athena._replies == 6
+
+
+def test_stop_start_cycles_keep_replies_matched():
+    import time
+    athena, _ = _athena()
+    athena.command_timeout = 1.0
+    athena.device = _ConnectingDevice(athena)
+    start = time.monotonic()
+    for _ in range(3):
+        athena.start()
+        athena.stop()
+        athena.select_preset('p21')
+        assert athena._commands_sent == athena._replies
+    assert time.monotonic() - start < 0.5
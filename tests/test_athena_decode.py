@@ -46,3 +46,47 @@ def test_decode_optics_canonical_placement():
     # one 20-bit sample on channel 0 of tag 0x34 -> canonical index 4
     out = decode_optics(bytes(data), 0x34, 4, 3)
     assert out.shape == (16, 3)
+
+
+def test_unpack_lsb_words_matches_extract_lsb_bits():
+    from muselsl.athena import unpack_lsb_words
+    rng = np.random.default_rng(0)
+    for bit_width in (12, 14, 20, 24):
+        n_words = 16
+        data = rng.integers(0, 256, (n_words * bit_width + 7) // 8, dtype=np.uint8).tobytes()
+        expected = [extract_lsb_bits(data, i * bit_width, bit_width) for i in range(n_words)]
+        assert unpack_lsb_words(data, bit_width, n_words).tolist() == expected
+
+
+def test_decode_eeg_matches_bitwise_reference():
+    from muselsl.athena import EEG_MIDPOINT
+    from muselsl.constants import MUSE_ATHENA_EEG_SCALE
+    rng = np.random.default_rng(1)
+    data = rng.integers(0, 256, 28, dtype=np.uint8).tobytes()
+    for n_channels, n_samples in ((4, 4), (8, 2)):
+        expected = np.zeros((n_channels, n_samples), dtype=np.float32)
+        for s in range(n_samples):
+            for c in range(n_channels):
+                raw = extract_lsb_bits(data, (s * n_channels + c) * 14, 14)
+                expected[c, s] = (raw - EEG_MIDPOINT) * MUSE_ATHENA_EEG_SCALE
+        assert np.array_equal(decode_eeg(data, n_channels, n_samples), expected)
+
+
+def test_decode_eeg_stacked_blocks():
+    rng = np.random.default_rng(2)
+    blocks = [rng.integers(0, 256, 28, dtype=np.uint8).tobytes() for _ in range(3)]
+    stacked = decode_eeg(b''.join(blocks), 4, 12)
+    assert np.array_equal(stacked, np.hstack([decode_eeg(b, 4, 4) for b in blocks]))
+
+
+def test_decode_optics_matches_bitwise_reference():
+    from muselsl.athena import optics_canonical_index
+    rng = np.random.default_rng(3)
+    for tag, n_channels, n_samples, data_len in ((0x34, 4, 3, 30), (0x35, 8, 2, 40), (0x36, 16, 1, 40)):
+        data = rng.integers(0, 256, data_len, dtype=np.uint8).tobytes()
+        expected = np.zeros((16, n_samples), dtype=np.float32)
+        for s in range(n_samples):
+            for c in range(n_channels):
+                raw = extract_lsb_bits(data, (s * n_channels + c) * 20, 20)
+                expected[optics_canonical_index(tag, c), s] = raw
+        assert np.array_equal(decode_optics(data, tag, n_channels, n_samples), expected)
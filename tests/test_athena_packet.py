@@ -1,6 +1,9 @@
 import struct
 
+import numpy as np
+
 from muselsl.athena import (
+    iter_packets,
     iter_sensor_blocks,
     split_packets,
     decode_acc_gyro,
@@ -38,6 +41,20 @@ def test_split_packets_rejects_bad_length():
     assert split_packets(bad) == []
 
 
+def test_iter_packets_yields_views():
+    p1 = _build_eeg_packet(packet_index=1)
+    p2 = _build_eeg_packet(packet_index=2)
+    notification = bytearray(p1 + p2)
+    views = list(iter_packets(notification))
+    assert [bytes(v) for v in views] == [p1, p2]
+    assert all(isinstance(v, memoryview) for v in views)
+    # views alias the notification buffer rather than copying it
+    notification[len(p1) + 14] = 0xAB
+    _tag, _pkg, payload = next(iter_sensor_blocks(views[1]))
+    assert isinstance(payload, memoryview)
+    assert payload[0] == 0xAB
+
+
 def test_iter_sensor_blocks_primary_eeg():
     pkt = _build_eeg_packet()
     blocks = list(iter_sensor_blocks(pkt))
@@ -72,6 +89,18 @@ def test_decode_acc_gyro_shapes():
     assert gyro[0, 0] < 0 or acc[0, 0] != 0
 
 
+def test_decode_acc_gyro_values_and_views():
+    from muselsl.constants import MUSE_ATHENA_ACCELEROMETER_SCALE, MUSE_ATHENA_GYRO_SCALE
+    raw = [i * 97 - 800 for i in range(18)]
+    data = struct.pack('<18h', *raw)
+    acc, gyro = decode_acc_gyro(data, 3)
+    for sample in range(3):
+        for axis in range(3):
+            assert acc[axis, sample] == np.float32(raw[sample * 6 + axis] * MUSE_ATHENA_ACCELEROMETER_SCALE)
+            assert gyro[axis, sample] == np.float32(raw[sample * 6 + 3 + axis] * MUSE_ATHENA_GYRO_SCALE)
+    assert acc.base is not None and acc.base is gyro.base
+
+
 def test_decode_battery():
     # percent = raw / 512, so a full 100% reads ~51200
     assert decode_battery(struct.pack('<H', 512)) == 1.0
@@ -82,3 +111,235 @@ def test_optics_canonical_index():
     assert optics_canonical_index(0x34, 0) == 4
     assert optics_canonical_index(0x35, 3) == 3
     assert optics_canonical_index(0x36, 15) == 15
+
+
+def _build_packet(tag, payload, packet_index=7, subpackets=(), block_index=None):
+    body = bytes(payload) + b''.join(
+        bytes([sub_tag, packet_index & 0xFF, 0, 0, 0]) + bytes(sub) for sub_tag, sub in subpackets
+    )
+    pkt = bytearray(14 + len(body))
+    pkt[0] = len(pkt)
+    struct.pack_into('<H', pkt, 1, packet_index)
+    pkt[9] = tag
+    pkt[10] = packet_index & 0xFF if block_index is None else block_index
+    pkt[14:] = body
+    return bytes(pkt)
+
+
+def test_decode_notifications_stacks_packets():
+    from muselsl.athena import decode_eeg, decode_notifications
+    rng = np.random.default_rng(4)
+    eeg = [rng.integers(0, 256, 28, dtype=np.uint8).tobytes() for _ in range(2)]
+    imu = rng.integers(0, 256, 36, dtype=np.uint8).tobytes()
+    notification = _build_packet(0x11, eeg[0], 1, [(0x47, imu)]) + _build_packet(0x11, eeg[1], 2)
+    streams, battery = decode_notifications(notification)
+    assert battery is None
+    samples, counts = streams['eeg']
+    assert counts.tolist() == [8]
+    assert np.array_equal(samples, np.hstack([decode_eeg(e, 4, 4) for e in eeg]))
+    acc, gyro = decode_acc_gyro(imu, 3)
+    assert np.array_equal(streams['acc'][0], acc)
+    assert np.array_equal(streams['gyro'][0], gyro)
+
+
+def test_athena_callbacks_once_per_notification():
+    from muselsl.athena import Athena
+    calls = []
+    athena = Athena('addr', callback_eeg=lambda d, t: calls.append((d, t)), time_func=lambda: 100.0)
+    notification = _build_packet(0x11, bytes(28), 1) + _build_packet(0x11, bytes(28), 2)
+    athena._handle_data(0x0014, notification)
+    assert len(calls) == 1
+    samples, timestamps = calls[0]
+    assert samples.shape == (4, 8)
+    assert len(timestamps) == 8
+    assert np.all(np.diff(timestamps) > 0)
+
+
+def test_decode_batch_timestamps_each_notification():
+    from muselsl.athena import Athena
+    athena = Athena('addr', callback_eeg=lambda d, t: None, time_func=lambda: 100.0)
+    notifications = [_build_packet(0x11, bytes(28), i) for i in range(3)]
+    batch = athena.decode_batch(notifications, [100.0, 100.01, 100.02])
+    samples, timestamps = batch['eeg']
+    assert samples.shape == (4, 12)
+    assert len(timestamps) == 12
+    assert 'acc' not in batch
+
+
+def test_decode_plans_cover_sensor_config():
+    from muselsl.athena import DECODE_PLANS
+    from muselsl.constants import MUSE_ATHENA_SENSOR_CONFIG
+    assert len(DECODE_PLANS) == 256
+    for tag in range(256):
+        plan = DECODE_PLANS[tag]
+        if tag not in MUSE_ATHENA_SENSOR_CONFIG:
+            assert plan is None
+            continue
+        assert plan.tag == tag
+        assert plan.sensor_type == MUSE_ATHENA_SENSOR_CONFIG[tag][0]
+    assert DECODE_PLANS[0x36].bit_width == 20
+    assert DECODE_PLANS[0x47].streams == ('acc', 'gyro')
+    assert DECODE_PLANS[0x53].decode is None
+
+
+def test_sequence_gap_advances_timestamps_and_counts_loss():
+    from muselsl.athena import Athena
+    calls = []
+    clock = [100.0]
+    athena = Athena('addr', callback_eeg=lambda d, t: calls.append((d, t)), time_func=lambda: clock[0])
+    athena._handle_data(0x0014, _build_packet(0x11, bytes(28), 1))
+    clock[0] += 12 / 256.0
+    athena._handle_data(0x0014, _build_packet(0x11, bytes(28), 4))  # packets 2-3 lost
+    stats = athena.loss_stats()
+    assert stats['packets_lost'] == 2
+    assert stats['blocks_lost'] == {'eeg': 2}
+    assert stats['samples_lost'] == {'eeg': 8}
+    samples, timestamps = calls[1]
+    assert samples.shape == (4, 4)
+    # the 8 missing samples were skipped, not compressed into the gap
+    assert athena._correctors['eeg']._sample_index == 16
+    step = timestamps[1] - timestamps[0]
+    assert timestamps[0] - calls[0][1][-1] > 8 * step
+
+
+def test_sequence_gap_fill_emits_nan():
+    from muselsl.athena import Athena
+    calls = []
+    athena = Athena(
+        'addr', callback_eeg=lambda d, t: calls.append((d, t)), time_func=lambda: 100.0,
+        fill_gaps=True,
+    )
+    athena._handle_data(0x0014, _build_packet(0x11, bytes(28), 1))
+    athena._handle_data(0x0014, _build_packet(0x11, bytes(28), 3))
+    samples, timestamps = calls[1]
+    assert samples.shape == (4, 8)
+    assert len(timestamps) == 8
+    assert np.isnan(samples[:, :4]).all()
+    assert not np.isnan(samples[:, 4:]).any()
+
+
+def test_sequence_duplicate_dropped():
+    from muselsl.athena import Athena
+    calls = []
+    athena = Athena('addr', callback_eeg=lambda d, t: calls.append((d, t)), time_func=lambda: 100.0)
+    pkt = _build_packet(0x11, bytes(28), 5)
+    athena._handle_data(0x0014, pkt)
+    athena._handle_data(0x0014, pkt)
+    assert len(calls) == 1
+    assert athena.loss_stats()['duplicates'] == {'eeg': 1}
+
+
+def test_reorder_buffer_releases_in_index_order():
+    from muselsl.athena import PacketReorderBuffer
+    buf = PacketReorderBuffer(latency=0.05)
+    p1, p2, p3 = (_build_packet(0x11, bytes(28), i) for i in (1, 2, 3))
+    assert [bytes(p) for p, _ in buf.push(p1, 0.0)] == [p1]
+    assert buf.push(p3, 0.001) == []
+    assert [bytes(p) for p, _ in buf.push(p2, 0.002)] == [p2, p3]
+    assert len(buf) == 0
+
+
+def test_reorder_buffer_skips_missing_after_latency():
+    from muselsl.athena import PacketReorderBuffer
+    buf = PacketReorderBuffer(latency=0.05)
+    p1, p3, p4 = (_build_packet(0x11, bytes(28), i) for i in (1, 3, 4))
+    buf.push(p1, 0.0)
+    assert buf.push(p3, 0.01) == []
+    released = buf.push(p4, 0.07)
+    assert [bytes(p) for p, _ in released] == [p3, p4]
+    assert buf.skipped == 1
+    # packet 2 finally shows up after the window moved on
+    late = buf.push(_build_packet(0x11, bytes(28), 2), 0.08)
+    assert len(late) == 1 and buf.late == 1
+
+
+def test_athena_reorders_interleaved_notifications():
+    from muselsl.athena import Athena, decode_eeg
+    calls = []
+    athena = Athena(
+        'addr', callback_eeg=lambda d, t: calls.append((d, t)), time_func=lambda: 100.0,
+        reorder_latency_ms=50,
+    )
+    rng = np.random.default_rng(5)
+    payloads = [rng.integers(0, 256, 28, dtype=np.uint8).tobytes() for _ in range(3)]
+    athena._handle_data(0x0014, _build_packet(0x11, payloads[0], 1))
+    athena._handle_data(0x0017, _build_packet(0x11, payloads[2], 3))
+    athena._handle_data(0x0014, _build_packet(0x11, payloads[1], 2))
+    received = np.hstack([d for d, _ in calls])
+    assert np.array_equal(received, np.hstack([decode_eeg(p, 4, 4) for p in payloads]))
+    assert athena.loss_stats()['out_of_order'] == {}
+
+
+def test_athena_dispatches_held_packets_on_disconnect_and_restart():
+    from muselsl.athena import Athena
+    calls = []
+    athena = Athena(
+        'addr', callback_eeg=lambda d, t: calls.append(d), time_func=lambda: 100.0,
+        reorder_latency_ms=50,
+    )
+    payload = bytes(28)
+    athena._handle_data(0x0014, _build_packet(0x11, payload, 1))
+    athena._handle_data(0x0017, _build_packet(0x11, payload, 3))
+    assert len(calls) == 1 and len(athena._reorder) == 1
+    athena.disconnect(stop_adapter=False)
+    assert len(calls) == 2 and len(athena._reorder) == 0
+
+    athena._handle_data(0x0017, _build_packet(0x11, payload, 4))
+    athena._handle_data(0x0017, _build_packet(0x11, payload, 6))
+    assert len(calls) == 3
+    athena._reset_timestamps(reanchor=True)
+    assert len(calls) == 4
+
+
+def test_swapped_blocks_are_not_counted_as_lost():
+    from muselsl.athena import Athena
+    calls = []
+    athena = Athena('addr', callback_eeg=lambda d, t: calls.append(d), time_func=lambda: 100.0)
+    for index in (0, 1, 3, 2, 4, 5, 7, 6, 8, 9):
+        athena._handle_data(0x0014, _build_packet(0x11, bytes(28), index))
+    stats = athena.loss_stats()
+    assert stats['packets_lost'] == 0
+    assert stats['blocks_lost'] == {} and stats['samples_lost'] == {}
+    assert stats['out_of_order'] == {'eeg': 2}
+    # each late block's place was skipped when the block after it came
+    assert athena._correctors['eeg']._sample_index == 40
+    assert sum(d.shape[1] for d in calls) == 32
+
+    # a real loss is still counted once the window has moved on
+    athena._handle_data(0x0014, _build_packet(0x11, bytes(28), 11))
+    assert athena.loss_stats()['blocks_lost'] == {'eeg': 1}
+
+
+def test_athena_flushes_reorder_window_once_notifications_stopped():
+    import threading
+    from muselsl.athena import Athena
+    calls = []
+    athena = Athena('addr', callback_eeg=lambda d, t: calls.append(d.shape[1]),
+                    time_func=lambda: 100.0, reorder_latency_ms=50)
+    payload = bytes(28)
+
+    class Device:
+        held_at_disconnect = None
+
+        def disconnect(self):
+            self.held_at_disconnect = len(athena._reorder)
+
+    def notify():
+        # every other packet swapped, so the window keeps holding some
+        for index in range(0, 2000, 2):
+            athena._handle_data(0x0017, _build_packet(0x11, payload, index + 1))
+            athena._handle_data(0x0014, _build_packet(0x11, payload, index))
+
+    ble = threading.Thread(target=notify)
+    ble.start()
+    while ble.is_alive():
+        athena._flush_reorder()
+    ble.join()
+    athena._handle_data(0x0014, _build_packet(0x11, payload, 2001))
+    athena.device = Device()
+    athena.disconnect(stop_adapter=False)
+    assert athena.device.held_at_disconnect == 1
+    assert len(athena._reorder) == 0
+    # each packet was decoded once, or dropped as a late one whose place was skipped
+    late = athena.loss_stats()['out_of_order'].get('eeg', 0)
+    assert sum(calls) // 4 + late == 2002
@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+import pytest
+
+from muselsl.decode_worker import DecodeWorker, NotificationRing
+
+
+def test_ring_round_trip_and_drop_when_full():
+    ring = NotificationRing(n_slots=2, slot_size=8)
+    assert ring.put(b'abc', 1.0)
+    assert ring.put(bytearray(b'de'), 2.0)
+    assert not ring.put(b'f', 3.0)
+    assert ring.dropped == 1
+    assert not ring.put(bytes(9), 4.0)
+    assert ring.oversized == 1
+    views, host_times = ring.peek(8)
+    assert [bytes(v) for v in views] == [b'abc', b'de']
+    assert host_times == [1.0, 2.0]
+    ring.consume(len(views))
+    assert len(ring) == 0
+    assert ring.max_depth == 2
+    # slots are reused after consume
+    assert ring.put(b'gh', 5.0)
+    assert [bytes(v) for v in ring.peek(8)[0]] == [b'gh']
+
+
+def test_worker_drains_in_batches():
+    received = []
+    done = threading.Event()
+
+    def handler(views, host_times):
+        received.extend(bytes(v) for v in views)
+        if len(received) == 5:
+            done.set()
+
+    worker = DecodeWorker(handler, n_slots=8, slot_size=4, max_batch=2)
+    for i in range(5):
+        worker.put(bytes([i]), float(i))
+    worker.start()
+    assert done.wait(2.0)
+    worker.stop()
+    assert received == [bytes([i]) for i in range(5)]
+    assert worker.stats()['batches'] == 3
+
+
+def test_athena_decode_thread_dispatches():
+    from muselsl.athena import Athena, decode_eeg
+    from test_athena_packet import _build_packet
+    calls = []
+    athena = Athena(
+        'addr', callback_eeg=lambda d, t: calls.append((d, t)), time_func=lambda: 100.0,
+        decode_thread=True,
+    )
+    payload = np.arange(28, dtype=np.uint8).tobytes()
+    athena._handle_data(0x0014, _build_packet(0x11, payload, 1))
+    athena._handle_data(0x0014, _build_packet(0x11, payload, 2))
+    assert calls == []
+    assert athena.worker_stats()['depth'] == 2
+    athena._worker.drain()
+    received = np.hstack([d for d, _ in calls])
+    assert np.array_equal(received, np.hstack([decode_eeg(payload, 4, 4)] * 2))
+
+
+def test_busy_worker_is_not_forgotten_by_stop():
+    release = threading.Event()
+    worker = DecodeWorker(lambda views, host_times: release.wait(2.0), n_slots=4, slot_size=4)
+    worker.start()
+    worker.put(b'a', 0.0)
+    worker.stop(timeout=0.05)
+    busy = worker._thread
+    assert busy is not None and busy.is_alive()
+    with pytest.raises(RuntimeError, match='still stopping'):
+        worker.start(timeout=0.05)
+    release.set()
+    worker.start()
+    assert not busy.is_alive() and worker._thread is not busy
+    assert sum(thread.name == worker.name for thread in threading.enumerate()) == 1
+    worker.stop()
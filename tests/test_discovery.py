@@ -0,0 +1,81 @@
+import importlib
+import time
+
+import pexpect
+
+# muselsl.stream is shadowed by the stream() function in the package namespace
+stream_module = importlib.import_module('muselsl.stream')
+
+
+def _fake_bluetoothctl(monkeypatch, script, cached=None):
+    real_spawn = pexpect.spawn
+    monkeypatch.setattr(
+        pexpect, 'spawn',
+        lambda command, **kwargs: real_spawn('/bin/sh', ['-c', script], **kwargs),
+    )
+    monkeypatch.setattr(stream_module, '_bluetoothctl_devices', lambda: dict(cached or {}))
+    monkeypatch.setattr(stream_module, 'which', lambda command: '/usr/bin/' + command)
+
+
+def test_bluetoothctl_scan_yields_muse_as_soon_as_it_advertises(monkeypatch):
+    _fake_bluetoothctl(monkeypatch, (
+        "printf 'Discovery started\\n'; "
+        "printf '[\\033[0;92mNEW\\033[0m] Device 11:22:33:44:55:66 Phone\\n'; "
+        "printf '[\\033[0;92mNEW\\033[0m] Device 00:55:DA:B3:1E:6A Muse-1E6A\\n'; "
+        "sleep 5"
+    ))
+    start = time.monotonic()
+    found = stream_module.find_muse('Muse-1E6A')
+    assert found == {'name': 'Muse-1E6A', 'address': '00:55:DA:B3:1E:6A'}
+    assert time.monotonic() - start < 2
+
+
+def test_bluetoothctl_scan_names_known_devices_and_lists_silent_ones(monkeypatch):
+    cached = {'00:55:DA:00:00:01': 'Muse-0001', '00:55:DA:00:00:02': 'Muse-0002'}
+    _fake_bluetoothctl(monkeypatch, (
+        "printf '[bluetooth]# [CHG] Device 00:55:DA:00:00:02 RSSI: -60\\n'; "
+        "printf '[DEL] Device 00:55:DA:00:00:01 Muse-0001\\n'"
+    ), cached)
+    muses = list(stream_module._iter_muses_bluetoothctl(2))
+    assert [m['address'] for m in muses] == ['00:55:DA:00:00:02', '00:55:DA:00:00:01']
+    assert muses[0]['name'] == 'Muse-0002'
+
+
+class _FakeScanner:
+    instances: list = []
+
+    def __init__(self, detection_callback):
+        self._callback = detection_callback
+        self.stopped = False
+        _FakeScanner.instances.append(self)
+
+    async def start(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        adverts = [('AA', None, None), ('AA', None, 'Muse-S'), ('BB', 'Phone', None)]
+        for delay, (address, name, local_name) in zip((0.01, 0.05, 0.1), adverts):
+            device = type('Device', (), {'address': address, 'name': name})()
+            advert = type('Advert', (), {'local_name': local_name})()
+            loop.call_later(delay, self._callback, device, advert)
+
+    async def stop(self):
+        self.stopped = True
+
+
+def test_bleak_iter_scan_streams_and_stops_early(monkeypatch):
+    from muselsl import backends
+    fake = type('bleak', (), {'BleakScanner': _FakeScanner})
+    monkeypatch.setattr(backends, 'bleak', fake)
+    adapter = backends.BleakBackend()
+    start = time.monotonic()
+    scan = adapter.iter_scan(10)
+    seen = []
+    for device in scan:
+        seen.append(device)
+        if device['name']:
+            break
+    scan.close()
+    # unnamed first sighting, then again once the name arrives
+    assert seen == [{'name': None, 'address': 'AA'}, {'name': 'Muse-S', 'address': 'AA'}]
+    assert time.monotonic() - start < 1
+    assert _FakeScanner.instances[-1].stopped
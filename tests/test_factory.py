@@ -1,6 +1,9 @@
+import importlib
+
 from muselsl.athena import Athena
 from muselsl.devices import create_device, probe_athena, probe_legacy_eeg
 from muselsl.muse import Muse
+from muselsl.supervisor import Headset
 
 
 class _MockDevice:
@@ -29,6 +32,7 @@ def test_probe_legacy_eeg():
 def test_create_device_legacy():
     d = create_device('00:11:22:33:44:55', model='legacy')
     assert isinstance(d, Muse)
+    assert d.model == 'legacy' and Muse.__doc__
 
 
 def test_create_device_athena():
@@ -39,3 +43,120 @@ def test_create_device_athena():
 def test_create_device_auto_type():
     d = create_device('00:11:22:33:44:55', model='auto')
     assert type(d).__name__ == '_AutoSelectingDevice'
+
+
+class _MockLink(_MockDevice):
+    def __init__(self, chars):
+        super().__init__(chars)
+        self.subscribed = []
+        self.writes = []
+        self.disconnected = False
+
+    def subscribe(self, uuid, callback=None):
+        self.subscribed.append(uuid)
+
+    def char_write_uuid(self, uuid, value, wait_for_response=True):
+        self.writes.append(bytes(value))
+
+    def char_write_handle(self, handle, value, wait_for_response=True):
+        self.writes.append(bytes(value))
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class _MockAdapter:
+    def __init__(self, device):
+        self.device = device
+        self.connects = 0
+
+    def connect(self, address, retries, name=None):
+        self.connects += 1
+        return self.device
+
+    def stop(self):
+        pass
+
+
+def _patch_adapter(monkeypatch, device):
+    from muselsl import backends
+    adapters = []
+
+    def open_adapter(backend, interface=None):
+        adapters.append(_MockAdapter(device))
+        return adapters[-1]
+
+    monkeypatch.setattr(backends, 'open_adapter', open_adapter)
+    return adapters
+
+
+def test_auto_hands_connection_to_athena(monkeypatch):
+    monkeypatch.setattr(Athena, 'command_timeout', 0.0)
+    link = _MockLink(['273e0013-4c4d-454d-96be-f03bac821358'])
+    adapters = _patch_adapter(monkeypatch, link)
+    d = create_device('00:11:22:33:44:55', model='auto', backend='bleak')
+    assert d.connect() is True
+    assert isinstance(d._impl, Athena)
+    # one link, reused: no disconnect / reconnect
+    assert len(adapters) == 1 and adapters[0].connects == 1
+    assert not link.disconnected
+    assert d._impl.device is link and d._impl.adapter is adapters[0]
+    assert '273e0014-4c4d-454d-96be-f03bac821358' in link.subscribed
+
+
+def test_auto_hands_connection_to_legacy(monkeypatch):
+    link = _MockLink(['273e0003-4c4d-454d-96be-f03bac821358'])
+    adapters = _patch_adapter(monkeypatch, link)
+    d = create_device('00:11:22:33:44:55', model='auto', backend='bleak')
+    d.callback_eeg = lambda data, timestamps: None
+    d.enable_eeg = True
+    assert d.connect() is True
+    assert isinstance(d._impl, Muse)
+    assert len(adapters) == 1 and adapters[0].connects == 1
+    assert d._impl.device is link
+    assert '273e0003-4c4d-454d-96be-f03bac821358' in link.subscribed
+
+
+def test_stream_reconnect_reuses_adapter_model_and_timestamp_fit(monkeypatch):
+    # muselsl.stream is shadowed by the stream() function in the package namespace
+    stream_module = importlib.import_module('muselsl.stream')
+    monkeypatch.setattr(Athena, 'command_timeout', 0.0)
+    link = _MockLink(['273e0013-4c4d-454d-96be-f03bac821358'])
+    adapters = _patch_adapter(monkeypatch, link)
+    d = create_device('00:11:22:33:44:55', model='auto', backend='bleak')
+    assert d.connect() is True
+    d.start()
+    impl = d._impl
+    corrector = impl._corrector('eeg', 256.0)
+
+    assert stream_module._reconnect(Headset(d, '00:11:22:33:44:55')) is True
+    assert link.disconnected
+    # same adapter, same model, no new probe; the fit is kept and re-anchored
+    assert len(adapters) == 1 and adapters[0].connects == 2
+    assert d._impl is impl
+    assert impl._corrector('eeg', 256.0) is corrector and corrector._anchor_pending
+
+
+def test_athena_options_are_ignored_for_legacy_headsets(monkeypatch):
+    link = _MockLink(['273e0003-4c4d-454d-96be-f03bac821358'])
+    _patch_adapter(monkeypatch, link)
+    options = {'decode_thread': True, 'reorder_latency_ms': 20.0, 'fill_gaps': True,
+               'trace_every': 4, 'trace_capacity': 16}
+    d = create_device('00:11:22:33:44:55', model='auto', backend='bleak', **options)
+    assert d.stream_descriptors()
+    assert d.connect() is True
+    assert isinstance(d._impl, Muse)
+    assert isinstance(create_device('00:11:22:33:44:55', model='legacy', **options), Muse)
+
+
+def test_auto_passes_athena_options_on(monkeypatch):
+    monkeypatch.setattr(Athena, 'command_timeout', 0.0)
+    link = _MockLink(['273e0013-4c4d-454d-96be-f03bac821358'])
+    _patch_adapter(monkeypatch, link)
+    d = create_device('00:11:22:33:44:55', model='auto', backend='bleak',
+                      decode_thread=True, reorder_latency_ms=20.0, trace_every=4)
+    assert d.connect() is True
+    assert isinstance(d._impl, Athena)
+    assert d._impl._reorder is not None and d._impl.packet_trace.sample_every == 4
+    assert d._impl.worker_stats() is not None
+    d._impl.disconnect()
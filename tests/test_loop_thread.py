@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from muselsl import backends
+from muselsl.supervisor import STOPPED, Headset, Supervisor, supervise
+
+
+@pytest.fixture
+def loop_thread():
+    loop = backends.start_loop_thread()
+    yield loop
+    backends.stop_loop_thread()
+
+
+def test_calls_are_submitted_to_the_loop_thread(loop_thread):
+    async def where():
+        return threading.current_thread().name
+
+    assert backends.loop_thread_running()
+    assert backends._wait(where()) == 'muselsl-ble'
+    assert backends.start_loop_thread() is loop_thread
+
+
+def test_notifications_arrive_while_caller_is_busy(loop_thread):
+    delivered = []
+    start = time.monotonic()
+    for delay in (0.02, 0.04, 0.06):
+        loop_thread.call_soon_threadsafe(
+            loop_thread.call_later, delay, lambda: delivered.append(time.monotonic() - start))
+    # slow work on this thread (e.g. saving a CSV) does not hold them back
+    time.sleep(0.3)
+    assert len(delivered) == 3
+    assert max(delivered) < 0.2
+
+
+def test_supervise_runs_on_the_loop_thread(loop_thread):
+    class Muse:
+        last_timestamp = time.monotonic()
+
+    reasons = supervise(Supervisor(time.monotonic, timeout=None), [Headset(Muse(), 'AA')], 0.05)
+    assert reasons == [STOPPED]
+
+
+def test_loop_is_driven_by_callers_again_after_stop():
+    backends.start_loop_thread()
+    backends.stop_loop_thread()
+    assert not backends.loop_thread_running()
+    assert backends._wait(asyncio.sleep(0, result='ok')) == 'ok'
@@ -0,0 +1,119 @@
+import numpy as np
+
+from muselsl.lsl_outlet import ChunkPusher
+from muselsl.stream_descriptor import StreamDescriptor
+
+EEG = StreamDescriptor('EEG', 'EEG', 4, ('a', 'b', 'c', 'd'), 256.0, 12, 'microvolts')
+
+
+class _Outlet:
+    """``per_sample_timestamps=False`` behaves like pylsl 1.10.5 (pinned on Linux)."""
+
+    def __init__(self, per_sample_timestamps=True, n_channels=4):
+        self.per_sample_timestamps = per_sample_timestamps
+        self.n_channels = n_channels
+        self.chunks = []
+        self.samples = []
+
+    def push_chunk(self, x, timestamp=0.0, pushthrough=True):
+        if not self.per_sample_timestamps:
+            if isinstance(x, np.ndarray):
+                # 1.10.5 only flattens lists of lists; array rows are taken as values
+                if len(x) % self.n_channels:
+                    raise ValueError('each sample must have the same number of channels.')
+                raise TypeError('only 0-dimensional arrays can be converted to Python scalars')
+            if not isinstance(timestamp, float):
+                raise TypeError('timestamp must be a float')
+            x = np.array(x, dtype=np.float32)
+        assert x.flags['C_CONTIGUOUS'] and x.dtype == np.float32
+        self.chunks.append((x.copy(), timestamp))
+
+    def push_sample(self, x, timestamp=0.0, pushthrough=True):
+        if not self.per_sample_timestamps and isinstance(x, np.ndarray):
+            raise TypeError('only 0-dimensional arrays can be converted to Python scalars')
+        self.samples.append((np.array(x), timestamp))
+
+
+def _block(n=12, t0=10.0):
+    data = np.arange(4 * n, dtype=np.float64).reshape(4, n)
+    return data, t0 + np.arange(n) / 256.0
+
+
+def test_pushes_transposed_float32_chunk_with_all_timestamps():
+    outlet = _Outlet()
+    push = ChunkPusher(outlet, EEG)
+    data, timestamps = _block()
+    push(data, timestamps)
+    chunk, pushed_timestamps = outlet.chunks[0]
+    assert np.array_equal(chunk, data.T.astype(np.float32))
+    assert np.array_equal(pushed_timestamps, timestamps)
+    # the transposed buffer is reused across pushes
+    buffer = push._buffer
+    push(*_block(t0=11.0))
+    assert push._buffer is buffer and len(outlet.chunks) == 2
+
+
+def test_grows_buffer_for_large_blocks():
+    outlet = _Outlet()
+    push = ChunkPusher(outlet, EEG)
+    push(*_block(n=100))
+    assert outlet.chunks[0][0].shape == (100, 4)
+
+
+def test_old_pylsl_uses_newest_timestamp_or_falls_back_to_samples():
+    outlet = _Outlet(per_sample_timestamps=False)
+    push = ChunkPusher(outlet, EEG)
+    data, timestamps = _block()
+    push(data, timestamps)
+    assert outlet.chunks[0][1] == timestamps[-1]
+
+    # a dropped sample makes the block irregular: push sample by sample
+    keep = np.arange(12) != 5
+    push(data[:, keep], timestamps[keep])
+    assert len(outlet.chunks) == 1
+    assert [t for _, t in outlet.samples] == list(timestamps[keep])
+
+
+def test_old_pylsl_gets_lists_for_any_channel_count():
+    eeg5 = StreamDescriptor('EEG', 'EEG', 5, ('a', 'b', 'c', 'd', 'e'), 256.0, 12, 'microvolts')
+    outlet = _Outlet(per_sample_timestamps=False, n_channels=5)
+    push = ChunkPusher(outlet, eeg5)
+    data = np.arange(60, dtype=np.float64).reshape(5, 12)
+    timestamps = 10.0 + np.arange(12) / 256.0
+    push(data, timestamps)
+    chunk, timestamp = outlet.chunks[0]
+    assert np.array_equal(chunk, data.T.astype(np.float32))
+    assert timestamp == timestamps[-1]
+
+
+def test_coalesces_blocks_until_chunk_is_full():
+    outlet = _Outlet()
+    push = ChunkPusher(outlet, EEG, max_latency=1.0, clock=lambda: 0.0)
+    data, timestamps = _block()
+    for start in (0, 4, 8):
+        push(data[:, start:start + 4], timestamps[start:start + 4])
+        assert len(outlet.chunks) == (start == 8)
+    chunk, pushed_timestamps = outlet.chunks[0]
+    assert np.array_equal(chunk, data.T.astype(np.float32))
+    assert np.array_equal(pushed_timestamps, timestamps)
+
+
+def test_deadline_pushes_partial_chunk():
+    now = [0.0]
+    outlet = _Outlet()
+    push = ChunkPusher(outlet, EEG, max_latency=0.05, clock=lambda: now[0])
+    data, timestamps = _block()
+    push(data[:, :1], timestamps[:1])
+    now[0] = 0.04
+    assert push.flush_due() is False
+    push(data[:, 1:2], timestamps[1:2])
+    now[0] = 0.05
+    assert push.flush_due() is True
+    assert outlet.chunks[0][0].shape == (2, 4)
+    # the deadline is also checked when the next block arrives
+    push(data[:, 2:3], timestamps[2:3])
+    now[0] = 0.2
+    push(data[:, 3:4], timestamps[3:4])
+    assert [c.shape[0] for c, _ in outlet.chunks] == [2, 2]
+    push.flush()
+    assert len(outlet.chunks) == 2
@@ -0,0 +1,230 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+
+from muselsl import backends
+from muselsl.registry import DeviceRegistry
+
+# muselsl.stream is shadowed by the stream() function in the package namespace
+stream_module = importlib.import_module('muselsl.stream')
+
+bleak = pytest.importorskip('bleak')
+
+
+class _SlowClient:
+    connect_time = 0.2
+
+    def __init__(self, address, timeout=None, **kwargs):
+        self.address = address
+
+    async def connect(self):
+        if self.address == 'CC':
+            raise bleak.exc.BleakError('out of range')
+        await asyncio.sleep(self.connect_time)
+
+    async def disconnect(self):
+        pass
+
+
+def test_bleak_connect_many_connects_concurrently(monkeypatch):
+    monkeypatch.setattr(bleak, 'BleakClient', _SlowClient)
+    monkeypatch.setattr(backends, 'sleep', backends.sleep)
+    adapter = backends.BleakBackend()
+    start = time.monotonic()
+    devices = adapter.connect_many([('AA', None), ('BB', None), ('DD', None)], retries=0)
+    assert time.monotonic() - start < 2 * _SlowClient.connect_time
+    assert [d._client.address for d in devices] == ['AA', 'BB', 'DD']
+    assert len(adapter.connected) == 3
+
+
+def test_bleak_connect_many_reports_failed_devices(monkeypatch):
+    monkeypatch.setattr(bleak, 'BleakClient', _SlowClient)
+    monkeypatch.setattr(backends, 'sleep', backends.sleep)
+    adapter = backends.BleakBackend()
+    devices = adapter.connect_many([('AA', None), ('CC', None)], retries=0)
+    assert devices[0] is not None and devices[1] is None
+    adapter.stop()
+    assert not adapter.connected
+
+
+def test_resolve_targets_uses_registry_then_one_scan(tmp_path, monkeypatch):
+    registry = DeviceRegistry(str(tmp_path / 'devices.json'))
+    registry.remember('00:55:DA:00:00:01', 'Muse-0001', 'legacy')
+    scans = []
+
+    def iter_muses(backend, interface):
+        scans.append(backend)
+        yield {'name': 'Muse-0003', 'address': '00:55:DA:00:00:03'}
+        yield {'name': 'Muse-0002', 'address': '00:55:DA:00:00:02'}
+        raise AssertionError('scan should stop once all names were found')
+
+    monkeypatch.setattr(stream_module, 'iter_muses', iter_muses)
+    targets = stream_module._resolve_targets(
+        [], ['Muse-0001', 'Muse-0002', 'Muse-0001'], registry, 'bleak', None)
+    assert targets == [
+        ('00:55:DA:00:00:01', 'Muse-0001'),
+        ('00:55:DA:00:00:02', 'Muse-0002'),
+    ]
+    assert scans == ['bleak']
+
+
+def test_resolve_targets_pairs_addresses_with_names(monkeypatch, capsys):
+    monkeypatch.setattr(stream_module, 'iter_muses', lambda *args: pytest.fail('scanned'))
+    targets = stream_module._resolve_targets(
+        ['AA', 'BB', 'aa'], ['Muse-A', 'Muse-B', 'Muse-C'], None, 'bleak', None)
+    assert targets == [('AA', 'Muse-A'), ('BB', 'Muse-B')]
+    assert stream_module._resolve_targets(['AA', 'BB'], ['Muse-A'], None, 'bleak', None) == []
+    assert 'one name per address' in capsys.readouterr().out
+
+
+def test_stop_disconnects_each_link_before_stopping_the_shared_adapter():
+    from muselsl.supervisor import Headset, Supervisor
+    events = []
+
+    class Adapter:
+        def stop(self):
+            events.append('adapter stop')
+
+    class Muse:
+        adapter = Adapter()
+
+        def __init__(self, label):
+            self.label = label
+            self.last_timestamp = time.time()
+
+        def stop(self):
+            events.append(f'{self.label} stop')
+
+        def disconnect(self, stop_adapter=True):
+            events.append(f'{self.label} disconnect')
+            if stop_adapter:
+                self.adapter.stop()
+
+    supervisor = Supervisor()
+    supervisor.stop()
+    headsets = [Headset(Muse('A'), 'AA'), Headset(Muse('B'), 'BB')]
+    stream_module._supervise(headsets, time.time, 0.05, supervisor)
+    assert events == ['A stop', 'A disconnect', 'B stop', 'B disconnect', 'adapter stop']
+
+
+def test_multi_headset_stream_refuses_gatt(monkeypatch, capsys):
+    monkeypatch.setattr(stream_module, 'iter_muses', lambda *args: iter(()))
+    monkeypatch.setattr(backends, 'open_adapter', lambda *args: pytest.fail('adapter opened'))
+    stream_module.stream(['AA', 'BB'], backend='gatt', use_registry=False)
+    assert 'bleak or bgapi' in capsys.readouterr().out
+
+
+def test_headset_failing_to_connect_does_not_stop_the_others(monkeypatch):
+    started = []
+
+    class Adapter:
+        def stop(self):
+            pass
+
+    class Muse:
+        model = 'legacy'
+
+        def __init__(self, address):
+            self.address = address
+
+        def start(self):
+            started.append(self.address)
+
+    def connect_device(address, name, model, preset, retries, options, adapter=None,
+                       device=None):
+        if address == 'BB':
+            raise RuntimeError('not a Muse')
+        return Muse(address)
+
+    monkeypatch.setattr(backends, 'open_adapter', lambda *args: Adapter())
+    monkeypatch.setattr(stream_module, '_connect_device', connect_device)
+    monkeypatch.setattr(stream_module, '_attach_outlets', lambda *args: {})
+    monkeypatch.setattr(stream_module, '_supervise', lambda *args: None)
+    stream_module.stream(['AA', 'BB', 'CC'], backend='bgapi', use_registry=False)
+    assert started == ['AA', 'CC']
+
+
+def test_bgapi_headsets_share_one_adapter(monkeypatch):
+    opened, used = [], []
+
+    class Adapter:
+        def stop(self):
+            pass
+
+    def open_adapter(backend, interface=None):
+        opened.append(Adapter())
+        return opened[-1]
+
+    def connect_device(address, name, model, preset, retries, options, adapter=None,
+                       device=None):
+        used.append(adapter)
+
+    monkeypatch.setattr(backends, 'open_adapter', open_adapter)
+    monkeypatch.setattr(stream_module, '_connect_device', connect_device)
+    stream_module.stream(['AA', 'BB', 'CC'], backend='bgapi', use_registry=False)
+    assert len(opened) == 1 and used == opened * 3
+
+
+def test_stream_tries_only_the_newest_known_device_before_scanning(tmp_path, monkeypatch):
+    registry = DeviceRegistry(str(tmp_path / 'devices.json'))
+    for i in range(3):
+        registry.remember(f'00:55:DA:00:00:0{i}', f'Muse-000{i}', 'legacy', last_seen=float(i))
+    tried, scans = [], []
+
+    class Adapter:
+        def stop(self):
+            pass
+
+    def connect_device(address, name, model, preset, retries, options, adapter=None,
+                       device=None):
+        tried.append(address)
+
+    monkeypatch.setattr(stream_module, 'DeviceRegistry', lambda: registry)
+    monkeypatch.setattr(backends, 'open_adapter', lambda *args, **kwargs: Adapter())
+    monkeypatch.setattr(stream_module, '_connect_device', connect_device)
+    monkeypatch.setattr(stream_module, 'find_muse', lambda *args: scans.append(args))
+    stream_module.stream(None, backend='bleak', retries=0)
+    assert tried == ['00:55:DA:00:00:02']
+    assert len(scans) == 1
+
+
+def test_packet_trace_is_dumped_on_sigusr1_and_at_the_end(tmp_path):
+    import logging
+    import os
+    import signal
+    import threading
+    from muselsl.packet_trace import PacketTrace
+    from muselsl.supervisor import Headset, Supervisor
+    if not hasattr(signal, 'SIGUSR1'):
+        pytest.skip('no SIGUSR1 on this platform')
+
+    class Muse:
+        adapter = None
+
+        def __init__(self):
+            self.last_timestamp = time.time()
+            self.packet_trace = PacketTrace(logging.getLogger('muselsl.test.dump'))
+
+        def stop(self):
+            pass
+
+        def disconnect(self, stop_adapter=True):
+            pass
+
+    muse = Muse()
+    path = str(tmp_path / 'trace.txt')
+    supervisor = Supervisor(timeout=None)
+    threading.Timer(0.2, supervisor.stop).start()
+
+    def notify_then_signal():
+        muse.packet_trace.record(0x14, b'\xab', 1.0)
+        os.kill(os.getpid(), signal.SIGUSR1)
+
+    threading.Timer(0.05, notify_then_signal).start()
+    stream_module._supervise([Headset(muse, 'AA')], time.time, 0.05, supervisor,
+                             trace_dump=path)
+    with open(path) as file:
+        assert file.read().splitlines() == ['# AA', '1.000000 0x0014 1 ab'] * 2
+    assert signal.getsignal(signal.SIGUSR1) is signal.SIG_DFL
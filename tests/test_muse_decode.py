@@ -0,0 +1,150 @@
+import struct
+
+import numpy as np
+
+from muselsl.muse import BlockAssembler, unpack_eeg_packets, unpack_imu_packets, unpack_ppg_packets
+
+
+def _pack_eeg(index, samples):
+    bits = ''.join(format(s, '012b') for s in samples)
+    body = int(bits, 2).to_bytes(18, 'big')
+    return index.to_bytes(2, 'big') + body
+
+
+def test_unpack_eeg_packet_known_values():
+    samples = [0, 1, 2048, 4095, 0x800, 0x123, 0xABC, 7, 100, 2000, 3000, 4000]
+    indices, data = unpack_eeg_packets(_pack_eeg(0x1234, samples))
+    assert indices.tolist() == [0x1234]
+    assert np.array_equal(data[0], 0.48828125 * (np.array(samples) - 2048))
+
+
+def test_unpack_eeg_packets_block_of_five():
+    rng = np.random.default_rng(0)
+    samples = rng.integers(0, 4096, (5, 12))
+    packets = [_pack_eeg(42, s) for s in samples]
+    indices, data = unpack_eeg_packets(packets)
+    assert indices.tolist() == [42] * 5
+    assert data.shape == (5, 12)
+    assert np.array_equal(data, 0.48828125 * (samples - 2048))
+
+
+def test_unpack_imu_packet_fortran_layout_and_scale():
+    values = [1, -2, 3, -4, 5, -6, 7, -8, 32767]
+    packet = struct.pack('>H9h', 7, *values)
+    indices, samples = unpack_imu_packets(packet, scale=0.5)
+    assert indices.tolist() == [7]
+    expected = np.array(values).reshape((3, 3), order='F') * 0.5
+    assert np.array_equal(samples[0], expected)
+
+
+def test_unpack_ppg_packet_24bit():
+    values = [0, 1, 0xFFFFFF, 0x123456, 0x800000, 42]
+    packet = struct.pack('>H', 9) + b''.join(v.to_bytes(3, 'big') for v in values)
+    indices, samples = unpack_ppg_packets([packet, packet])
+    assert indices.tolist() == [9, 9]
+    assert samples.tolist() == [values, values]
+
+
+def test_block_assembler_emits_complete_blocks_in_order():
+    blocks = BlockAssembler(3)
+    packets = {(c, ch): _pack_eeg(c, [c + ch] * 12) for c in (4, 5, 6) for ch in range(3)}
+    assert blocks.add(4, 0, packets[(4, 0)], 0.0) == []
+    assert blocks.add(4, 1, packets[(4, 1)], 0.0) == []
+    assert [block[0] for block in blocks.add(4, 2, packets[(4, 2)], 0.0)] == [4]
+    assert blocks.add(5, 0, packets[(5, 0)], 0.0) == []
+    assert blocks.add(6, 0, packets[(6, 0)], 0.01) == []
+    assert blocks.add(6, 1, packets[(6, 1)], 0.02) == []
+    assert blocks.add(5, 1, packets[(5, 1)], 0.03) == []
+    ready = blocks.add(6, 2, packets[(6, 2)], 0.04)
+    # block 6 is complete, so the still-open block 5 is flushed ahead of it
+    assert [block[0] for block in ready] == [5, 6]
+    counter, rows, arrivals, lost = ready[0]
+    assert np.isnan(arrivals[2]) and lost.tolist() == [False, False, True]
+    assert bytes(rows[1]) == packets[(5, 1)]
+    assert blocks.complete_blocks == 2 and blocks.partial_blocks == 1
+
+    # the channel of block 5 that arrives afterwards is late
+    assert blocks.add(5, 2, packets[(5, 2)], 0.05) == []
+    assert blocks.late_packets == 1
+
+
+def test_block_assembler_deadline_and_counter_wrap():
+    blocks = BlockAssembler(2, deadline=0.1)
+    assert blocks.add(0xFFFF, 0, _pack_eeg(0xFFFF, [0] * 12), 0.0) == []
+    ready = blocks.add(0, 0, _pack_eeg(0, [0] * 12), 0.2)
+    assert [block[0] for block in ready] == [0xFFFF]
+    assert blocks.add(0, 1, _pack_eeg(0, [0] * 12), 0.21)[0][0] == 0
+    assert blocks.late_packets == 0
+
+
+def _legacy_muse():
+    from muselsl.muse import Muse
+    muse = Muse.__new__(Muse)
+    pushed = []
+    clock = [0.0]
+    muse.time_func = lambda: clock[0]
+    muse.callback_eeg = lambda data, timestamps: pushed.append((data, timestamps))
+    muse.last_tm = 0
+    muse._init_timestamp_correction()
+    muse._init_sample()
+    return muse, pushed, clock
+
+
+def test_handle_eeg_nan_fills_lost_channel_and_skips_lost_blocks():
+    muse, pushed, clock = _legacy_muse()
+    for counter in (1, 2, 4):
+        for handle in (44, 41, 38, 32, 35):
+            clock[0] += 0.01
+            if counter == 2 and handle == 38:
+                continue
+            muse._handle_eeg(handle, _pack_eeg(counter, [2048 + counter] * 12))
+    clock[0] += 0.2
+    muse._handle_eeg(44, _pack_eeg(5, [0] * 12))
+
+    assert len(pushed) == 3
+    data, _ = pushed[1]
+    assert np.isnan(data[2]).all()
+    assert np.array_equal(data[[0, 1, 3, 4]], np.full((4, 12), 0.48828125 * 2))
+    # block 3 never arrived: 12 samples are skipped rather than backfilled
+    assert muse._clocks['eeg'].sample_index == 36 + 12
+    assert muse.block_stats()['eeg']['partial_blocks'] == 1
+
+
+def test_handle_eeg_completes_blocks_without_right_aux():
+    # presets without AUX never notify handle 44
+    muse, pushed, clock = _legacy_muse()
+    emitted = []
+    for counter in range(1, 21):
+        for handle in (41, 38, 32, 35):
+            clock[0] += 12 / 256.0 / 4
+            muse._handle_eeg(handle, _pack_eeg(counter, [2048 + counter] * 12))
+        emitted.append(len(pushed))
+
+    # only the first block waits out its deadline for AUX; from then on each
+    # block goes out as soon as its handle 35 arrives
+    assert emitted[:2] == [0, 0]
+    assert emitted[2:] == list(range(3, 21))
+    data, _ = pushed[-1]
+    assert np.array_equal(data[4], np.zeros(12))
+    assert not np.isnan(np.concatenate([d for d, _ in pushed])).any()
+    stats = muse.block_stats()['eeg']
+    assert stats['partial_blocks'] == 0 and stats['complete_blocks'] == 20
+
+
+def test_handle_acc_dejittered_per_sample_timestamps():
+    muse, _, clock = _legacy_muse()
+    pushed = []
+    muse.callback_acc = lambda samples, timestamps: pushed.append(timestamps)
+    period = 3 / 52.0
+    for counter in (10, 11, 12, 14):
+        clock[0] = 100.0 + (counter - 10) * period + (0.004 if counter % 2 else 0.0)
+        muse._handle_acc(23, struct.pack('>H9h', counter, *range(9)))
+
+    stamps = np.concatenate(pushed)
+    assert len(stamps) == 12
+    assert np.all(np.diff(stamps) > 0)
+    within = np.diff(stamps.reshape(4, 3), axis=1)
+    assert np.allclose(within[:, 0], within[:, 1])
+    assert np.allclose(within, 1 / 52.0, rtol=0.05)
+    # packet 13 was lost: the last packet starts two packets after packet 12
+    assert (stamps[9] - stamps[6]) / (stamps[6] - stamps[3]) > 1.9
@@ -0,0 +1,36 @@
+import io
+import logging
+
+from muselsl.packet_trace import PacketTrace
+
+
+def test_trace_inactive_without_debug_or_capture():
+    log = logging.getLogger('muselsl.test.trace.off')
+    log.setLevel(logging.INFO)
+    trace = PacketTrace(log)
+    trace.record(0x14, b'\x01\x02', 1.0)
+    assert len(trace) == 0
+    assert trace.seen == 0
+
+
+def test_trace_sampling_capacity_and_dump():
+    log = logging.getLogger('muselsl.test.trace.on')
+    log.setLevel(logging.INFO)
+    trace = PacketTrace(log, sample_every=2, capacity=2, capture=True)
+    for i in range(6):
+        trace.record(0x14, bytearray([i]), float(i))
+    # every 2nd notification kept, oldest evicted past capacity
+    assert [raw for _, _, raw in trace.records()] == [b'\x03', b'\x05']
+    out = io.StringIO()
+    assert trace.dump(out) == 2
+    assert out.getvalue().splitlines()[0] == '3.000000 0x0014 1 03'
+    trace.clear()
+    assert len(trace) == 0
+
+
+def test_trace_active_at_debug():
+    log = logging.getLogger('muselsl.test.trace.debug')
+    log.setLevel(logging.DEBUG)
+    trace = PacketTrace(log)
+    trace.record(0x14, b'\xab', 1.0)
+    assert trace.records() == [(1.0, 0x14, b'\xab')]
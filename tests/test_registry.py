@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from muselsl.registry import DeviceRegistry, KnownDevice
+
+
+def test_remember_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / 'sub' / 'devices.json')
+    registry = DeviceRegistry(path)
+    registry.remember('00:55:da:b0:00:01', 'Muse-0001', 'athena', 1041, last_seen=10.0)
+
+    reloaded = DeviceRegistry(path)
+    assert reloaded.get('00:55:DA:B0:00:01') == KnownDevice(
+        '00:55:DA:B0:00:01', 'Muse-0001', 'athena', '1041', 10.0,
+    )
+
+
+def test_candidates_newest_first_and_filtered_by_name(tmp_path):
+    registry = DeviceRegistry(str(tmp_path / 'devices.json'))
+    registry.remember('AA:00:00:00:00:01', 'Muse-A', 'legacy', last_seen=1.0)
+    registry.remember('AA:00:00:00:00:02', 'Muse-B', 'athena', last_seen=3.0)
+    registry.remember('AA:00:00:00:00:03', 'Muse-A', 'legacy', last_seen=2.0)
+    assert [d.address[-1] for d in registry.candidates()] == ['2', '3', '1']
+    assert [d.address[-1] for d in registry.candidates('Muse-A')] == ['3', '1']
+
+
+def test_remember_keeps_unset_fields(tmp_path):
+    registry = DeviceRegistry(str(tmp_path / 'devices.json'))
+    registry.remember('AA:00:00:00:00:01', 'Muse-A', 'legacy', 'p21', last_seen=1.0)
+    known = registry.remember('AA:00:00:00:00:01', last_seen=5.0)
+    assert (known.name, known.model, known.preset, known.last_seen) == ('Muse-A', 'legacy', 'p21', 5.0)
+
+
+def test_forget_and_unknown_model(tmp_path):
+    registry = DeviceRegistry(str(tmp_path / 'devices.json'))
+    registry.remember('AA:00:00:00:00:01', 'Muse-A')
+    registry.forget('aa:00:00:00:00:01')
+    assert len(DeviceRegistry(registry.path)) == 0
+    with pytest.raises(ValueError):
+        registry.remember('AA:00:00:00:00:01', model='muse9')
+
+
+def test_unreadable_registry_is_empty(tmp_path):
+    path = tmp_path / 'devices.json'
+    path.write_text('{not json')
+    assert len(DeviceRegistry(str(path))) == 0
+    path.write_text(json.dumps([{'name': 'no address'}]))
+    assert len(DeviceRegistry(str(path))) == 0
+
+
+def test_default_path_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('MUSELSL_REGISTRY', str(tmp_path / 'r.json'))
+    assert DeviceRegistry().path == str(tmp_path / 'r.json')
@@ -0,0 +1,179 @@
+import asyncio
+import importlib
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from muselsl import backends
+from muselsl.supervisor import DISCONNECTED, STOPPED, TIMEOUT, Headset, Supervisor, supervise
+
+
+class _Pusher:
+    def __init__(self):
+        self.flushes = 0
+        self.due_checks = 0
+
+    def flush_due(self):
+        self.due_checks += 1
+
+    def flush(self):
+        self.flushes += 1
+
+
+class _Device:
+    def __init__(self):
+        self.callbacks = []
+
+    def register_disconnect_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def remove_disconnect_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def drop(self):
+        for callback in list(self.callbacks):
+            callback({'address': 'AA'})
+
+
+class _Muse:
+    def __init__(self):
+        self.last_timestamp = time.monotonic()
+        self.device = _Device()
+        self.keep_alives = 0
+
+    def keep_alive(self):
+        self.keep_alives += 1
+
+
+def _headset(label):
+    return Headset(_Muse(), label, label, {'EEG': _Pusher()})
+
+
+def test_watchdog_ends_each_quiet_headset_on_its_own():
+    live, quiet = _headset('live'), _headset('quiet')
+    ended = {}
+    supervisor = Supervisor(
+        time.monotonic, timeout=0.2, flush_interval=0.02,
+        on_end=lambda headset, reason: ended.setdefault(headset.label, time.monotonic()),
+    )
+
+    async def main():
+        async def feed():
+            while time.monotonic() - start < 0.5:
+                live.muse.last_timestamp = time.monotonic()
+                await asyncio.sleep(0.01)
+        start = time.monotonic()
+        live.muse.last_timestamp = quiet.muse.last_timestamp = start
+        feeder = asyncio.ensure_future(feed())
+        reasons = await supervisor.run([live, quiet])
+        await feeder
+        return start, reasons
+
+    start, reasons = asyncio.run(main())
+    assert reasons == [TIMEOUT, TIMEOUT]
+    assert ended['quiet'] - start < 0.35
+    assert ended['live'] - start > 0.5
+    assert live.pushers['EEG'].due_checks > quiet.pushers['EEG'].due_checks > 0
+    assert live.pushers['EEG'].flushes == quiet.pushers['EEG'].flushes == 1
+
+
+def test_link_drop_ends_headset_without_waiting_for_watchdog():
+    headset = _headset('AA')
+    threading.Timer(0.05, headset.muse.device.drop).start()
+    start = time.monotonic()
+    reasons = asyncio.run(Supervisor(time.monotonic, timeout=10).run([headset]))
+    assert reasons == [DISCONNECTED]
+    assert time.monotonic() - start < 1
+    assert not headset.muse.device.callbacks
+
+
+def test_stop_from_another_thread_and_keep_alives():
+    headset = _headset('AA')
+    supervisor = Supervisor(time.monotonic, timeout=None, keep_alive_interval=0.02)
+    threading.Timer(0.15, supervisor.stop).start()
+    reasons = asyncio.run(supervisor.run([headset]))
+    assert reasons == [STOPPED]
+    assert headset.muse.keep_alives >= 3
+    assert headset.pushers['EEG'].flushes == 1
+
+
+def test_duration_stops_supervisor():
+    reasons = asyncio.run(Supervisor(timeout=None).run([_headset('AA')], duration=0.05))
+    assert reasons == [STOPPED]
+
+
+def test_dropped_headset_is_reconnected_with_backoff():
+    headset = _headset('AA')
+    supervisor = Supervisor(time.monotonic, timeout=None, backoff=0.02, max_backoff=0.03)
+    attempts = []
+
+    def reconnect(target):
+        attempts.append(time.monotonic())
+        if len(attempts) < 4:
+            return False
+        target.muse.device = _Device()
+        threading.Timer(0.05, supervisor.stop).start()
+        return True
+
+    supervisor.reconnect = reconnect
+    threading.Timer(0.05, headset.muse.device.drop).start()
+    reasons = asyncio.run(supervisor.run([headset]))
+    assert reasons == [STOPPED]
+    assert supervisor.reconnects == 1
+    gaps = np.diff(attempts)
+    assert gaps[0] >= 0.02 and gaps[1] >= 0.03 and gaps[2] >= 0.03
+    # data received before the drop was pushed before reconnecting
+    assert headset.pushers['EEG'].flushes == 2
+
+
+def test_headset_ends_when_reconnect_attempts_run_out():
+    headset = _headset('AA')
+    calls = []
+    supervisor = Supervisor(
+        time.monotonic, timeout=0.05, backoff=0.0,
+        reconnect=lambda target: calls.append(target) or False, reconnect_attempts=3,
+    )
+    reasons = asyncio.run(supervisor.run([headset]))
+    assert reasons == [TIMEOUT]
+    assert len(calls) == 3 and supervisor.reconnects == 0
+
+
+def test_rejects_non_positive_timeout():
+    with pytest.raises(ValueError, match='Supervisor: timeout'):
+        Supervisor(timeout=0)
+
+
+def test_blocking_ble_calls_are_submitted_to_the_running_loop():
+    async def main():
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None, backends._wait, asyncio.sleep(0.01, result='written'))
+        with pytest.raises(RuntimeError, match='executor'):
+            backends._wait(asyncio.sleep(0))
+        return result
+
+    assert backends._wait(main()) == 'written'
+
+
+def test_stream_async_cancellation_stops_the_stream(monkeypatch):
+    # muselsl.stream is shadowed by the stream() function in the package namespace
+    stream_module = importlib.import_module('muselsl.stream')
+    reasons = []
+
+    def fake_stream(address, supervisor, **kwargs):
+        supervisor.timeout = None
+        reasons.extend(supervise(supervisor, [_headset(address)]))
+
+    monkeypatch.setattr(stream_module, 'stream', fake_stream)
+
+    async def main():
+        task = asyncio.ensure_future(stream_module.stream_async('AA'))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert reasons == [STOPPED]
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from muselsl.timestamps import TimestampCorrector
+
+
+def _arrivals(n_packets, n_samples=12, rate=256.0, drift_after=None, drift=0.0, seed=0):
+    """End-of-packet sample indices, true host times and jittered arrivals."""
+    rng = np.random.default_rng(seed)
+    ends = (np.arange(n_packets) + 1) * n_samples - 1
+    true = ends / rate
+    if drift_after is not None:
+        late = true > drift_after
+        true[late] = drift_after + (true[late] - drift_after) * (1 + drift)
+    return ends, true, true + rng.exponential(0.005, n_packets)
+
+
+def test_batch_update_matches_packet_by_packet():
+    _, _, host = _arrivals(200)
+    one = TimestampCorrector(256.0, lambda: 0.0)
+    batch = TimestampCorrector(256.0, lambda: 0.0)
+    sequential = np.concatenate([one.timestamps(12, t) for t in host[:100]])
+    together = batch.timestamps_batch([12] * 100, host[:100])
+    # identical up to the refit: each packet is stamped from the fit it updated
+    assert np.allclose(one.reg_params, batch.reg_params, rtol=0, atol=1e-9)
+    assert np.allclose(sequential[-12:], together[-12:], atol=1e-9)
+    assert batch.sample_index == 1200
+
+
+def test_forgetting_tracks_rate_change():
+    ends, true, host = _arrivals(60000, drift_after=600.0, drift=5e-4)
+    errors = {}
+    for forgetting in (1.0, 0.999):
+        corrector = TimestampCorrector(256.0, lambda: 0.0, forgetting=forgetting)
+        for start in range(0, len(host), 500):
+            stamps = corrector.timestamps_batch([12] * 500, host[start:start + 500])
+        errors[forgetting] = abs(stamps[-1] - true[-1])
+    assert errors[0.999] < 0.02
+    assert errors[0.999] < errors[1.0] / 5
+
+
+def test_late_bursts_are_rejected():
+    _, true, host = _arrivals(400)
+    host[200:204] += 0.4
+    corrector = TimestampCorrector(256.0, lambda: 0.0)
+    for t in host[:200]:
+        corrector.timestamps(12, t)
+    before = corrector.reg_params.copy()
+    late = corrector.timestamps_batch([12] * 4, host[200:204])
+    stats = corrector.stats()
+    assert stats['rejected'] == 4
+    assert np.allclose(corrector.reg_params, before)
+    assert abs(late[-1] - true[203]) < 0.02
+    assert stats['residual_max'] < 0.1
+
+
+def test_persistent_offset_reanchors():
+    corrector = TimestampCorrector(256.0, lambda: 0.0, max_rejects=8)
+    _, _, host = _arrivals(100)
+    for t in host[:50]:
+        corrector.timestamps(12, t)
+    # host clock stepped forward by 2 s
+    for t in host[50:] + 2.0:
+        stamps = corrector.timestamps(12, t)
+    assert corrector.stats()['reanchored'] == 1
+    assert abs(stamps[-1] - (host[-1] + 2.0)) < 0.05
+
+
+def test_reanchor_after_outage_keeps_rate():
+    corrector = TimestampCorrector(256.0, lambda: 0.0)
+    _, _, host = _arrivals(400, rate=256.0 * (1 + 1e-3))
+    for t in host[:200]:
+        corrector.timestamps(12, t)
+    slope = corrector.reg_params[1]
+    # reconnected 5 s later; the samples lost meanwhile are unknown
+    corrector.reanchor()
+    stamps = [corrector.timestamps(12, t) for t in host[200:210] + 5.0]
+    assert corrector.stats()['reanchored'] == 1
+    assert corrector.stats()['rejected'] == 0
+    assert abs(stamps[0][-1] - (host[200] + 5.0)) < 0.02
+    assert corrector.reg_params[1] == pytest.approx(slope, rel=1e-3)
+    assert np.diff(stamps[-1]).mean() == pytest.approx(slope, rel=1e-3)
+
+
+def test_skip_advances_index_over_gap():
+    corrector = TimestampCorrector(256.0, lambda: 0.0)
+    first = corrector.timestamps(12, 11 / 256.0)
+    corrector.skip(24)
+    second = corrector.timestamps(12, 47 / 256.0)
+    assert corrector.sample_index == 48
+    assert second[0] - first[-1] == pytest.approx(25 / 256.0, rel=1e-3)
+
+
+def test_rejects_bad_forgetting():
+    with pytest.raises(ValueError):
+        TimestampCorrector(256.0, lambda: 0.0, forgetting=0.0)